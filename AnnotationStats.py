@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+'''
+    This module computes annotation statistics of a UniProt-GOA file
+    (GAF 1.0 or 2.0, plain or gzip compressed) or of a UniProtKB/SwissProt
+    file in one pass over the file. The following counts are computed:
+
+        records:                  the number of GO annotations (the lines
+                                  of a GAF file, or the GO cross
+                                  references of a SwissProt file)
+        ontology, evidence,
+        taxon, assigned_by:       the number of GO annotations by
+                                  ontology (BPO, CCO, MFO), evidence code,
+                                  taxon id and assigning database
+        proteins:                 the number of proteins
+        proteins_by_taxon:        the number of proteins by taxon id
+        proteins_exp:             the number of proteins with at least one
+                                  annotation with an EXP evidence code
+        proteins_exp_by_ontology: the same, by ontology
+        proteins_exp_by_taxon:    the same, by taxon id
+
+    The records of a UniProt-GOA file are sorted by protein, so the
+    proteins (and the proteins by taxon id) of a GAF file are counted as
+    runs of lines with the same DB_Object_ID; no set of all the proteins
+    is kept. A ValueError is raised for a GAF file that is not sorted by
+    DB_Object_ID (see GOAParser.sort_gaf_file), whose runs would count a
+    protein more than once. The proteins with EXP annotations are 
+    counted exactly.
+
+    Each line (or SwissProt record) updates a single counter keyed by its
+    (evidence, aspect, taxon, assigned by) combination. The counts by
+    each of these fields are summed from the combinations at the end.
+
+    This module has the following methods:
+
+    detect_format(fname):
+        This method returns 'gaf' for a UniProt-GOA file, 'sprot' for a
+        UniProtKB/SwissProt file and None otherwise.
+
+    gaf_stats(goa_fname, EXP_default=set([]), nprocs=1):
+        This method returns the statistics of the UniProt-GOA file
+        goa_fname as an ordered dictionary. The file is scanned in
+        nprocs byte ranges in parallel. The file must be sorted by
+        DB_Object_ID.
+
+    sprot_stats(sprot_fname, EXP_default=set([]), nprocs=1):
+        This method returns the statistics of the UniProtKB/SwissProt file
+        sprot_fname as an ordered dictionary. The file is scanned in
+        chunks of records in parallel when nprocs is more than 1.
+
+    file_stats(fname, EXP_default=set([]), nprocs=1):
+        This method invokes gaf_stats or sprot_stats based on the format
+        of the file fname. It raises a ValueError for any other format.
+
+    write_json(stats, handle):
+        This method writes the statistics as a JSON object.
+
+    write_tsv(stats, handle):
+        This method writes the statistics as tab separated lines with
+        three columns: group, key and count.
+'''
+import gzip
+import json
+import sys
+from collections import defaultdict, OrderedDict
+from cStringIO import StringIO
+from multiprocessing import Pool
+
+import GOAParser
+import SwissProtParser as sp
+import Filter_sp_targets as ft
+
+# Ontology names of the GO aspects:
+ONTOLOGY_NAMES = {'F':'MFO', 'P':'BPO', 'C':'CCO'}
+
+def detect_format(fname):
+    """
+    Returns 'gaf' if the first line of the file fname is a GAF version
+    line or a line with 15 or 17 tab separated columns, 'sprot' if it is
+    a SwissProt ID line and None otherwise.
+    """
+    if fname.endswith('.gz'):
+        handle = gzip.open(fname, 'rb')
+    else:
+        handle = open(fname, 'r')
+    firstline = handle.readline()
+    handle.close()
+    if firstline.startswith('!gaf') or \
+       len(firstline.rstrip('\r\n').split('\t')) in (15, 17):
+        return 'gaf'
+    elif firstline.startswith('ID   '):
+        return 'sprot'
+    return None
+
+def _taxon_id(taxon):
+    """
+    Returns the taxon id of a Taxon_ID column of a GAF file, for example
+    9606 for 'taxon:9606|taxon:562' (PRIVATE). Only the first taxon is
+    the taxon of the protein.
+    """
+    taxon = taxon.split('|', 1)[0]
+    if taxon.startswith('taxon:'):
+        taxon = taxon[6:]
+    return taxon
+
+def _gaf_chunk(args):
+    """
+    Counts the annotations of one byte range of the GAF file (PRIVATE).
+    This method is run in a worker process by gaf_stats. It returns the
+    counts of the (evidence, aspect, taxon, assigned by) combinations,
+    the number of protein runs by taxon, the (protein, aspect, taxon)
+    triplets of the EXP annotations, and the first and last protein of
+    the range. It raises a ValueError if the range is not sorted by 
+    DB_Object_ID.
+    """
+    goa_fname, start, end, EXP_default = args
+    combos = defaultdict(int)
+    runs = defaultdict(int)
+    exp_triplets = set()
+    first = None
+    prev = None
+    for lines in GOAParser.iter_line_blocks(goa_fname, start, end):
+        for line in lines:
+            if line[:1] == '!' or not line:
+                continue
+            cols = line.split('\t', 15)
+            if len(cols) < 15:
+                continue
+            combos[(cols[6], cols[8], cols[12], cols[14].rstrip('\r'))] += 1
+            if cols[1] != prev:
+                # Runs count proteins only if the file is sorted:
+                if prev is not None and cols[1] < prev:
+                    raise ValueError(goa_fname + ' is not sorted by ' + \
+                                     'DB_Object_ID: ' + cols[1])
+                prev = cols[1]
+                runs[cols[12]] += 1
+                if first is None:
+                    first = (prev, cols[12])
+            if cols[6] in EXP_default:
+                exp_triplets.add((prev, cols[8], cols[12]))
+    return combos, runs, exp_triplets, first, prev
+
+def _count_sprot_records(records, EXP_default):
+    """
+    Counts the GO cross references of the SwissProt records (PRIVATE).
+    It returns the counts of the (evidence, aspect, taxon, assigned by)
+    combinations, the number of proteins by taxon and the (accession,
+    aspect, taxon) triplets of the EXP annotations.
+    """
+    combos = defaultdict(int)
+    proteins = defaultdict(int)
+    exp_triplets = set()
+    for rec in records:
+        taxa = rec.taxonomy_id
+        taxon = taxa[0] if taxa else ''
+        proteins[taxon] += 1
+        accession = None
+        for crossRef in rec.cross_references:
+            if crossRef[0] != 'GO':
+                continue
+            # ('GO', 'GO:0005737', 'C:cytoplasm', 'IDA:UniProtKB'):
+            evidence, sep, assigned_by = crossRef[3].partition(':')
+            aspect = crossRef[2][:1]
+            combos[(evidence, aspect, taxon, assigned_by)] += 1
+            if evidence in EXP_default:
+                if accession is None:
+                    accession = rec.accessions[0]
+                exp_triplets.add((accession, aspect, taxon))
+    return combos, proteins, exp_triplets
+
+def _sprot_chunk(args):
+    """
+    Counts the GO cross references of one byte range of the SwissProt
+    file (PRIVATE). This method is run in a worker process by
+    sprot_stats.
+    """
+    sprot_fname, start, end, EXP_default = args
+    fh_sprot = open(sprot_fname, 'r')
+    fh_sprot.seek(start)
+    chunk = StringIO(fh_sprot.read(end - start))
+    fh_sprot.close()
+    return _count_sprot_records(sp.parse(chunk), EXP_default)
+
+def _run_jobs(worker, jobs, nprocs):
+    """
+    Runs the worker method on every job, in nprocs processes if nprocs
+    is more than 1, and returns the results in the order of the jobs
+    (PRIVATE).
+    """
+    if nprocs > 1 and len(jobs) > 1:
+        pool = Pool(nprocs)
+        try:
+            results = pool.map(worker, jobs)
+        finally:
+            pool.close()
+            pool.join()
+        return results
+    return [worker(job) for job in jobs]
+
+def _sorted_counts(counts):
+    """
+    Returns the counts as an ordered dictionary, the largest count first
+    (PRIVATE).
+    """
+    return OrderedDict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])))
+
+def _build_stats(fname, fmt, combos, proteins, exp_triplets, taxon_id):
+    """
+    Builds the statistics from the counts of the combinations, the number
+    of proteins by taxon and the EXP triplets (PRIVATE). taxon_id turns
+    the taxon of the input file into a taxon id.
+    """
+    groups = dict((name, defaultdict(int)) for name in
+                  ['ontology', 'evidence', 'taxon', 'assigned_by'])
+    for (evidence, aspect, taxon, assigned_by), count in combos.iteritems():
+        groups['evidence'][evidence] += count
+        groups['ontology'][ONTOLOGY_NAMES.get(aspect, aspect)] += count
+        groups['taxon'][taxon_id(taxon)] += count
+        groups['assigned_by'][assigned_by] += count
+    proteins_by_taxon = defaultdict(int)
+    for taxon, count in proteins.iteritems():
+        proteins_by_taxon[taxon_id(taxon)] += count
+    exp_proteins = set()
+    exp_by_ontology = defaultdict(set)
+    exp_by_taxon = defaultdict(set)
+    for protein, aspect, taxon in exp_triplets:
+        exp_proteins.add(protein)
+        exp_by_ontology[ONTOLOGY_NAMES.get(aspect, aspect)].add(protein)
+        exp_by_taxon[taxon_id(taxon)].add(protein)
+
+    stats = OrderedDict()
+    stats['file'] = fname
+    stats['format'] = fmt
+    stats['records'] = sum(combos.itervalues())
+    stats['proteins'] = sum(proteins_by_taxon.itervalues())
+    stats['proteins_exp'] = len(exp_proteins)
+    for name in ['ontology', 'evidence', 'taxon', 'assigned_by']:
+        stats[name] = _sorted_counts(groups[name])
+    stats['proteins_by_taxon'] = _sorted_counts(proteins_by_taxon)
+    stats['proteins_exp_by_ontology'] = _sorted_counts(
+        dict((k, len(v)) for k, v in exp_by_ontology.iteritems()))
+    stats['proteins_exp_by_taxon'] = _sorted_counts(
+        dict((k, len(v)) for k, v in exp_by_taxon.iteritems()))
+    return stats
+
+def gaf_stats(goa_fname, EXP_default=set([]), nprocs=1):
+    """
+    Returns the statistics of the UniProt-GOA file goa_fname. The file is
+    read once, in nprocs byte ranges scanned in parallel. A protein whose
+    lines are split between two ranges is counted once. It raises a 
+    ValueError if the file is not sorted by DB_Object_ID.
+    """
+    jobs = [(goa_fname, start, end, EXP_default) for start, end in
+            GOAParser.find_line_offsets(goa_fname, max(nprocs, 1))]
+    combos = defaultdict(int)
+    runs = defaultdict(int)
+    exp_triplets = set()
+    prev_last = None
+    for chunk_combos, chunk_runs, chunk_exp, first, last in \
+            _run_jobs(_gaf_chunk, jobs, nprocs):
+        for key, count in chunk_combos.iteritems():
+            combos[key] += count
+        for key, count in chunk_runs.iteritems():
+            runs[key] += count
+        exp_triplets.update(chunk_exp)
+        if first is not None:
+            if prev_last is not None and first[0] < prev_last:
+                raise ValueError(goa_fname + ' is not sorted by ' + \
+                                 'DB_Object_ID: ' + first[0])
+            # The run that continues from the previous range:
+            if first[0] == prev_last:
+                runs[first[1]] -= 1
+            prev_last = last
+    return _build_stats(goa_fname, 'gaf', combos, runs, exp_triplets,
+                        _taxon_id)
+
+def sprot_stats(sprot_fname, EXP_default=set([]), nprocs=1):
+    """
+    Returns the statistics of the UniProtKB/SwissProt file sprot_fname.
+    With more than one process, the file is split into chunks at record
+    boundaries (see Filter_sp_targets.find_chunk_offsets) that are
+    counted in parallel.
+    """
+    if nprocs <= 1:
+        results = [_count_sprot_records(sp.parse(open(sprot_fname, 'r')),
+                                        EXP_default)]
+    else:
+        # Several chunks per process keep the workers busy:
+        jobs = [(sprot_fname, start, end, EXP_default) for start, end in
+                ft.find_chunk_offsets(sprot_fname, nprocs * 4)]
+        results = _run_jobs(_sprot_chunk, jobs, nprocs)
+    combos = defaultdict(int)
+    proteins = defaultdict(int)
+    exp_triplets = set()
+    for chunk_combos, chunk_proteins, chunk_exp in results:
+        for key, count in chunk_combos.iteritems():
+            combos[key] += count
+        for key, count in chunk_proteins.iteritems():
+            proteins[key] += count
+        exp_triplets.update(chunk_exp)
+    return _build_stats(sprot_fname, 'sprot', combos, proteins,
+                        exp_triplets, lambda taxon: taxon)
+
+def file_stats(fname, EXP_default=set([]), nprocs=1):
+    """
+    Returns the statistics of the UniProt-GOA or UniProtKB/SwissProt file
+    fname. It raises a ValueError if the file is in neither format.
+    """
+    fmt = detect_format(fname)
+    if fmt == 'gaf':
+        return gaf_stats(fname, EXP_default, nprocs)
+    elif fmt == 'sprot':
+        return sprot_stats(fname, EXP_default, nprocs)
+    raise ValueError('File must be in UniProt-GOA or UniProtKB/SwissProt ' +
+                     'format: ' + fname)
+
+def write_json(stats, handle):
+    """
+    Writes the statistics to the file handle handle as a JSON object.
+    """
+    json.dump(stats, handle, indent=1)
+    handle.write('\n')
+
+def write_tsv(stats, handle):
+    """
+    Writes the statistics to the file handle handle as lines of group,
+    key and count separated by tabs. The counts of the whole file have
+    the key 'all'.
+    """
+    for name in stats:
+        if isinstance(stats[name], dict):
+            for key in stats[name]:
+                handle.write('%s\t%s\t%d\n' % (name, key, stats[name][key]))
+        elif not isinstance(stats[name], basestring):
+            handle.write('%s\tall\t%d\n' % (name, stats[name]))
+
+if __name__ == '__main__':
+    print (sys.argv[0] + ':')
+    print(__doc__)
+    sys.exit(0)
@@ -10,10 +10,12 @@
         fh_sport: file handle to a UniProtKB/SwissProt file.
         goa_file_name: file name of a UniProt-GOA file.
         taxon_id: a taxonomy id for an organism.
-        fh_merged_go: file handle to the output file which already has 
-            all the records copied into from the UniProt-GOA file named 
-            goa_file_name.
-        This method goes over each record in fh_sprot file, checks
+        fh_merged_go: file handle to the output file. All the records
+            of the UniProt-GOA file named goa_file_name are copied into
+            it before any new record is appended.
+        This method first copies the UniProt-GOA file to the output
+        file by invoking copy_goa_build_index. Then it goes over each
+        record in fh_sprot file, checks
         whether that record is already in the UniProt-GOA file
         goa_file_name, and if it is NOT found there, the method
         coverts the UniProtKB/SwissProt record to a UniProt-GOA record
@@ -24,12 +26,26 @@
         It returns an iterator object for an input UniProt-GOA file along
         with a list of all fieldnames of the UniProt-GOA file. 
 
-    swissProt2GOA(sprotRec, crossRef, fields=GOAParser.GAF20FIELDS):
-        This method extracts the required information from a 
-        UniProtKB/SwissProt record and construct a UniProt-GOA record. 
-        It invokes other methods defined in this module to extract 
-        the different fields from the SwissProt record. At the end,
-        it returns the newly constructed UniProt-GOA record.
+    copy_goa_build_index(fh_goa, fh_merged_go):
+        It copies every line of the UniProt-GOA file fh_goa to the output
+        file fh_merged_go and, in the same pass, builds a dictionary of
+        the proteins and their GO terms. It returns this dictionary along
+        with a list of all fieldnames of the UniProt-GOA file.
+
+    sprot_record_context(sprotRec, fields=GOAParser.GAF20FIELDS):
+        This method extracts the fields of a UniProt-GOA record that are
+        the same for all the GO terms of a UniProtKB/SwissProt record 
+        (symbol, reference, synonyms, taxon, date, etc.) and returns
+        them as a dictionary. It invokes other methods defined in this
+        module to extract the different fields from the SwissProt record.
+
+    swissProt2GOA(sprotRec, crossRef, fields=GOAParser.GAF20FIELDS,
+                  context=None):
+        This method constructs a UniProt-GOA record from a 
+        UniProtKB/SwissProt record and one of its GO terms (crossRef).
+        The protein level fields are copied from context, which is
+        computed by sprot_record_context once per SwissProt record. 
+        At the end, it returns the newly constructed UniProt-GOA record.
 
     The following methods facilitate swissProt2GOA method to construct the
     UniProt-GOA record by extracting information from a UniProtKB/SwissProt
@@ -81,7 +97,7 @@ import calendar
 from datetime import datetime
 from dateutil import relativedelta
 
-from Bio import SwissProt as sp
+import SwissProtParser as sp
 import GOAParser
 import GOAParser_cafa as gc
 
@@ -109,6 +125,9 @@ def assignSymbol(sprotRec):
     return symbol
 
 def assignGO_REF(sprotRec, crossRef):
+    # No GO_REF is assigned, for any cross-reference. crossRef is not
+    # used: sprot_record_context relies on this to compute DB:Reference
+    # once per record (it passes None as crossRef).
     go_ref = ''
     return go_ref
 
@@ -139,14 +158,16 @@ def assignDB_REF(sprotRec, crossRef):
     the rules described in: 
         ftp://ftp.ebi.ac.uk/pub/databases/GO/goa/UNIPROT/README
     """
-    if (find_pubmed(sprotRec) is not None):
-        return 'PMID' + ':' + find_pubmed(sprotRec)
-    elif (find_doi(sprotRec) is not None):
-        return 'DOI' + ':' + find_doi(sprotRec)
-    elif (find_reactome_id(sprotRec) is not None):
-        return 'Reactome' + ':' + find_reactome_id(sprotRec)
-    else:
-        return assignGO_REF(sprotRec, crossRef)
+    pubmed = find_pubmed(sprotRec)
+    if (pubmed is not None):
+        return 'PMID' + ':' + pubmed
+    doi = find_doi(sprotRec)
+    if (doi is not None):
+        return 'DOI' + ':' + doi
+    reactome_id = find_reactome_id(sprotRec)
+    if (reactome_id is not None):
+        return 'Reactome' + ':' + reactome_id
+    return assignGO_REF(sprotRec, crossRef)
      
 def assignSynonym(sprotRec):
     synonym = []
@@ -185,42 +206,69 @@ def assignDate(sprotRec):
     mm_2 = ((((sprotRec.annotation_update[0]).split('-'))[1]).title())
     dd_2 =((sprotRec.annotation_update[0]).split('-'))[0]
   
+    # The date is in the YYYYMMDD form of the GAF Date column, so that 
+    # the dates compare as strings (see Benchmark --cutoff):
     if (datetime(int(yy_1), Months.index(mm_1),int(dd_1)) < \
         datetime(int(yy_2), Months.index(mm_2), int(dd_2))):
-        date = yy_2 + str(Months.index(mm_2)) + dd_2
+        date = yy_2 + '%02d' % Months.index(mm_2) + dd_2
     else:
-        date = yy_1 + str(Months.index(mm_1)) + dd_1
+        date = yy_1 + '%02d' % Months.index(mm_1) + dd_1
     return date
 
-def swissProt2GOA(sprotRec, crossRef, fields=GOAParser.GAF20FIELDS):
+def sprot_record_context(sprotRec, fields=GOAParser.GAF20FIELDS):
+    """
+     This method takes a SwissProt record and computes the fields of the 
+     UniProt-GOA record that are the same for all the GO terms of the 
+     protein: DB_Object_ID, DB_Object_Symbol, DB:Reference, Synonym,
+     Taxon_ID, Date, etc. It returns them as a dictionary, which 
+     swissProt2GOA uses to construct one UniProt-GOA record for each 
+     GO term of the protein.
+    """
+    # Protein level fields of GAF10FIELDS (GAF 1.0):
+    context = {'DB':'SwissProt', # 'SwissProt' is assigned to DB
+               'DB_Object_ID': sprotRec.accessions[0],
+               'DB_Object_Symbol': assignSymbol(sprotRec),
+               'Qualifier': [''], # is assinged an empty list
+               # DB:Reference is the same for all the GO terms of the
+               # protein only because assignGO_REF does not look at the
+               # cross-reference; if it ever does, DB:Reference has to
+               # move to the GO term level fields of swissProt2GOA:
+               'DB:Reference': assignDB_REF(sprotRec, None),
+               'With': [''],
+               'Synonym': assignSynonym(sprotRec),
+               'DB_Object_Type': 'protein',
+               'Taxon_ID': assignTaxoId(sprotRec),
+               'Date': assignDate(sprotRec)
+               }
+    # Two extra fields are defined for GAF20FIELDS (GAF 2.0):
+    if len(fields) == 17:
+        context['Annotation_Extension'] = '' 
+        context['Gene_Product_Form_ID'] = '' 
+    return context
+
+def swissProt2GOA(sprotRec, crossRef, fields=GOAParser.GAF20FIELDS,
+                  context=None):
     """
      This method takes a SwissProt record and GO term information
      (crossRef) as input arguments. It then constructs a GOA
      dictionary using the 'fields' as keys and values taken from
      sprotRec, and then returns the constructed GOA record.
+     The protein level fields are taken from context, the dictionary
+     returned by sprot_record_context for sprotRec. When context is not
+     given, they are computed from sprotRec. 
     """
-    # 15 fields are defined for GAF10FIELDS (GAF 1.0):
-    goaRec = {'DB':'SwissProt', # 'SwissProt' is assigned to DB
-              'DB_Object_ID': sprotRec.accessions[0],
-              'DB_Object_Symbol': assignSymbol(sprotRec),
-              'Qualifier': [''], # is assinged an empty list
-              'GO_ID': crossRef[1],
-              'DB:Reference': assignDB_REF(sprotRec, crossRef),
-              'Evidence': (crossRef[3].split(':'))[0],
-              'With': [''],
-              'Aspect': (crossRef[2].split(':'))[0],
-              'DB_Object_Name' : (crossRef[2].split(':'))[1],
-              'Synonym': assignSynonym(sprotRec),
-              'DB_Object_Type': 'protein',
-              'Taxon_ID': assignTaxoId(sprotRec),
-              'Date': assignDate(sprotRec),
-              'Assigned_By': (crossRef[3].split(':'))[1]
-              }
-#    print goaRec['DB:Reference']
-    # Two extra fields are defined for GAF20FIELDS (GAF 2.0):
-    if len(fields) == 17:
-        goaRec['Annotation_Extension'] = '' 
-        goaRec['Gene_Product_Form_ID'] = '' 
+    if context is None:
+        context = sprot_record_context(sprotRec, fields)
+    # The list fields are shared among the records of a protein:
+    goaRec = dict(context)
+    # GO term level fields:
+    evidence, assigned_by = crossRef[3].split(':')[0:2]
+    aspect, go_name = crossRef[2].split(':')[0:2]
+    goaRec['GO_ID'] = crossRef[1]
+    goaRec['Evidence'] = evidence
+    goaRec['Aspect'] = aspect
+    goaRec['DB_Object_Name'] = go_name
+    goaRec['Assigned_By'] = assigned_by
     return goaRec
 
 def create_iterator(infile):
@@ -243,29 +291,60 @@ def create_iterator(infile):
     iter_handle = GOAParser.gafiterator(infile_handle)
     return iter_handle, GAFFIELDS
 
-def appendSprot2goa(fh_sprot, goa_file_name, taxon_id, fh_merged_go):
+def copy_goa_build_index(fh_goa, fh_merged_go):
     """
-     This method reads each reacord from the UniProtKB/SwissProt file
-     and checks wither it's for taxon_id. If it is, this method
-     then checks whether the GO term exists in the UniProt-GOA file
-     passed as the file name goa_file_name. If it is a new GO term, 
-     this method invokes swissProt2GOA method for each such GO term 
-     to construct a UniProt-GOA record which it appends at the end of 
-     the merged UniProt-GOA file passed as file handle fh_merged_go. 
+     This method reads the UniProt-GOA file passed as the file handle
+     fh_goa line by line. Every line (header lines included) is written
+     unchanged to the merged output file passed as the file handle
+     fh_merged_go, and in the same pass the proteins and their
+     [GO ID, Evidence, Aspect] triples are collected into a dictionary.
+     At the end, it returns this dictionary along with the list of
+     field names of the UniProt-GOA file.
     """
-    # Creates an iterator object for t1 file:
-    iter_handle, GAFFIELDS = create_iterator(goa_file_name) 
-
-    # Construct a dictionary goa_dict with the proteins and 
-    # the corresponding GO terms in t1 file:
     goa_dict = {}
-    for ingen in iter_handle:
-        if ingen['DB_Object_ID'] in goa_dict.keys():
-            goa_dict[ingen['DB_Object_ID']].append([ingen['GO_ID'], \
-                            ingen['Evidence'], ingen['Aspect']])
+    GAFFIELDS = None
+    for inline in fh_goa:
+        # Copy the line to the merged output file:
+        fh_merged_go.write(inline)
+        if inline[0] == '!':
+            continue
+        inrec = inline.rstrip('\n').split('\t')
+        if len(inrec) == 1:
+            continue
+        # The first record decides the GAF version:
+        if GAFFIELDS is None:
+            if len(inrec) == 17:
+                GAFFIELDS = GOAParser.GAF20FIELDS
+            else:
+                GAFFIELDS = GOAParser.GAF10FIELDS
+        # Columns 1, 4, 6, and 8: protein name, GO ID, Evidence and Aspect:
+        if inrec[1] in goa_dict:
+            goa_dict[inrec[1]].append([inrec[4], inrec[6], inrec[8]])
         else:
-            goa_dict[ingen['DB_Object_ID']] = [[ingen['GO_ID'], \
-                           ingen['Evidence'], ingen['Aspect']]]
+            goa_dict[inrec[1]] = [[inrec[4], inrec[6], inrec[8]]]
+    if GAFFIELDS is None:
+        GAFFIELDS = GOAParser.GAF10FIELDS
+    return goa_dict, GAFFIELDS
+
+def appendSprot2goa(fh_sprot, goa_file_name, taxon_id, fh_merged_go):
+    """
+     This method first copies the UniProt-GOA file passed as the file
+     name goa_file_name to the merged UniProt-GOA file passed as file
+     handle fh_merged_go, building a dictionary of its GO terms while
+     copying. It then reads each reacord from the UniProtKB/SwissProt
+     file and checks wither it's for taxon_id. If it is, this method
+     then checks whether the GO term exists in the UniProt-GOA file.
+     If it is a new GO term, this method invokes swissProt2GOA method
+     for each such GO term to construct a UniProt-GOA record which it
+     appends at the end of the merged UniProt-GOA file. Thus the
+     UniProt-GOA file is read only once.
+    """
+    # Copy the GOA file to the output file and construct a dictionary 
+    # goa_dict with the proteins and the corresponding GO terms in 
+    # the GOA file, all in one pass:
+    fh_goa = open(goa_file_name, 'r')
+    goa_dict, GAFFIELDS = copy_goa_build_index(fh_goa, fh_merged_go)
+    fh_goa.close()
 
     # EXTRACTS the NEW GO terms in t2 file that are NOT found in t1 file:
     goCount = 0
@@ -278,11 +357,14 @@ def appendSprot2goa(fh_sprot, goa_file_name, taxon_id, fh_merged_go):
                 # knownProt is an indicator to detect whether the
                 # current sprot protein is already in GOA file:
                 knownProt = ""
-                if rec.accessions[ac] in goa_dict.keys():
+                if rec.accessions[ac] in goa_dict:
                     # If the current sprot protein is already in the GOA
                     # file, the sprot protein is assigned to knownProt:
                     knownProt = rec.accessions[ac]
                     break
+            # Protein level fields are computed once per record, 
+            # when the first new GO annotation is found:
+            context = None
             # Going over the list of GO information:
             for crossRef in rec.cross_references:
                 # Consider the cross_reference entries that relate to GO DB:
@@ -299,7 +381,10 @@ def appendSprot2goa(fh_sprot, goa_file_name, taxon_id, fh_merged_go):
                         #    is not found in the GOA file
 
                         # Convert the sprot record to a GOA record:
-                        goaRec = swissProt2GOA(rec, crossRef, GAFFIELDS)
+                        if context is None:
+                            context = sprot_record_context(rec, GAFFIELDS)
+                        goaRec = swissProt2GOA(rec, crossRef, GAFFIELDS,
+                                               context)
                         # Write the converted GOA record to the output file:
                         GOAParser.writerec(goaRec, fh_merged_go, GAFFIELDS)
 #                        if goCount in range(1, 20) or goCount in range(6400, 6420):
@@ -31,6 +31,11 @@
        This method verifies the correctness of the user supplied
        arguments and puts them into an ordered dictionary which the method 
        returns at the end. 
+
+   arg_error:
+       This method reports an error in the user supplied arguments. It
+       prints the usage of the program on the command line and raises a
+       ValueError when the arguments come from CafaToolset.
 '''
 
 import os
@@ -97,6 +102,33 @@ def collect_args(prog='benchmark'):
                     'All GO terms and proteins annotated in them will ' + \
                     'be eliminated from the benchmark set. Default is ' + \
                     'an empty list.')
+    parser.add_argument('--ptf_engine', default='dict', choices=['dict',
+                    'numpy'], help='Selects how the paper counts of the ' + \
+                    'confidence filter are computed: with dictionaries ' + \
+                    '(dict) or with numpy arrays (numpy), which needs ' + \
+                    'about half the memory for large files but looks up ' + \
+                    'the paper count of a record more slowly. Default ' + \
+                    'is dict.')
+    if prog == 'benchmark':
+        parser.add_argument('--streaming', action='store_true', help= \
+                    'Creates the benchmark sets by reading the two input ' + \
+                    'files protein by protein, without the intermediate ' + \
+                    'files. Both input files must be sorted by ' + \
+                    'DB_Object_ID. By default, it is turned off.')
+        parser.add_argument('--split-by-taxon', dest='split_by_taxon',
+                    action='store_true', help='Also writes the benchmark ' + \
+                    'sets of each taxon, and a table of the number of ' + \
+                    'benchmark proteins by taxon, in the same run. It is ' + \
+                    'useful with several organisms in -G. By default, it ' + \
+                    'is turned off.')
+        parser.add_argument('--cutoff', default='', help='Creates ' + \
+                    'approximate benchmark sets from the single input ' + \
+                    'file given with -I2: the annotations dated on or ' + \
+                    'before the cutoff date (YYYYMMDD or YYYY-MM-DD) are ' + \
+                    'taken as the annotations at time t1. The input file ' + \
+                    'must be sorted by DB_Object_ID. When -I1 is also ' + \
+                    'given, the benchmark sets are compared with the ones ' + \
+                    'created from the two input files.')
     return parser
 
 def extract_args(args, prog):
@@ -119,32 +151,49 @@ def extract_args(args, prog):
     args_dict['Threshold'] = args.threshold # Default: 4
     args_dict['Pubmed'] = args.pubmed # Default: 'F' 
     args_dict['Blacklist'] = args.blacklist # Default: [] 
+    args_dict['ptf_engine'] = args.ptf_engine # Default: 'dict'
+    if prog == 'benchmark':
+        args_dict['streaming'] = args.streaming # Default: False
+        args_dict['split_by_taxon'] = args.split_by_taxon # Default: False
+        args_dict['cutoff'] = args.cutoff # Default: ''
     return args_dict
     
+def arg_error(parser, message):
+    """
+    This method reports an error in the user arguments. On the command 
+    line (parser is given), it prints the message and the usage of the 
+    program, which quits. Otherwise (see CafaToolset), it raises a 
+    ValueError with the message.
+    """
+    if parser is None:
+        raise ValueError(message)
+    print message + '\n'
+    print parser.parse_args(['--help'])
+
 def check_args(args_dict, parser):
     """ 
     This method checks the consistency of the user arguments. It builds 
     a new ordered dictionary of the input arguments and returns the 
     created dictionary at the end.
+    When parser is None (see CafaToolset), a ValueError is raised 
+    for incorrect arguments.
     """
     user_dict = OrderedDict() 
     for arg in args_dict:
         if arg == 't1':
-            if args_dict[arg] == None:
-                print 'Missing input file at time t1\n'
-                print parser.parse_args(['--help'])
+            # With a cutoff date, the file at t1 is optional:
+            if args_dict[arg] == None and not args_dict.get('cutoff'):
+                arg_error(parser, 'Missing input file at time t1')
             else:
                 user_dict['t1'] = args_dict[arg]
         elif arg == 't2':
             if args_dict[arg] == None:
-                print 'Missing input file at time t2\n'
-                print parser.parse_args(['--help'])
+                arg_error(parser, 'Missing input file at time t2')
             else:
                 user_dict['t2'] = args_dict[arg]
         elif arg == 't3':
             if args_dict[arg] == None:
-                print 'Missing the benchmark file name\n'
-                print parser.parse_args(['--help'])
+                arg_error(parser, 'Missing the benchmark file name')
             else:
                 user_dict['t3'] = args_dict[arg]
         elif arg == 'outfile':
@@ -155,6 +204,18 @@ def check_args(args_dict, parser):
             user_dict[arg] = args_dict[arg]
         elif arg == 'Pubmed':
             user_dict[arg] = args_dict[arg]
+        elif arg == 'streaming' or arg == 'ptf_engine' or \
+             arg == 'split_by_taxon':
+            user_dict[arg] = args_dict[arg]
+        elif arg == 'cutoff':
+            # Cutoff date in the YYYYMMDD form of the GAF Date column:
+            date = re.match('^(\d{4})-?(\d{2})-?(\d{2})$', args_dict[arg])
+            if args_dict[arg] == '':
+                user_dict[arg] = ''
+            elif date is None:
+                arg_error(parser, 'Invalid cutoff date: ' + args_dict[arg])
+            else:
+                user_dict[arg] = ''.join(date.groups())
         elif arg == 'Taxon_ID':
             if 'all' in args_dict[arg] or len(args_dict[arg]) == 0:
                 user_dict[arg] = set([]) 
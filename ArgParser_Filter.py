@@ -17,6 +17,11 @@
 
     parse_args: This method calls the above methods and returns the final 
         dictionary of the user supplied arguments to the calling point.
+
+    arg_error: This method reports an error in the user supplied 
+        arguments. It prints the usage of the program on the command 
+        line and raises a ValueError when the arguments come from 
+        CafaToolset.
 '''
 
 import os
@@ -35,9 +40,20 @@ def collect_args():
         'UniProt-SwissProt file.')
     parser.add_argument('-I1', '--input1', help=' Specifies path to a ' + \
         'UniProt-SwissProt file. This opton is mandatory.')
-    parser.add_argument('-G','--organism', help=' Specifies an organism ' + \
-       'id, for example, 559292 for Saccharomyces cerevisiae. This opton ' + \
-        'is mandatory.')
+    parser.add_argument('-G','--organism', nargs='*', default=[], help= \
+       ' Specifies a list of organism ids separated by space, for ' + \
+       'example, 559292 for Saccharomyces cerevisiae. Either this ' + \
+       'option or -F is mandatory.')
+    parser.add_argument('-F','--organism_file', default='', help= \
+       ' Specifies a file of organism ids, one organism id per line. ' + \
+       'The targets for all the organisms are generated in one scan of ' + \
+       'the UniProt-SwissProt file.')
+    parser.add_argument('-P','--processes', type=int, default=1, help= \
+       ' Specifies the number of processes to use for filtering the ' + \
+       'UniProt-SwissProt file. Default is 1.')
+    parser.add_argument('-W','--width', type=int, default=60, help= \
+       ' Specifies the number of residues per line in the target ' + \
+       'sequence files. Use 0 for no wrapping. Default is 60.')
     parser.add_argument('-O', '--output', default='', help='Provides user ' + \
         'an option to specify an output filename prefix. When not ' + \
         'specified, the program will create an output file name.')
@@ -52,30 +68,62 @@ def extract_args(args):
     args_dict['t1'] = args.input1
     args_dict['outfile'] = args.output
     args_dict['g'] = args.organism
+    args_dict['gfile'] = args.organism_file
+    args_dict['nprocs'] = args.processes
+    args_dict['width'] = args.width
     return args_dict
     
+def arg_error(parser, message):
+    """
+    This method reports an error in the user arguments. On the command 
+    line (parser is given), it prints the message and the usage of the 
+    program, which quits. Otherwise (see CafaToolset), it raises a 
+    ValueError with the message.
+    """
+    if parser is None:
+        raise ValueError(message)
+    print (message + '\n')
+    print (parser.parse_args(['--help']))
+
 def check_args(args_dict,parser):
     """
     This method checks the user arguments for consistency. It builds a new 
     dictionary from these arguments and finally returns this newly created 
     dictionary. 
+    When parser is None (see CafaToolset), a ValueError is raised 
+    for incorrect arguments.
     """
     user_dict = OrderedDict() 
     for arg in args_dict:
         if arg == 't1':
             if args_dict[arg] == None:
-                print ('Missing Uniprot-SwissProt file\n')
-                print (parser.parse_args(['--help']))
+                arg_error(parser, 'Missing Uniprot-SwissProt file')
             else:
                 user_dict['t1'] = args_dict[arg]
         elif arg == 'outfile':
             user_dict[arg] = args_dict[arg]
         elif arg == 'g':
-            if args_dict[arg] == None: 
-                print('Missing organism id\n')
-                print (parser.parse_args(['--help']))
-            else:
-                user_dict['g'] = args_dict[arg]
+            # Collect the organism ids from the command line and from
+            # the organism file, keeping the order and dropping repeats:
+            taxa = [x for x in args_dict[arg] if x]
+            if args_dict['gfile']:
+                if not os.path.exists(args_dict['gfile']):
+                    arg_error(parser, 'Organism file not found: ' + \
+                                      args_dict['gfile'])
+                for line in open(args_dict['gfile'], 'r'):
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        taxa.append(line.split()[0])
+            user_dict['g'] = []
+            for x in taxa:
+                if x not in user_dict['g']:
+                    user_dict['g'].append(x)
+            if len(user_dict['g']) == 0:
+                arg_error(parser, 'Missing organism id')
+        elif arg == 'nprocs':
+            user_dict[arg] = max(1, args_dict[arg])
+        elif arg == 'width':
+            user_dict[arg] = max(0, args_dict[arg])
         elif arg == 'Taxon_ID':
             if 'all' in args_dict[arg] or len(args_dict[arg]) == 0:
                 user_dict[arg] = set([])
@@ -22,6 +22,11 @@
         This method verifies the correctness of the user supplied arguments 
         and puts them into an ordered dictionary which it returns at the 
         end. 
+
+    arg_error: This method reports an error in the user supplied 
+        arguments. It prints the usage of the program on the command 
+        line and raises a ValueError when the arguments come from 
+        CafaToolset.
 '''
 
 import os
@@ -66,33 +71,44 @@ def extract_args(args):
     args_dict['g'] = args.organism
     return args_dict
     
+def arg_error(parser, message):
+    """
+    This method reports an error in the user arguments. On the command 
+    line (parser is given), it prints the message and the usage of the 
+    program, which quits. Otherwise (see CafaToolset), it raises a 
+    ValueError with the message.
+    """
+    if parser is None:
+        raise ValueError(message)
+    print (message + '\n')
+    print (parser.parse_args(['--help']))
+
 def check_args(args_dict, parser):
     """
     This method checks the user arguments for consistency. It builds a new
     dictionary from these arguments and finally returns this newly created 
     dictionary.
+    When parser is None (see CafaToolset), a ValueError is raised 
+    for incorrect arguments.
     """
 
     user_dict = OrderedDict() 
     for arg in args_dict:
         if arg == 't1':
             if args_dict[arg] == None:
-                print ('Missing Uniprot-SwissProt file\n')
-                print (parser.parse_args(['--help']))
+                arg_error(parser, 'Missing Uniprot-SwissProt file')
             else:
                 user_dict['t1'] = args_dict[arg]
         elif arg == 't2':
             if args_dict[arg] == None:
-                print ('Missing Uniprot-GOA file\n')
-                print (parser.parse_args(['--help']))
+                arg_error(parser, 'Missing Uniprot-GOA file')
             else:
                 user_dict['t2'] = args_dict[arg]
         elif arg == 'outfile':
             user_dict[arg] = args_dict[arg]
         elif arg == 'g':
             if args_dict[arg] == None: 
-                print('Missing organism id\n')
-                print (parser.parse_args(['--help']))
+                arg_error(parser, 'Missing organism id')
             else:
                 user_dict['g'] = args_dict[arg]
         elif arg == 'Taxon_ID':
@@ -0,0 +1,1356 @@
+#!/usr/bin/env python
+
+'''
+   This module runs the tools of the CAFA Toolset (Benchmark, Verify,
+   Filter and Mergedb) inside a Python program. Its methods take the
+   options of a tool as arguments, never read sys.argv nor ask for a
+   configuration file, raise a ToolsetError (a ValueError) instead of
+   quitting the program, and return a result object. Several runs can
+   thus be made in one process. The command line programs are thin
+   wrappers over the tool classes of this module.
+
+   The options are the long names of the command line options (see the
+   ArgParser modules), for example:
+
+       import CafaToolset as ct
+       result = ct.benchmark('goa_yeast.23', 'goa_yeast.52',
+                             config={'workdir': 'workspace'},
+                             organism=['559292'], streaming=True)
+       print result.benchmark_files['LK_bpo'], result.proteins['LK_bpo']
+
+   benchmark(t1, t2, config=None, **options):
+       This method creates the benchmark sets of the annotation files t1
+       and t2 (see Benchmark) and returns a BenchmarkResult.
+
+   verify(t1, t2, t3, config=None, **options):
+       This method verifies the benchmark sets of the benchmark file t3
+       (see Verify) and returns a VerifyResult.
+
+   filter_targets(t1, organisms, config=None, **options):
+       This method creates the target sequence files of the organisms
+       from the UniProtKB/SwissProt file t1 (see Filter) and returns a
+       FilterResult.
+
+   mergedb(t1, t2, organism, config=None, **options):
+       This method merges the UniProtKB/SwissProt file t1 with the
+       UniProt-GOA file t2 for the organism (see Mergedb) and returns a
+       MergedbResult.
+
+   load_config(config=None):
+       This method returns the configuration entries of a run: config
+       is None, a configuration file name or a dictionary of entries.
+       It never creates a configuration file.
+
+   tool_params(parser, extract_args, check_args, options):
+       This method builds the dictionary of user arguments of a tool
+       from the default values of its command line parser and options.
+
+   BenchmarkTool, VerifyTool, FilterTool and MergedbTool:
+       These classes take the dictionary of user arguments (see the
+       ArgParser modules) and the configuration entries (see Config)
+       and do the work of the command line programs. Their run methods
+       return the result objects.
+
+   The modules that only one tool needs (AppendSprot2GOA for Mergedb,
+   Filter_sp_targets for Filter) are imported by the run method of that
+   tool, so that the other tools start without loading them.
+'''
+
+import os
+import sys
+from os.path import basename
+from collections import OrderedDict
+
+import GOAParser as GOA
+
+import ArgParser_Benchmark as apb
+import ArgParser_Filter as apf
+import ArgParser_Mergedb as apm
+import Config
+import CreateBenchmark as cb
+import FormatChecker as fc
+import GOAParser_cafa as gc
+import LocateDataset as ld
+import PaperTermFrequency as ptf
+import verifyBenchmark as vb
+
+# Default configuration file name:
+config_filename = '.cafarc'
+# Default benchmark file name suffices:
+bmSuffix_LK_bpo = '.benchmark_LK_bpo.'
+bmSuffix_LK_cco = '.benchmark_LK_cco.'
+bmSuffix_LK_mfo = '.benchmark_LK_mfo.'
+bmSuffix_NK_bpo = '.benchmark_NK_bpo.'
+bmSuffix_NK_cco = '.benchmark_NK_cco.'
+bmSuffix_NK_mfo = '.benchmark_NK_mfo.'
+# Message of a benchmark file without errors (see VerifyTool):
+NO_ERROR = '\t\tno error in benchmark creation.'
+
+class ToolsetError(ValueError):
+    '''
+    The error raised by the tools of this module in place of quitting
+    the program. It is a ValueError, as are the errors of the user
+    arguments (see the check_args methods of the ArgParser modules).
+    '''
+    pass
+
+class BenchmarkResult:
+    '''
+    The result of a Benchmark run:
+        benchmark_files: the SIX benchmark file names, by benchmark type
+                         (LK_bpo, LK_cco, LK_mfo, NK_bpo, NK_cco, NK_mfo)
+        proteins:        the number of proteins in each benchmark file
+        taxon_files:     the benchmark file names of each taxon
+                         (split_by_taxon)
+        taxa_file:       the table of the proteins by taxon or None
+        comparison_file: the comparison with the benchmarks of the two
+                         files (cutoff) or None
+    '''
+    def __init__(self, benchmark_files, proteins, taxon_files, taxa_file,
+                 comparison_file):
+        self.benchmark_files = benchmark_files
+        self.proteins = proteins
+        self.taxon_files = taxon_files
+        self.taxa_file = taxa_file
+        self.comparison_file = comparison_file
+
+class VerifyResult:
+    '''
+    The result of a Verify run:
+        messages: the verification message of each benchmark file
+        failed:   the benchmark files whose verification found an error
+                  or that are missing, empty or not in the right format
+    '''
+    def __init__(self, messages):
+        self.messages = messages
+        self.failed = [f for f in messages if messages[f] != NO_ERROR]
+
+class FilterResult:
+    '''
+    The result of a Filter run:
+        files:   the target sequence file and the map file names of
+                 each organism
+        targets: the number of target sequences of each organism
+    '''
+    def __init__(self, files, targets):
+        self.files = files
+        self.targets = targets
+
+class MergedbResult:
+    '''
+    The result of a Mergedb run:
+        output_file: the merged UniProt-GOA file name
+        annotations: the number of annotations added from the
+                     UniProtKB/SwissProt file
+    '''
+    def __init__(self, output_file, annotations):
+        self.output_file = output_file
+        self.annotations = annotations
+
+def load_config(config=None):
+    """
+    This method returns the configuration entries (see Config.read_config)
+    without asking for them:
+        config is None: the entries of the configuration file of the
+            current directory if there is one, the default entries
+            otherwise (see Config.default_config)
+        config is a file name: the entries of the configuration file
+        config is a dictionary: the default entries updated with the
+            ones of the dictionary, for example {'workdir': 'workspace'}
+    """
+    if config is None:
+        if os.path.exists(config_filename):
+            return Config.parse_config(config_filename)
+        return Config.default_config()
+    if isinstance(config, basestring):
+        if not os.path.exists(config):
+            raise ToolsetError('Configuration file not found: ' + config)
+        return Config.parse_config(config)
+    ConfigParam = Config.default_config()
+    ConfigParam.update(config)
+    return ConfigParam
+
+def tool_params(parser, extract_args, check_args, options):
+    """
+    This method returns the dictionary of user arguments of a tool, as
+    the parse_args method of its ArgParser module does, from the
+    dictionary options of long option names (the dest names of parser)
+    and values. The options not given take their command line default
+    values. A single value is accepted for an option that takes a list.
+    """
+    args = parser.parse_args([])
+    for name in options:
+        if not hasattr(args, name):
+            raise ToolsetError('Unknown option: ' + name)
+        value = options[name]
+        if isinstance(getattr(args, name), list) and \
+           isinstance(value, basestring):
+            value = [value]
+        setattr(args, name, value)
+    try:
+        return check_args(extract_args(args), None)
+    except ValueError as e:
+        raise ToolsetError(str(e))
+
+def locate_goa_file(infile, work_dir):
+    """
+    This method returns the path of the UniProt-GOA file infile in the
+    workspace (see LocateDataset.locate_GOAfile), or raises a
+    ToolsetError if the file is not available.
+    """
+    if not os.path.exists(work_dir + '/' + basename(infile)) and \
+       not os.path.exists(infile):
+        raise ToolsetError(infile + ' is NOT available.')
+    return ld.locate_GOAfile(infile, work_dir)
+
+def locate_sprot_file(infile, work_dir):
+    """
+    This method returns the path of the UniProtKB/SwissProt file infile
+    (see LocateDataset.locate_SwissProtfile), or raises a ToolsetError
+    if the file is not available.
+    """
+    if not os.path.exists(infile) and \
+       not os.path.exists(work_dir + '/' + basename(infile)):
+        raise ToolsetError(infile + ' is NOT available.')
+    return ld.locate_SwissProtfile(infile, work_dir)
+
+def check_gaf_format(goa_fname):
+    """
+    This method raises a ToolsetError on any of the following
+    conditions:
+        Case 1: if the file is empty
+        Case 2: if the file is NOT in GAF format. To check this
+                it invokes check_gaf_format method of
+                FormatChecker module.
+    """
+    if os.stat(goa_fname).st_size == 0:
+        raise ToolsetError('You submitted an empty file: ' + goa_fname)
+    elif not fc.check_gaf_format(open(goa_fname, 'r')):
+        raise ToolsetError('File format error: ' + basename(goa_fname) + \
+                           '. File must be in GAF 1.0 or GAF 2.0 format')
+
+def check_sprot_format(sprot_fname):
+    """
+    This method raises a ToolsetError on any of the following
+    conditions:
+        Case 1: if the file is empty
+        Case 2: if the file is NOT in UniProtKB/SwissProt format.
+                To check this it invokes check_sprot_format method
+                of FormatChecker module.
+    """
+    if os.stat(sprot_fname).st_size == 0:
+        raise ToolsetError('You submitted an empty file: ' + sprot_fname)
+    elif not fc.check_sprot_format(open(sprot_fname, 'r')):
+        raise ToolsetError('File format error: ' + basename(sprot_fname) + \
+                           '. File must be in UniProtKB/SwissProt format')
+
+def benchmark(t1, t2, config=None, **options):
+    """
+    This method creates the benchmark sets of the UniProt-GOA files t1
+    and t2 and returns a BenchmarkResult. The options are the ones of
+    the Benchmark program (see ArgParser_Benchmark): output, organism,
+    ontology, evidence, source, confidence, threshold, pubmed,
+    blacklist, ptf_engine, streaming, split_by_taxon and cutoff. With
+    a cutoff date, t1 can be None.
+    """
+    options = dict(options, input1=t1, input2=t2)
+    parsed_dict = tool_params(apb.collect_args('benchmark'),
+                              lambda args: apb.extract_args(args,
+                                                            'benchmark'),
+                              apb.check_args, options)
+    return BenchmarkTool(parsed_dict, load_config(config)).run()
+
+def verify(t1, t2, t3, config=None, **options):
+    """
+    This method verifies the SIX benchmark files of the same version as
+    the benchmark file t3, created from the UniProt-GOA files t1 and t2,
+    and returns a VerifyResult. The options are the ones of the Verify
+    program (see ArgParser_Benchmark).
+    """
+    options = dict(options, input1=t1, input2=t2, input3=t3)
+    parsed_dict = tool_params(apb.collect_args('verify'),
+                              lambda args: apb.extract_args(args, 'verify'),
+                              apb.check_args, options)
+    return VerifyTool(parsed_dict, load_config(config)).run()
+
+def filter_targets(t1, organisms, config=None, **options):
+    """
+    This method creates the target sequence files of the organisms
+    (a list of taxon ids) from the UniProtKB/SwissProt file t1 and
+    returns a FilterResult. The options are the ones of the Filter
+    program (see ArgParser_Filter): organism_file, processes, width and
+    output.
+    """
+    options = dict(options, input1=t1, organism=organisms)
+    parsed_dict = tool_params(apf.collect_args(), apf.extract_args,
+                              apf.check_args, options)
+    return FilterTool(parsed_dict, load_config(config)).run()
+
+def mergedb(t1, t2, organism, config=None, **options):
+    """
+    This method merges the annotations of the organism (a taxon id) in
+    the UniProtKB/SwissProt file t1 with the UniProt-GOA file t2 and
+    returns a MergedbResult. The option output is the one of the
+    Mergedb program (see ArgParser_Mergedb).
+    """
+    options = dict(options, input1=t1, input2=t2, organism=organism)
+    parsed_dict = tool_params(apm.collect_args(), apm.extract_args,
+                              apm.check_args, options)
+    return MergedbTool(parsed_dict, load_config(config)).run()
+
+class BenchmarkTool:
+    def __init__(self, parsed_dict, ConfigParam):
+        # User supplied argument values (see ArgParser_Benchmark):
+        self.parsed_dict = parsed_dict
+        # Config file entries (see Config):
+        self.ConfigParam = ConfigParam
+        # Retreive file name at time t1:
+        t1 = self.parsed_dict['t1']
+        # Retreive file name at time t2:
+        t2 = self.parsed_dict['t2']
+        if self.parsed_dict['t1'] == self.parsed_dict['t2'] and \
+           not self.parsed_dict['cutoff']:
+            raise ToolsetError('Both input files are from the same time ' + \
+                               'point. This will not create a valid ' + \
+                               'benchmark set.')
+
+        # Retreive work directory name:
+        self.work_dir = (self.ConfigParam['workdir']).rstrip('/')
+
+        # Create work direcoty, if it does not exist:
+        if not os.path.exists(self.work_dir):
+            os.makedirs(self.work_dir)
+        # Locate t1 file (optional with a cutoff date):
+        if t1 is None:
+            self.t1_input_file = None
+        else:
+            self.t1_input_file = locate_goa_file(t1, self.work_dir)
+        # Locate t2 file:
+        self.t2_input_file = locate_goa_file(t2, self.work_dir)
+
+        # Names for SIX ouput files: bpo, cco, and mfo for 
+        # LK and NK benchmark types:
+        self.output_filename_LK_bpo = self.create_outfilename('LK_bpo')
+        self.output_filename_LK_cco = self.create_outfilename('LK_cco')
+        self.output_filename_LK_mfo = self.create_outfilename('LK_mfo')
+        self.output_filename_NK_bpo = self.create_outfilename('NK_bpo')
+        self.output_filename_NK_cco = self.create_outfilename('NK_cco')
+        self.output_filename_NK_mfo = self.create_outfilename('NK_mfo')
+
+        # Names for THREE files to store non-EXP and EXP type entries:
+        # These files will be deleted once the calculation is done
+
+        # File name for entries in t1 file with non-EXP evidence codes:
+        self.t1_iea_name = str(self.t1_input_file) + '.iea'
+
+        # File name for entries in t1 file with EXP evidence codes:
+        self.t1_exp_name = str(self.t1_input_file) + '.exp'
+
+        # File name for entries in t2 file with EXP evidence codes:
+        self.t2_exp_name = self.t2_input_file + '.exp'
+
+        # Name for GO ID frequency per pubmed id for t2 file:
+        # This file will be deleted once the calculations are done
+        self.t2_ptf_file =  self.t2_input_file + \
+                            '_with_annotations_per_paper.txt'
+        
+        # Names for SIX intermediate benchmark files:
+        self.bmfile_LK_bpo = self.t2_exp_name + '.bpo_LK_bench.txt'
+        self.bmfile_LK_cco = self.t2_exp_name + '.cco_LK_bench.txt'
+        self.bmfile_LK_mfo = self.t2_exp_name + '.mfo_LK_bench.txt'
+        self.bmfile_NK_bpo = self.t2_exp_name + '.bpo_NK_bench.txt'
+        self.bmfile_NK_cco = self.t2_exp_name + '.cco_NK_bench.txt'
+        self.bmfile_NK_mfo = self.t2_exp_name + '.mfo_NK_bench.txt'
+
+    def create_outfilename(self, ontType, taxon=None):
+        """
+        This method creates an output filename according to the following
+        rules: 
+            (1) When the user supplies the optional output filename prefix,
+                this method looks for the latest version of the related file
+                name in the workspace (See the while loop). It creates a new
+                file name for the subsequent version:
+
+                output_filename = self.work_dir + '/' + ob + '.' + str(index)
+            
+                This ensures that multiple runs of Benchmark program with the 
+                same arguments creates new version of output files.
+
+            (2) When the user does not supply the optional output filename 
+                prefix, this method creates a new prefix based on the two 
+                input data file names (See code in else block). Then the 
+                program looks for the latest version of the related file 
+                name in the workspace (See the while loop). Then, it creates
+                a new file name for the subsequent version:
+
+                output_filename = self.work_dir + '/' + ob + '.' + str(index)
+
+                Here again, this ensures that multiple runs of Benchmark 
+                program with the same arguments creates new version of output
+                files.
+
+            (3) When a taxon id is given (see split_benchmarks_by_taxon), 
+                it is inserted into the file name before '.benchmark'. 
+                With --split-by-taxon, the names of the benchmark files
+                of all the taxa do not have a taxon id.
+
+            (4) With a cutoff date (see create_date_sliced_benchmarks),
+                the cutoff date takes the place of the extension of the
+                input file name at t1 in the prefix.
+        At the end, the method returns the newly created filename.
+        """
+        if self.parsed_dict['cutoff']:
+            t1_tag = self.parsed_dict['cutoff']
+        else:
+            t1_tag = ((basename(self.parsed_dict['t1'])).split('.'))[-1]
+
+        if not self.parsed_dict['outfile'] == '':
+            ob = basename(self.parsed_dict['outfile'])
+            if taxon is not None:
+                ob = ob + '.' + taxon
+            ob = ob + '.benchmark' + '_' + ontType
+        else:
+            if taxon is not None:
+                ob = basename(self.parsed_dict['t2']) + '-' + t1_tag + \
+                    '.' + taxon + '.benchmark' + '_' + ontType
+            elif bool(self.parsed_dict['Taxon_ID']) and \
+                 not self.parsed_dict['split_by_taxon']:
+                ob = basename(self.parsed_dict['t2']) + '-' + t1_tag + \
+                    '.' + str((list(self.parsed_dict['Taxon_ID']))[0]) + \
+                    '.benchmark' + '_' + ontType
+            else: 
+                ob = basename(self.parsed_dict['t2']) + '-' + t1_tag + \
+                    '.benchmark' + '_' + ontType
+        index = 1
+        while os.path.exists(self.work_dir + '/' + ob + '.' + str(index)):
+            index = index + 1
+        output_filename = self.work_dir + '/' + ob + '.' + str(index)
+        return output_filename
+
+    def create_iterator(self, infile, rawline=False):
+        """
+        This method creates an iterator object for the input UniProt-GOA file
+        and returns it along with a list of all field names contained in the
+        UniProt-GOA file. The UniProt-GOA file can either be in GAF 1.0 or
+        GAF 2.0 file format. If rawline is True, the records carry their
+        original lines, which are written out unchanged by the filters.
+        """
+        infile_handle = open(infile, 'r')
+        iter_handle = GOA.gafiterator(infile_handle)
+        for ingen in iter_handle:
+            if len(ingen) == 17:
+                GAFFIELDS = GOA.GAF20FIELDS
+                break
+            else:
+                GAFFIELDS = GOA.GAF10FIELDS
+                break
+        infile_handle = open(infile, 'r')
+        iter_handle = GOA.gafiterator(infile_handle, rawline)
+        return iter_handle, GAFFIELDS
+
+    def remove_redundant_benchmarks(self):
+        if os.stat(self.bmfile_LK_bpo).st_size == 0:
+            print('Your limited-knowledge benchmark set for ' + \
+                  'Biological Process Ontology is empty.')
+            os.system('cp ' + self.bmfile_LK_bpo + ' ' + \
+                              self.output_filename_LK_bpo)
+        else:
+            os.system('sort ' + self.bmfile_LK_bpo + ' | ' + \
+                   'uniq >' + self.output_filename_LK_bpo)
+        if os.stat(self.bmfile_LK_cco).st_size == 0:
+            print('Your limited-knowledge benchmark set for ' + \
+                  'Cellular Component Process Ontology is empty.')
+            os.system('cp ' + self.bmfile_LK_cco + ' ' + \
+                              self.output_filename_LK_cco)
+        else:
+            os.system('sort ' + self.bmfile_LK_cco + ' | ' + \
+                   'uniq > ' + self.output_filename_LK_cco)
+        if os.stat(self.bmfile_LK_mfo).st_size == 0:
+            print('Your limited-knowledge benchmark set for '+ \
+                  'Molecular Function Ontology is empty.')
+            os.system('cp ' + self.bmfile_LK_mfo + ' ' + \
+                              self.output_filename_LK_mfo)
+        else:
+            os.system('sort ' + self.bmfile_LK_mfo + ' | ' + \
+                   'uniq > ' + self.output_filename_LK_mfo)
+        if os.stat(self.bmfile_NK_bpo).st_size == 0:
+            print('Your no-knowledge benchmark set for ' + \
+                  'Biological Process Ontology is empty.')
+            os.system('cp ' + self.bmfile_NK_bpo + ' ' + \
+                              self.output_filename_NK_bpo)
+        else:
+            os.system('sort ' + self.bmfile_NK_bpo + ' | ' + \
+                   'uniq > ' + self.output_filename_NK_bpo)
+        if os.stat(self.bmfile_NK_cco).st_size == 0:
+            print('Your no-knowledge benchmark set for ' + \
+                  'Cellular Component Process Ontology is empty.')
+            os.system('cp ' + self.bmfile_NK_cco + ' ' + \
+                              self.output_filename_NK_cco)
+        else:
+            os.system('sort ' + self.bmfile_NK_cco + ' | ' + \
+                   'uniq > ' + self.output_filename_NK_cco)
+        if os.stat(self.bmfile_NK_mfo).st_size == 0:
+            print('Your no-knowledge benchmark set for ' + \
+                  'Molecular Function Ontology is empty.')
+            os.system('cp ' + self.bmfile_NK_mfo + ' ' + \
+                              self.output_filename_NK_mfo)
+        else:
+            os.system('sort ' + self.bmfile_NK_mfo + ' | ' + \
+                   'uniq > ' + self.output_filename_NK_mfo)
+        return None
+
+    def create_intermediate_files(self):
+        """
+        This method creates all the necessary intermediate files 
+        that are needed to create the desired benchmark sets.
+        """
+        # Create paper-term freq file for t2 file:
+        ann_conf = ptf.paper_term_freq( open(self.t2_input_file,'r'),
+                                        open(self.t2_ptf_file,'w'),
+                                        self.parsed_dict)
+        # Create an iterator object for filtering t2 file:
+        iter_handle, GAFFIELDS = self.create_iterator(self.t2_input_file,
+                                                      rawline=True)
+
+        # Create tax_id_name_mapping for filtering t2 file:
+        tax_id_name_mapping = gc.parse_tax_file(self.ConfigParam['tax_file'])
+        # Create t2_exp_name file:
+        # Filter t2 file for all proteins with EXP evidence:
+        print 'Parsing t2 file: ' + basename(self.t2_input_file) + ' ...'
+        t2_exp_handle = open(self.t2_exp_name, 'w')
+        # Keep the entries of the input file at time t2 that pass the
+        # filters and write out their original lines to the file 
+        # t2_exp_name in blocks:
+        kept = (ingen for ingen in iter_handle if 
+                gc.record_has_forBenchmark(ingen,
+                                           ann_conf,
+                                           self.parsed_dict,
+                                           tax_id_name_mapping,
+                                           self.ConfigParam['exp_eec'],
+                                           GAFFIELDS))
+        GOA.writerecs(kept, t2_exp_handle, GAFFIELDS, passthrough=True)
+        t2_exp_handle.close()
+
+        # If t2.exp is empty, there is no benchmark set to create:
+        if os.stat(self.t2_exp_name).st_size == 0:
+            raise ToolsetError('Empty intermediate file: ' + \
+                               basename(self.t2_exp_name) + '. Your ' + \
+                               'benchmark set will be empty with the ' + \
+                               'parameters provided.')
+       
+        # Create t1.iea_name and t1.exp_name files:
+
+        # Field names of t1_input_file:
+        GAFFIELDS = self.create_iterator(self.t1_input_file)[1]
+        print 'Parsing t1 file: ' + basename(self.t1_input_file) + ' ...'
+        # Filter t1 file and create files t1.iea_name and t1.exp_name:
+        # t1_filter parses only the t1 lines of the proteins in t2_exp:
+        gc.t1_filter(open(self.t1_input_file, 'r'), self.t1_iea_name,
+                     self.t1_exp_name, self.t2_exp_name, GAFFIELDS,
+                     self.ConfigParam['exp_eec'])
+        return None
+
+    def create_t2_filter(self):
+        """
+        This method returns a function that returns True for the records
+        of the t2 file that pass the user filters, the records that
+        create_intermediate_files writes to the t2_exp file.
+        """
+        # The paper-term freq file is only needed by the confidence filter:
+        if self.parsed_dict['Confidence'] == 'T':
+            ann_conf = ptf.paper_term_freq(open(self.t2_input_file,'r'),
+                                           open(self.t2_ptf_file,'w'),
+                                           self.parsed_dict)
+        else:
+            ann_conf = {}
+        GAFFIELDS = self.create_iterator(self.t2_input_file)[1]
+        tax_id_name_mapping = gc.parse_tax_file(self.ConfigParam['tax_file'])
+        t2_filter = lambda ingen: gc.record_has_forBenchmark(ingen,
+                                        ann_conf,
+                                        self.parsed_dict,
+                                        tax_id_name_mapping,
+                                        self.ConfigParam['exp_eec'],
+                                        GAFFIELDS)
+        return t2_filter
+
+    def create_streaming_benchmarks(self):
+        """
+        This method creates the SIX intermediate benchmark files by
+        merging the t1 and t2 files protein by protein. The t2 records
+        are filtered as in create_intermediate_files. The input files
+        must be sorted by DB_Object_ID (see GOAParser.sort_gaf_file).
+        """
+        t2_filter = self.create_t2_filter()
+        print 'Parsing t1 and t2 files: ' + basename(self.t1_input_file) + \
+              ', ' + basename(self.t2_input_file) + ' ...'
+        t1_groups = GOA.gafbyproteiniterator(open(self.t1_input_file, 'r'),
+                                             check_sorted=True)
+        t2_groups = GOA.gafbyproteiniterator(open(self.t2_input_file, 'r'),
+                                             check_sorted=True)
+        # Taxon ids of the benchmark proteins for --split-by-taxon:
+        if self.parsed_dict['split_by_taxon']:
+            self.prot_taxa = {}
+        else:
+            self.prot_taxa = None
+        bm_handles = [open(self.bmfile_LK_bpo, 'w'),
+                      open(self.bmfile_LK_cco, 'w'),
+                      open(self.bmfile_LK_mfo, 'w'),
+                      open(self.bmfile_NK_bpo, 'w'),
+                      open(self.bmfile_NK_cco, 'w'),
+                      open(self.bmfile_NK_mfo, 'w')]
+        try:
+            t2_count = cb.create_benchmarks_streaming(t1_groups, t2_groups,
+                                        t2_filter,
+                                        self.ConfigParam['exp_eec'],
+                                        *bm_handles,
+                                        prot_taxa=self.prot_taxa)
+        except ValueError as e:
+            raise ToolsetError(str(e) + '. The --streaming option needs ' + \
+                               'input files sorted by DB_Object_ID. Sort ' + \
+                               'them with GOAParser.sort_gaf_file or run ' + \
+                               'without --streaming.')
+        for bm_handle in bm_handles:
+            bm_handle.close()
+        # If no t2 record passes the filters, there is no benchmark set:
+        if t2_count == 0:
+            raise ToolsetError('No entry in ' + \
+                               basename(self.t2_input_file) + ' passes ' + \
+                               'the filters. Your benchmark set will be ' + \
+                               'empty with the parameters provided.')
+        return None
+
+    def create_date_sliced_benchmarks(self):
+        """
+        This method creates the SIX intermediate benchmark files from the
+        t2 file alone: the records of a protein dated on or before the 
+        cutoff date are taken as its records at t1 (see 
+        CreateBenchmark.create_benchmarks_by_date). The t2 records are 
+        filtered as in create_intermediate_files. The t2 file must be 
+        sorted by DB_Object_ID (see GOAParser.sort_gaf_file).
+        """
+        # The filter is kept for compare_date_sliced_benchmarks:
+        self.t2_filter = self.create_t2_filter()
+        print 'Parsing t2 file: ' + basename(self.t2_input_file) + \
+              ' with cutoff date ' + self.parsed_dict['cutoff'] + ' ...'
+        t2_groups = GOA.gafbyproteiniterator(open(self.t2_input_file, 'r'),
+                                             check_sorted=True)
+        # Taxon ids of the benchmark proteins for --split-by-taxon:
+        if self.parsed_dict['split_by_taxon']:
+            self.prot_taxa = {}
+        else:
+            self.prot_taxa = None
+        bm_handles = [open(self.bmfile_LK_bpo, 'w'),
+                      open(self.bmfile_LK_cco, 'w'),
+                      open(self.bmfile_LK_mfo, 'w'),
+                      open(self.bmfile_NK_bpo, 'w'),
+                      open(self.bmfile_NK_cco, 'w'),
+                      open(self.bmfile_NK_mfo, 'w')]
+        try:
+            t2_count = cb.create_benchmarks_by_date(t2_groups,
+                                        self.parsed_dict['cutoff'],
+                                        self.t2_filter,
+                                        self.ConfigParam['exp_eec'],
+                                        *bm_handles,
+                                        prot_taxa=self.prot_taxa)
+        except ValueError as e:
+            raise ToolsetError(str(e) + '. The --cutoff option needs an ' + \
+                               'input file sorted by DB_Object_ID. Sort ' + \
+                               'it with GOAParser.sort_gaf_file.')
+        for bm_handle in bm_handles:
+            bm_handle.close()
+        # If no t2 record passes the filters, there is no benchmark set:
+        if t2_count == 0:
+            raise ToolsetError('No entry in ' + \
+                               basename(self.t2_input_file) + ' passes ' + \
+                               'the filters. Your benchmark set will be ' + \
+                               'empty with the parameters provided.')
+        return None
+
+    def compare_date_sliced_benchmarks(self):
+        """
+        This method measures how close the date-sliced benchmark files
+        are to the benchmark files created from the t1 and t2 files. It
+        creates the benchmarks of the two files (see 
+        create_streaming_benchmarks) into temporary files and writes a 
+        table with the number of proteins and GO terms in the 
+        date-sliced benchmarks, in the two-file benchmarks and in both,
+        for each benchmark type. The precision is the fraction of the 
+        date-sliced benchmark proteins that are also two-file benchmark 
+        proteins, the recall the fraction of the two-file benchmark 
+        proteins found by the date slicing.
+        """
+        print 'Comparing with the benchmark sets of the t1 and t2 ' + \
+              'files: ' + basename(self.t1_input_file) + ', ' + \
+              basename(self.t2_input_file) + ' ...'
+        bm_files = [('LK_bpo', self.output_filename_LK_bpo),
+                    ('LK_cco', self.output_filename_LK_cco),
+                    ('LK_mfo', self.output_filename_LK_mfo),
+                    ('NK_bpo', self.output_filename_NK_bpo),
+                    ('NK_cco', self.output_filename_NK_cco),
+                    ('NK_mfo', self.output_filename_NK_mfo)]
+        ref_files = [self.t2_exp_name + '.' + b[0] + '_two_files.txt' 
+                     for b in bm_files]
+        t1_groups = GOA.gafbyproteiniterator(open(self.t1_input_file, 'r'),
+                                             check_sorted=True)
+        t2_groups = GOA.gafbyproteiniterator(open(self.t2_input_file, 'r'),
+                                             check_sorted=True)
+        ref_handles = [open(ref_file, 'w') for ref_file in ref_files]
+        try:
+            cb.create_benchmarks_streaming(t1_groups, t2_groups,
+                                           self.t2_filter,
+                                           self.ConfigParam['exp_eec'],
+                                           *ref_handles)
+        except ValueError as e:
+            raise ToolsetError(str(e) + '. The comparison needs input ' + \
+                               'files sorted by DB_Object_ID. Sort them ' + \
+                               'with GOAParser.sort_gaf_file.')
+        for ref_handle in ref_handles:
+            ref_handle.close()
+        # Write the comparison table:
+        self.output_filename_comparison = \
+                self.create_outfilename('cutoff_comparison')
+        header = 'Benchmark\tSliced_proteins\tTwo_file_proteins\t' + \
+                 'Common_proteins\tSliced_terms\tTwo_file_terms\t' + \
+                 'Common_terms\tPrecision\tRecall'
+        fh_comp = open(self.output_filename_comparison, 'w')
+        fh_comp.write(header + '\n')
+        print 'Date-sliced benchmarks compared with two-file benchmarks:'
+        print header
+        for i in range(len(bm_files)):
+            counts = cb.compare_benchmarks(open(bm_files[i][1], 'r'),
+                                           open(ref_files[i], 'r'))
+            precision = float(counts[2]) / counts[0] if counts[0] else 0.0
+            recall = float(counts[2]) / counts[1] if counts[1] else 0.0
+            row = bm_files[i][0] + '\t' + '\t'.join(map(str, counts)) + \
+                  '\t%.3f\t%.3f' % (precision, recall)
+            fh_comp.write(row + '\n')
+            print row
+            os.remove(ref_files[i])
+        fh_comp.close()
+        return None
+
+    def split_benchmarks_by_taxon(self, prot_taxa):
+        """
+        This method partitions each of the SIX benchmark files by the
+        taxon ids of their proteins, given by the dictionary prot_taxa 
+        (see CreateBenchmark.protein_taxa). It writes the lines of each
+        taxon to a benchmark file with the taxon id in its name (see 
+        create_outfilename) and a summary table with the number of 
+        benchmark proteins of each taxon in each benchmark file. The 
+        benchmark files of all the taxa are kept.
+        """
+        bm_files = [('LK_bpo', self.output_filename_LK_bpo),
+                    ('LK_cco', self.output_filename_LK_cco),
+                    ('LK_mfo', self.output_filename_LK_mfo),
+                    ('NK_bpo', self.output_filename_NK_bpo),
+                    ('NK_cco', self.output_filename_NK_cco),
+                    ('NK_mfo', self.output_filename_NK_mfo)]
+        # Number of benchmark proteins for each taxon, one count 
+        # for each benchmark file:
+        taxon_counts = {}
+        self.taxon_filenames = []
+        for i in range(len(bm_files)):
+            ontType, bm_fname = bm_files[i]
+            taxon_lines = cb.split_benchmark_by_taxon(open(bm_fname, 'r'),
+                                                      prot_taxa)
+            for taxon in sorted(taxon_lines):
+                taxon_fname = self.create_outfilename(ontType, taxon)
+                fh_taxon = open(taxon_fname, 'w')
+                fh_taxon.writelines(taxon_lines[taxon])
+                fh_taxon.close()
+                self.taxon_filenames.append(taxon_fname)
+                if taxon not in taxon_counts:
+                    taxon_counts[taxon] = [0] * len(bm_files)
+                taxon_counts[taxon][i] = len(set([inline.split('\t', 1)[0]
+                                         for inline in taxon_lines[taxon]]))
+        # Write the summary table, the taxa with the most benchmark 
+        # proteins first:
+        self.output_filename_taxa = self.create_outfilename('taxa')
+        header = 'Taxon_ID\t' + '\t'.join([b[0] for b in bm_files])
+        fh_taxa = open(self.output_filename_taxa, 'w')
+        fh_taxa.write(header + '\n')
+        print 'Benchmark proteins by taxon:'
+        print header
+        for taxon in sorted(taxon_counts, 
+                            key=lambda t: (-sum(taxon_counts[t]), t)):
+            row = taxon + '\t' + '\t'.join(map(str, taxon_counts[taxon]))
+            fh_taxa.write(row + '\n')
+            print row
+        fh_taxa.close()
+        return None
+
+    def delete_intermediate_files(self):
+        print 'Cleaning working directory ...'
+        # Delete SIX intermediate benchmark files:
+        os.remove(self.bmfile_LK_bpo)
+        os.remove(self.bmfile_LK_cco)
+        os.remove(self.bmfile_LK_mfo)
+        os.remove(self.bmfile_NK_bpo)
+        os.remove(self.bmfile_NK_cco)
+        os.remove(self.bmfile_NK_mfo)
+        # Delete t1.iea_name, t1.exp_name, and t2.exp_name files:
+        os.remove(self.t1_iea_name)
+        os.remove(self.t1_exp_name)
+        os.remove(self.t2_exp_name)
+        # Delete paper term frequency file for t2 file:
+        os.remove(self.t2_ptf_file)
+        # Delete any empty files from the workspace (subdirectories included):
+        for root, dirs, files in os.walk(self.work_dir):
+            for fname in files:
+                if os.path.getsize(root + '/' + fname) == 0:
+                    os.remove(root + '/' + fname)
+            break
+        return None
+
+    def check_gaf_format(self, goa_fname):
+        """
+        This method raises a ToolsetError on any of the following 
+        conditions (see check_gaf_format of this module).
+        """
+        check_gaf_format(goa_fname)
+
+    def run(self):
+        """
+        This method checks the input files, creates the benchmark sets
+        in the way selected by the user arguments (from the intermediate
+        files, by streaming or with a cutoff date), partitions them by
+        taxon if asked and returns a BenchmarkResult.
+        """
+        # File format check for t1 file:
+        if self.t1_input_file is not None:
+            self.check_gaf_format(self.t1_input_file)
+        # File format check for t2 file:
+        self.check_gaf_format(self.t2_input_file)
+
+        if self.parsed_dict['cutoff']:
+            # Populate benchmark files from the t2 file alone:
+            self.create_date_sliced_benchmarks()
+            self.remove_redundant_benchmarks()
+            if self.t1_input_file is not None:
+                self.compare_date_sliced_benchmarks()
+            prot_taxa = self.prot_taxa
+        elif self.parsed_dict['streaming']:
+            # Populate benchmark files protein by protein:
+            self.create_streaming_benchmarks()
+            self.remove_redundant_benchmarks()
+            prot_taxa = self.prot_taxa
+        else:
+            # Create necessary intermediate files:
+            self.create_intermediate_files()
+            # Populate benchmark files:
+            cb.create_benchmarks(open(self.t1_iea_name, 'r'),
+                                 open(self.t1_exp_name, 'r'),
+                                 open(self.t2_exp_name, 'r'),
+                                 open(self.bmfile_LK_bpo, 'w'),
+                                 open(self.bmfile_LK_cco, 'w'),
+                                 open(self.bmfile_LK_mfo, 'w'),
+                                 open(self.bmfile_NK_bpo, 'w'),
+                                 open(self.bmfile_NK_cco, 'w'),
+                                 open(self.bmfile_NK_mfo, 'w'))
+            # Remove redundant benchmark entries:
+            self.remove_redundant_benchmarks()
+            if self.parsed_dict['split_by_taxon']:
+                prot_taxa = cb.protein_taxa(open(self.t2_exp_name, 'r'))
+            # Delete intermediate files:
+            #self.delete_intermediate_files()
+        # Partition the benchmark sets by taxon:
+        if self.parsed_dict['split_by_taxon']:
+            self.split_benchmarks_by_taxon(prot_taxa)
+        return self.benchmark_result()
+
+    def benchmark_result(self):
+        """
+        This method returns the BenchmarkResult of the benchmark files
+        created by run.
+        """
+        benchmark_files = OrderedDict()
+        benchmark_files['LK_bpo'] = self.output_filename_LK_bpo
+        benchmark_files['LK_cco'] = self.output_filename_LK_cco
+        benchmark_files['LK_mfo'] = self.output_filename_LK_mfo
+        benchmark_files['NK_bpo'] = self.output_filename_NK_bpo
+        benchmark_files['NK_cco'] = self.output_filename_NK_cco
+        benchmark_files['NK_mfo'] = self.output_filename_NK_mfo
+        proteins = OrderedDict()
+        for bm_type in benchmark_files:
+            proteins[bm_type] = len(set([inline.split('\t', 1)[0] for
+                                inline in open(benchmark_files[bm_type])]))
+        return BenchmarkResult(benchmark_files, proteins,
+                               getattr(self, 'taxon_filenames', []),
+                               getattr(self, 'output_filename_taxa', None),
+                               getattr(self, 'output_filename_comparison',
+                                       None))
+
+class VerifyTool:
+    def __init__(self, parsed_dict, ConfigParam):
+        # User supplied argument values (see ArgParser_Benchmark):
+        self.parsed_dict = parsed_dict
+        # Config file entries (see Config):
+        self.ConfigParam = ConfigParam
+
+        t1 = self.parsed_dict['t1'] # Retreive file name at time t1
+        t2 = self.parsed_dict['t2'] # Retreive file name at time t2
+        t3 = self.parsed_dict['t3'] # Retreive a benchmark file name
+
+        # Retreive work directory name:
+        self.work_dir = (self.ConfigParam['workdir']).rstrip('/')
+        if not os.path.exists(self.work_dir):
+            raise ToolsetError('Work space not found. Check the ' + \
+                               'configuration for the correct ' + \
+                               'assignment of work directory.')
+        self.t1_input_file = locate_goa_file(t1, self.work_dir)
+
+        self.t2_input_file = locate_goa_file(t2, self.work_dir)
+
+        # Names for SIX benchmark files: bpo, cco, and mfo
+        # for LK and NK benchmark types:
+        self.get_benchmark_filenames()
+
+        # Locate the benchmark files:
+        if (self.locate_benchmark_files()):
+            raise ToolsetError('No benchmark file in the specified ' + \
+                               'version is found.')
+
+        # Names for THREE files to store non-EXP and EXP type entries:
+        # (These files will be deleted once the calculation is done)
+
+        # File name for entries in t1 file with non-EXP evidence codes:
+        self.t1_iea_name = self.t1_input_file + '.iea'
+
+        # File name for entries in t1 file with EXP evidence codes:
+        self.t1_exp_name = self.t1_input_file + '.exp'
+
+        # File name for entries in t2 file with EXP evidence codes:
+        self.t2_exp_name = self.t2_input_file + '.exp'
+
+        # Name for GO ID frequency per pubmed id for t2 file:
+        # (This file will be deleted once the calculations are completed)
+        self.t2_ptf_file =  self.t2_input_file + \
+                            '_with_annotations_per_paper.txt'
+
+    def get_benchmark_filenames(self): 
+        """
+        This method initializes the benchmark file names based on the user 
+        input file name.
+        """
+        t3_basename = basename(self.parsed_dict['t3']).strip()
+        bmVersion = t3_basename.split('.')[-1]
+        fnPrefix = t3_basename[0:len(t3_basename)-(len(bmVersion) + \
+                                                  len(bmSuffix_LK_bpo))]
+
+        self.benchmark_LK_bpo = fnPrefix + bmSuffix_LK_bpo + bmVersion
+        self.benchmark_LK_cco = fnPrefix + bmSuffix_LK_cco + bmVersion
+        self.benchmark_LK_mfo = fnPrefix + bmSuffix_LK_mfo + bmVersion
+        self.benchmark_NK_bpo = fnPrefix + bmSuffix_NK_bpo + bmVersion
+        self.benchmark_NK_cco = fnPrefix + bmSuffix_NK_cco + bmVersion
+        self.benchmark_NK_mfo = fnPrefix + bmSuffix_NK_mfo + bmVersion
+        return None
+
+    def create_iterator(self, infile, rawline=False):
+        """
+        This method creates an iterator object for the input UniProt-GOA file
+        and returns it along with a list of all field names contained in the
+        UniProt-GOA file. The UniProt-GOA file can either be in GAF 1.0 or 
+        GAF 2.0 file format. If rawline is True, the records carry their
+        original lines, which are written out unchanged by the filters.
+        """
+        infile_handle = open(infile, 'r')
+        iter_handle = GOA.gafiterator(infile_handle)
+        for ingen in iter_handle:
+            if len(ingen) == 17:
+                GAFFIELDS = GOA.GAF20FIELDS
+                break
+            else:
+                GAFFIELDS = GOA.GAF10FIELDS
+                break
+        infile_handle = open(infile, 'r')
+        iter_handle = GOA.gafiterator(infile_handle, rawline)
+        return iter_handle, GAFFIELDS
+
+    def locate_benchmark_files(self):
+        """
+        This method tries to find all the benchmark files. If no benchmark
+        file is found, it returns True, otherwise it returns False.
+        """
+        noneFound = True
+        if(ld.locate_benchmark_file(self.benchmark_LK_bpo, self.work_dir)):
+            noneFound = False
+
+        if(ld.locate_benchmark_file(self.benchmark_LK_cco, self.work_dir)):
+            noneFound = False
+
+        if(ld.locate_benchmark_file(self.benchmark_LK_mfo, self.work_dir)):
+            noneFound = False
+
+        if(ld.locate_benchmark_file(self.benchmark_NK_bpo, self.work_dir)):
+            noneFound = False
+
+        if(ld.locate_benchmark_file(self.benchmark_NK_cco, self.work_dir)):
+            noneFound = False            
+
+        if(ld.locate_benchmark_file(self.benchmark_NK_mfo, self.work_dir)):
+            noneFound = False
+
+        return noneFound
+
+    def create_intermediate_files(self):
+        """
+        This method creates all the necessary intermediate files 
+        that are needed to verify the benchmark sets.
+        """
+
+        # Create paper-term freq file for t2 file:
+        ann_conf = ptf.paper_term_freq( open(self.t2_input_file,'r'),
+                                        open(self.t2_ptf_file,'w'),
+                                        self.parsed_dict)
+          
+        # Create an iterator object for filtering t2 file:
+        iter_handle, GAFFIELDS = self.create_iterator(self.t2_input_file,
+                                                      rawline=True)
+
+        # Create tax_id_name_mapping for filtering t2 file:
+        tax_id_name_mapping = gc.parse_tax_file(self.ConfigParam['tax_file'])
+
+        # Create t2_exp_name file:
+        # Filter t2 file for all proteins with EXP evidence:
+        print 'Parsing t2 file: ' + basename(self.t2_input_file) + ' ...'
+        t2_exp_handle = open(self.t2_exp_name, 'w')
+        # Keep the entries of the input file at time t2 that pass the
+        # filters and write out their original lines to the file 
+        # t2_exp_name in blocks:
+        kept = (ingen for ingen in iter_handle if 
+                gc.record_has_forBenchmark(ingen,
+                                           ann_conf,
+                                           self.parsed_dict,
+                                           tax_id_name_mapping,
+                                           self.ConfigParam['exp_eec'],
+                                           GAFFIELDS))
+        GOA.writerecs(kept, t2_exp_handle, GAFFIELDS, passthrough=True)
+        t2_exp_handle.close()
+
+        # If t2.exp is empty, there is no benchmark set to verify:
+        if os.stat(self.t2_exp_name).st_size == 0: 
+            raise ToolsetError('Your benchmark set will be empty with ' + \
+                               'the parameters provided.')
+       
+        # Create t1.iea_name and t1.exp_name files: 
+        # Filter t1 file to create t1.iea and t1.exp files
+        GAFFIELDS = self.create_iterator(self.t1_input_file)[1]
+        print 'Parsing t1 file: ' + basename(self.t1_input_file) + ' ...' 
+        # t1_filter parses only the t1 lines of the proteins in t2_exp:
+        gc.t1_filter(open(self.t1_input_file, 'r'), self.t1_iea_name,
+                     self.t1_exp_name, self.t2_exp_name, GAFFIELDS,
+                     self.ConfigParam['exp_eec'])
+        return None 
+
+    def delete_intermediate_files(self):
+        """
+        This method deletes all the intermediate files created previously.
+        It also deletes any empty files found in the workspace.
+        """
+        print 'Cleaning working directory ...'
+        # Delete t1.iea, t1.exp, and t2.exp files:
+        os.remove(self.t1_iea_name)
+        os.remove(self.t1_exp_name)
+        os.remove(self.t2_exp_name)
+        # Delete paper term frequency file for t2 file:
+        os.remove(self.t2_ptf_file)
+        # Delete any empty files from the workspace (subdirectories included):
+        for root, dirs, files in os.walk(self.work_dir):
+            for fname in files:
+                if os.path.getsize(root + '/' + fname) == 0:
+                    os.remove(root + '/' + fname)
+            break
+        return None
+
+    def check_gaf_format(self, goa_fname):
+        """
+        This method raises a ToolsetError if the file is empty or NOT
+        in GAF format (see check_gaf_format of this module).
+        """
+        check_gaf_format(goa_fname)
+
+    def verify_LK_benchmark(self, benchmark_filename, ontType):
+        """
+        This method verifies the LK-benchmark file benchmark_filename of
+        the ontology ontType and returns the message of the verification.
+        """
+        if (not os.path.exists(self.work_dir + '/' + benchmark_filename)):
+            return '\t\tfile does not exist.'
+        if (os.stat(self.work_dir + '/' + \
+            benchmark_filename).st_size == 0):
+            return '\t\tfile size is zero'
+        # Checking file format
+        if not fc.check_benchmark_format(open(self.work_dir + '/' + \
+                                              benchmark_filename, 'r')):
+            return '\t\tfile is NOT in CORRECT format'
+        # Checking whether benchmark creation was successful
+        err_msg = vb.verify_LK_benchmark(open(self.t1_iea_name, 'r'),
+                                         open(self.t1_exp_name, 'r'),
+                                         open(self.t2_exp_name, 'r'),
+                                         open(self.work_dir + '/' + \
+                                              benchmark_filename, 'r'),
+                                         ontType)
+        if (not err_msg):
+            return NO_ERROR
+        return err_msg
+
+    def verify_NK_benchmark(self, benchmark_filename, ontType):
+        """
+        This method verifies the NK-benchmark file benchmark_filename of
+        the ontology ontType and returns the message of the verification.
+        """
+        if (not os.path.exists(self.work_dir + '/' + benchmark_filename)):
+            return '\t\tfile does not exist.'
+        if (os.stat(self.work_dir + '/' + \
+            benchmark_filename).st_size == 0):
+            return '\t\tfile size is zero'
+        # Checking file format:
+        if not fc.check_benchmark_format(open(self.work_dir + '/' + \
+                                              benchmark_filename, 'r')):
+            return '\t\tfile is NOT in CORRECT format'
+        # Checking whether benchmark creation was successful:
+        err_msg = vb.verify_NK_benchmark(open(self.t1_iea_name, 'r'),
+                                         open(self.t1_exp_name, 'r'),
+                                         open(self.t2_exp_name, 'r'),
+                                         open(self.work_dir + '/' + \
+                                              benchmark_filename, 'r'),
+                                         ontType)
+        if (not err_msg):
+            return NO_ERROR
+        return err_msg
+
+    def verify_benchmarks(self):
+        """
+        This method verifies the SIX benchmark files from the
+        intermediate files and returns a VerifyResult.
+        """
+        messages = OrderedDict()
+        # Verify LK-benchmark sets:
+        messages[self.benchmark_LK_bpo] = \
+            self.verify_LK_benchmark(self.benchmark_LK_bpo, 'BPO')
+        messages[self.benchmark_LK_cco] = \
+            self.verify_LK_benchmark(self.benchmark_LK_cco, 'CCO')
+        messages[self.benchmark_LK_mfo] = \
+            self.verify_LK_benchmark(self.benchmark_LK_mfo, 'MFO')
+        # Verify NK-benchmark sets:
+        messages[self.benchmark_NK_bpo] = \
+            self.verify_NK_benchmark(self.benchmark_NK_bpo, 'BPO')
+        messages[self.benchmark_NK_cco] = \
+            self.verify_NK_benchmark(self.benchmark_NK_cco, 'CCO')
+        messages[self.benchmark_NK_mfo] = \
+            self.verify_NK_benchmark(self.benchmark_NK_mfo, 'MFO')
+        return VerifyResult(messages)
+
+    def run(self):
+        """
+        This method checks the input files, creates the intermediate
+        files, verifies the benchmark sets, deletes the intermediate
+        files and returns a VerifyResult.
+        """
+        # File format check for t1 file:
+        self.check_gaf_format(self.t1_input_file)
+        # File format check for t2 file:
+        self.check_gaf_format(self.t2_input_file)
+        # Create necessary intermediate files:
+        self.create_intermediate_files()
+        try:
+            # Verifying benchmark sets:
+            result = self.verify_benchmarks()
+        finally:
+            # Delete intermediate files:
+            self.delete_intermediate_files()
+        return result
+
+class FilterTool:
+    def __init__(self, parsed_dict, ConfigParam):
+        # User supplied argument values (see ArgParser_Filter):
+        self.parsed_dict = parsed_dict
+        # Config file entries (see Config):
+        self.ConfigParam = ConfigParam
+        self.work_dir = self.ConfigParam['workdir']
+
+        # Look for workspace, and if none exists create one:
+        if not os.path.exists(self.work_dir):
+            os.makedirs(self.work_dir) # Create work space
+
+        t1 = self.parsed_dict['t1'] # Extract input file name
+        # Locate the input file:
+        self.t1_input_file = locate_sprot_file(t1, self.work_dir)
+        # List of organism ids:
+        self.taxon_ids = self.parsed_dict['g']
+
+        # Create output file names for target sequences and for mapping
+        # between SwissProt protein name and sequence id in the target
+        # sequence file, one pair for each organism:
+        self.output_filenames = OrderedDict()
+        for taxon_id in self.taxon_ids:
+            output_filename = self.create_outfilename(taxon_id)
+            self.output_filenames[taxon_id] = (output_filename,
+                                               output_filename + '.map')
+        return None
+
+    def create_outfilename(self, taxon_id):
+        """ 
+        Creates an output filename for the organism taxon_id based on 
+        the output file prefix provided by the user and at the end 
+        returns the newly created output filename.
+        """
+        if not self.parsed_dict['outfile'] == '':
+            ob = basename(self.parsed_dict['outfile'])
+            # With several organisms, the organism id is appended
+            # to the user supplied prefix:
+            if len(self.taxon_ids) > 1:
+                ob = ob + '.%s.tfa' % basename(taxon_id)
+        else:
+            ob = basename(self.parsed_dict['t1']) + '.%s.tfa' \
+                          % basename(taxon_id)
+            # output file name is constructed by appending '.taxon id.tfa'
+            # as extension
+        index = 1
+        while os.path.exists(self.work_dir + '/' + ob + '.' + str(index)):
+            index = index + 1
+        output_filename = self.work_dir + '/' + ob + '.' + str(index)
+        return output_filename
+
+    def check_sprot_format(self, sprot_fname):
+        """
+        This method raises a ToolsetError if the file is empty or NOT
+        in UniProtKB/SwissProt format (see check_sprot_format of this
+        module).
+        """
+        check_sprot_format(sprot_fname)
+
+    def run(self):
+        """
+        This method checks the input file, filters the target sequences
+        of all the organisms in one scan of the file and returns a
+        FilterResult.
+        """
+        # Check UniProtKB/SwissProt file format:
+        self.check_sprot_format(self.t1_input_file)
+
+        # Filter out the target sequences from the UniProtKB/SwissProt file:
+        print('Filtering sequences from ' + \
+               basename(self.t1_input_file) + ' ...')
+
+        # Open the output files for all the organisms:
+        fh_dict = {}
+        for taxon_id in self.output_filenames:
+            output_filename, output_map_filename = \
+                self.output_filenames[taxon_id]
+            fh_dict[taxon_id] = (open(output_filename, 'w'),
+                                 open(output_map_filename, 'w'))
+
+        # All the organisms are filtered in one scan of the file:
+        import Filter_sp_targets as ft
+        target_counts = ft.species_filter_multi(self.t1_input_file,
+                                                self.taxon_ids,
+                                                fh_dict,
+                                                self.ConfigParam['exp_eec'],
+                                                self.parsed_dict['nprocs'],
+                                                self.parsed_dict['width'])
+        for fh_targets, fh_map in fh_dict.values():
+            fh_targets.close()
+            fh_map.close()
+        return FilterResult(self.output_filenames, target_counts)
+
+class MergedbTool:
+    def __init__(self, parsed_dict, ConfigParam):
+        # User supplied argument values (see ArgParser_Mergedb):
+        self.parsed_dict = parsed_dict
+        # Config file entries (see Config):
+        self.ConfigParam = ConfigParam
+        # Extract workspace name
+        self.work_dir = self.ConfigParam['workdir']
+        # Create workspace, if one does not exist:
+        if not os.path.exists(self.work_dir):
+            os.makedirs(self.work_dir)
+        # Extract filename at time t1:
+        t1 = self.parsed_dict['t1']
+        # Extract filename at time t2:
+        t2 = self.parsed_dict['t2']
+        # Extract output filename:
+        outfile_basename = basename(self.parsed_dict['outfile'])
+        # Locate t1 file:
+        self.t1_input_file = locate_sprot_file(t1, self.work_dir)
+        # Locate t2 file:
+        self.t2_input_file = locate_goa_file(t2, self.work_dir)
+        # Create output file name together with file version number:
+        self.output_filename = self.create_outfilename(self.parsed_dict,
+                                                  outfile_basename,
+                                                  self.work_dir)
+        return None
+
+    def create_outfilename(self, params, outfile, work_dir):
+        """
+         This method creates an output filename based on the output 
+         file prefix provided by the user and returns the created 
+         file name. 
+        """
+        if not outfile == '':
+            ob = basename(self.parsed_dict['outfile'])
+        else:
+            ob = basename(self.parsed_dict['t2']) + '+sprot.' + \
+                          str(basename(self.parsed_dict['t1']).split('.')[-1])
+        index = 1
+        while os.path.exists(self.work_dir + '/' + ob + '.' + str(index)):
+            index = index + 1
+        output_filename = self.work_dir + '/' + ob + '.' + str(index)
+        return output_filename
+
+    def check_sprot_format(self, sprot_fname):
+        """
+        This method raises a ToolsetError if the file is empty or NOT
+        in UniProtKB/SwissProt format (see check_sprot_format of this
+        module).
+        """
+        check_sprot_format(sprot_fname)
+
+    def check_gaf_format(self, goa_fname):
+        """
+        This method raises a ToolsetError if the file is empty or NOT
+        in GAF format (see check_gaf_format of this module).
+        """
+        check_gaf_format(goa_fname)
+
+    def run(self):
+        """
+        This method checks the input files, merges them in a single
+        pass over the UniProt-GOA file and returns a MergedbResult.
+        """
+        # Check UniProtKB/SwissProt file format:
+        self.check_sprot_format(self.t1_input_file)
+
+        # Check UniProt-GOA file format:
+        self.check_gaf_format(self.t2_input_file)
+
+        # Merging in TWO steps in a single pass over the UniProt-GOA file:
+        print ('Merging records in two steps - copying and appending:')
+
+        # Step 1:
+            # Copy the records from the UniProt-GOA file to the output file
+            # Build the dictionary of the GO terms while copying
+        # Step 2:
+            # Fetch records from Uniprot-SwissProt file
+            # Check for duplicacy in UniProt-GOA file
+            # Convert them to GOA records
+            # Append them at the end of the output file one by one
+            # All these are performed in appendSprot2goa method
+        print ('Copying records from ' + \
+                basename(self.t2_input_file) + ' to ' + \
+                basename(self.output_filename) + ' and appending ' + \
+                'records from ' + basename(self.t1_input_file) + ' ...')
+
+        import AppendSprot2GOA as as2g
+        fh_merged_go = open(self.output_filename, 'w')
+        goCount = as2g.appendSprot2goa(open(self.t1_input_file, 'r'),
+                                            self.t2_input_file,
+                                            self.parsed_dict['g'],
+                                       fh_merged_go)
+        fh_merged_go.close()
+        return MergedbResult(self.output_filename, goCount)
+
+if __name__ == '__main__':
+    print (sys.argv[0] + ':')
+    print (__doc__)
+    sys.exit(0)
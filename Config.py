@@ -4,11 +4,21 @@
     This module has the following two methods:
 
     read_config: 
-        This method tries to locate the configuration file in 
-        the current directory or any of the subdirectories. If 
-        it does not find the configuration file, it creates one
-        by invoking create_config. At the end, it returns the
-        content of the configuration file as an ordered dictionary.
+        This method looks for the configuration file in the 
+        current directory. If it does not find the configuration 
+        file, it creates one by invoking create_config. At the 
+        end, it returns the content of the configuration file as 
+        an ordered dictionary.
+
+    parse_config:
+        This method reads a configuration file and returns its content
+        as an ordered dictionary, without creating the file. The
+        parsed content is cached, so a file is read once per process.
+
+    default_config:
+        This method returns the default configuration, the one that
+        create_config writes, as an ordered dictionary. It does not
+        ask for the working directory nor write a configuration file.
 
     create_config: 
         This method creates a configureation file which is passed 
@@ -72,23 +82,37 @@ def read_config(config_filename):
     """
     This method reads the conig file supplied by config_filename and returns
     the configuration as an ordered dictionary
-    If the config file is not found in the current direcotry or
-    any subdirectory, it creates one by invoking create_config method
+    If the config file is not found in the current direcotry, it creates 
+    one by invoking create_config method
+    """
+    # Look up the configuration file in the current directory, the
+    # directory parse_config reads it from:
+    if not os.path.exists(config_filename):
+        print 'Configuration file not found'
+        print 'Creating new configuration file ...'
+        print '************************************'
+        create_config(config_filename) # Creates a configuration file
+    return parse_config(config_filename)
+
+# Parsed configuration files, by path, with their modification times:
+_config_cache = {}
+
+def parse_config(config_filename):
     """
+    This method reads the config file supplied by config_filename and 
+    returns the configuration as an ordered dictionary.
+    A file is parsed once per process unless it is modified, and every
+    call returns a new copy of the dictionary.
+    """
+    config_path = os.path.abspath(config_filename)
+    try:
+        mtime = os.path.getmtime(config_path)
+    except OSError:
+        mtime = None
+    if config_path in _config_cache and \
+       _config_cache[config_path][0] == mtime:
+        return OrderedDict(_config_cache[config_path][1])
 
-    fname_ind = 0
-    # Search for configuration file. 
-    # current directory -> workspace -> create one 
-    for root,dirs,files in os.walk('.'):
-        for fname in files:
-            if fname == config_filename:
-                fname_ind = 1
-        if fname_ind == 0:
-            print 'Configuration file not found'
-            print 'Creating new configuration file ...'
-            print '************************************'
-            create_config(config_filename) # Creates a configuration file
-        break
     # Reads the config file and stores values in a dictionary
     Config_handle = cp.ConfigParser()
     Config_handle.read(config_filename)
@@ -103,6 +127,26 @@ def read_config(config_filename):
     ConfigParam['uniprot_path'] = Config_handle.get('SEQUENCE', 'BASE_URL')
     ConfigParam['ftp_date'] = Config_handle.get('REGEX', 'FTP_DATE')
     ConfigParam['ftp_file_start'] = Config_handle.get('REGEX', 'FTP_FILE_START')
+    _config_cache[config_path] = (mtime, ConfigParam)
+    return OrderedDict(ConfigParam)
+
+def default_config(work_dir='.'):
+    """
+    This method returns the default configuration, with the working 
+    directory work_dir, as an ordered dictionary with the same entries
+    as read_config. The values are the ones written by create_config.
+    """
+    ConfigParam = OrderedDict()
+    ConfigParam['workdir'] = work_dir
+    ConfigParam['ftp_host'] = 'ftp.ebi.ac.uk'
+    ConfigParam['ftp_curr_path'] = '/pub/databases/GO/goa/UNIPROT'
+    ConfigParam['ftp_old_path'] = '/pub/databases/GO/goa/old/UNIPROT'
+    ConfigParam['exp_eec'] = str(set(['EXP','IDA','IPI','IMP','IGI','IEP']))
+    ConfigParam['ont_def'] = str(set(['F','P','C']))
+    ConfigParam['tax_file'] = 'names.dmp'
+    ConfigParam['uniprot_path'] = 'www.uniprot.org/uniprot/'
+    ConfigParam['ftp_date'] = '[a-zA-Z]+\_\d+'
+    ConfigParam['ftp_file_start'] = 'gene_association'
     return ConfigParam
 
 if __name__ == '__main__':
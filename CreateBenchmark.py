@@ -36,95 +36,157 @@
        files - one file for each ontology - for both LK and NK types. Thus,
        create_benchmark() populates total SIX files.
 
-   The module also has the following two methods to aid the benchmark creation.
-
-   create_exp_ann_dict:
-       This method takes a GOA file with no header section. It creates
-       THREE dictionaries. A dictionary with <protein name, GO ID> pairs
-       for BPO type entries, one for CCO type entries, and the thrid one
-       for MFO type entries. Then it returns these THREE dictionaries.
-
-   write_benchmarks:
-      This method does the actual writing of the benchmark entries to the
-      benchmark output file. create_benchmarks repeatedly calls this method
-      to write the benchmarks to the output file.
+   The LK and NK membership of the proteins is decided from one index
+   (see GOAParser_cafa.aspect_mask_index) that maps each protein to a
+   mask of the ontologies of its t1 EXP, t1 non-EXP, and t2 EXP 
+   annotations. create_benchmarks then reads the t2_exp file again and
+   writes each of its GO terms to the benchmark files the protein 
+   belongs to, as given by GOAParser_cafa.BENCHMARK_MASKS.
+
+   The benchmark entries are written through BenchmarkWriter objects, 
+   which collect the lines of each benchmark file into large blocks. 
+   The blocks are written by a background WriterThread, so that writing
+   the files overlaps with the creation of the benchmarks.
+
+   create_benchmarks_streaming:
+      This method creates the same SIX benchmark files from the records
+      of the input files at t1 and t2 grouped by protein (see 
+      GOAParser.gafbyproteiniterator). Both files must be sorted by 
+      DB_Object_ID. The two files are merged protein by protein, and the
+      LK and NK membership of each protein is decided from its own 
+      records. Thus, only the records of one protein are kept in memory,
+      and the intermediate t1_iea, t1_exp, and t2_exp files are not
+      needed.
+
+   create_benchmarks_by_date:
+      This method creates the same SIX benchmark files from the records 
+      of ONE file grouped by protein. The records dated on or before a 
+      cutoff date (the Date column) take the place of the records of the
+      file at t1, and all the records take the place of the records of 
+      the file at t2. The benchmarks are approximate, as the Date column 
+      is the date of the last change of an annotation and the annotations 
+      removed after the cutoff date are not in the file.
+
+   compare_benchmarks:
+      This method counts the proteins and the GO terms that two benchmark
+      files have in common, for example a benchmark file created by 
+      create_benchmarks_by_date and one created from two files.
+
+   protein_taxa:
+      This method maps every protein of the t2_exp file to its taxon id.
+
+   split_benchmark_by_taxon:
+      This method partitions the lines of a benchmark file by the taxon 
+      id of their proteins. Benchmark uses these two methods for its 
+      --split-by-taxon option.
 '''
 
 import os
 import sys
+import threading
 from collections import defaultdict
+from Queue import Queue
 
-def create_exp_ann_dict(goa_exp_handle):
-    # Initialize THREE dictionaries:
-    t1_mfo_dict = defaultdict(lambda:set())
-    t1_bpo_dict = defaultdict(lambda:set())
-    t1_cco_dict = defaultdict(lambda:set())
+import GOAParser_cafa as gc
 
-    # Populate the dictionaries:
-    for lines in goa_exp_handle:
-        cols = lines.strip().split('\t')
-        if len(cols) < 15: # Skip lines NOT in GAF 1.0 or GAF 2.0 format
-            continue
-        if cols[8] == 'F': # Col 8: Ontology group
-            t1_mfo_dict[cols[1]].add(cols[4]) # Col 1: protein name, Col 2: GO ID
-        elif cols[8] == 'P':
-            t1_bpo_dict[cols[1]].add(cols[4])
-        elif cols[8] == 'C':
-            t1_cco_dict[cols[1]].add(cols[4])
-    return (t1_bpo_dict, t1_cco_dict, t1_mfo_dict)
-
-
-def write_NK_benchmarks(protName,
-                    t1_bpo_dict,
-                    t1_cco_dict,
-                    t1_mfo_dict,
-                    t2_xxo_dict, 
-                    bmfile_NK_xxo_handle  
-                   ):
-    '''
-    This method selects proteins for no-knowledge benchmarks in different 
-    ontological categories and does the actual writing.
-    t2_xxo_dict and bmfile_NK_xxo_handle should match: 
-    If t2_xxo_dict is for BPO then bmfile_NK_xxo_handle will also be for BPO
-    and so on. 
-    '''
-    if protName not in t1_mfo_dict and protName not in t1_bpo_dict and \
-       protName not in t1_cco_dict and protName in t2_xxo_dict:
-        # No-Knowledge benchmarks: BPO, CCO, or MFO type based on LKtype
-        for term in t2_xxo_dict[protName]:
-            print >> bmfile_NK_xxo_handle, str(protName) + '\t' + str(term)
-    return None
+class WriterThread(threading.Thread):
+    """
+    Background thread that writes blocks of text to their output files,
+    so that the output I/O overlaps with the creation of the benchmarks.
+    The blocks are written in the order they are queued. At most 
+    max_blocks blocks wait in the queue.
+    """
+    def __init__(self, max_blocks=16):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.queue = Queue(max_blocks)
+        self.error = None
+        self.start()
 
-def write_LK_benchmarks(protName,
-                    t1_bpo_dict,
-                    t1_cco_dict,
-                    t1_mfo_dict,
-                    t2_xxo_dict,
-                    bmfile_LK_xxo_handle,
-                    ontType # Can take string BPO, CCO, or MFO
-                   ):
-    '''
-    This method selects proteins for limited-knowledge benchmarks in 
-    different ontological categories and does the actual writing.
-    '''
-    if ontType.upper()=='BPO':
-        if protName not in t1_bpo_dict and protName in t2_xxo_dict and \
-          (protName in t1_cco_dict or protName in t1_mfo_dict):
-        # Limited-Knowledge benchmarks: BPO type
-            for term in t2_xxo_dict[protName]:
-                print >> bmfile_LK_xxo_handle, str(protName) + '\t' + str(term)
-    elif ontType.upper()=='CCO':
-        if protName not in t1_cco_dict and protName in t2_xxo_dict and \
-          (protName in t1_bpo_dict or protName in t1_mfo_dict):
-        # Limited-Knowledge benchmarks: CCO type
-            for term in t2_xxo_dict[protName]:
-                print >> bmfile_LK_xxo_handle, str(protName) + '\t' + str(term)
-    elif ontType.upper()=='MFO':
-        if protName not in t1_mfo_dict and protName in t2_xxo_dict and \
-          (protName in t1_cco_dict or protName in t1_cco_dict):
-        # Limited-Knowledge benchmarks: MFO type
-            for term in t2_xxo_dict[protName]:
-                print >> bmfile_LK_xxo_handle, str(protName) + '\t' + str(term)
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            if self.error is None:
+                handle, data = item
+                try:
+                    handle.write(data)
+                except Exception as e:
+                    # Raised again in the main thread by write or close:
+                    self.error = e
+        return None
+
+    def write(self, handle, data):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((handle, data))
+        return None
+
+    def close(self):
+        self.queue.put(None)
+        self.join()
+        if self.error is not None:
+            raise self.error
+        return None
+
+class BenchmarkWriter:
+    """
+    Buffered writer for the (protein name, GO term) lines of a benchmark
+    file. The lines are joined in blocks of about buffer_size bytes which
+    are written by writer_thread, or directly if writer_thread is None.
+    """
+    def __init__(self, handle, writer_thread=None, buffer_size=1<<16):
+        self.handle = handle
+        self.writer_thread = writer_thread
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.buffered = 0
+
+    def write(self, protName, terms):
+        prefix = protName + '\t'
+        lines = [prefix + term + '\n' for term in terms]
+        self.buffer.extend(lines)
+        # GO IDs have 10 characters:
+        self.buffered += len(lines) * (len(prefix) + 11)
+        if self.buffered >= self.buffer_size:
+            self.flush()
+        return None
+
+    def flush(self):
+        if self.buffer:
+            data = ''.join(self.buffer)
+            if self.writer_thread is None:
+                self.handle.write(data)
+            else:
+                self.writer_thread.write(self.handle, data)
+            self.buffer = []
+            self.buffered = 0
+        return None
+
+def open_benchmark_writers(handles, threaded=True):
+    '''
+    This method returns a BenchmarkWriter for each of the handles. The
+    writers share one background WriterThread if threaded is True.
+    '''
+    if threaded:
+        writer_thread = WriterThread()
+    else:
+        writer_thread = None
+    return [BenchmarkWriter(handle, writer_thread) for handle in handles]
+
+def close_benchmark_writers(writers):
+    '''
+    This method writes out the buffered lines of the writers, waits for 
+    their background thread and flushes the output files.
+    '''
+    for writer in writers:
+        writer.flush()
+    for writer_thread in set([w.writer_thread for w in writers]):
+        if writer_thread is not None:
+            writer_thread.close()
+    for writer in writers:
+        writer.handle.flush()
     return None
 
 def create_benchmarks(t1_iea_handle,
@@ -136,86 +198,280 @@ def create_benchmarks(t1_iea_handle,
                       bmfile_NK_bpo_handle,
                       bmfile_NK_cco_handle,
                       bmfile_NK_mfo_handle):
-    # Create dict for (protein, GO ID) from entries with EXP evidence code at t1:
-    t1_bpo_dict, t1_cco_dict, t1_mfo_dict = create_exp_ann_dict(t1_exp_handle)
+    # Ontologies of the EXP annotations at t1 and t2 and of the non-EXP
+    # annotations at t1 of every protein, in one mask per protein:
+    masks = gc.aspect_mask_index(t2_exp_handle, gc.T2_EXP)
+    gc.aspect_mask_index(t1_exp_handle, gc.T1_EXP, masks)
+    gc.aspect_mask_index(t1_iea_handle, gc.T1_IEA, masks)
 
-    # Create dict for (protein, GO ID) from entries with EXP evidence code at t2:
-    t2_bpo_dict, t2_cco_dict, t2_mfo_dict = create_exp_ann_dict(t2_exp_handle)
+    # The benchmark lines are buffered and written by a background thread:
+    bm_writers = open_benchmark_writers([bmfile_LK_bpo_handle,
+                                         bmfile_LK_cco_handle,
+                                         bmfile_LK_mfo_handle,
+                                         bmfile_NK_bpo_handle,
+                                         bmfile_NK_cco_handle,
+                                         bmfile_NK_mfo_handle])
+    LK_writers, NK_writers = bm_writers_by_bit(bm_writers)
 
-    # Populate benchmark files:
+    # Populate benchmark files with the GO terms of the t2 file:
     print 'Creating benchmark sets ...'
-    for lines in t1_iea_handle:
-        cols = lines.strip().split('\t')
-        if cols[8] == 'F':
-            # write out MFO type benchmarks:
-            write_NK_benchmarks(cols[1],
-                             t1_bpo_dict,
-                             t1_cco_dict,
-                             t1_mfo_dict,
-                             t2_mfo_dict,
-                             bmfile_NK_mfo_handle
-                            )
-            write_LK_benchmarks(cols[1],
-                             t1_bpo_dict,
-                             t1_cco_dict,
-                             t1_mfo_dict,
-                             t2_mfo_dict,
-                             bmfile_LK_mfo_handle,
-                             'MFO'
-                            )
-        elif cols[8] == 'P':
-            # write out BPO type benchmarks:
-            write_NK_benchmarks(cols[1],
-                              t1_bpo_dict,
-                              t1_cco_dict,
-                              t1_mfo_dict,
-                              t2_bpo_dict,
-                              bmfile_NK_bpo_handle
-                            )
-            write_LK_benchmarks(cols[1],
-                              t1_bpo_dict,
-                              t1_cco_dict,
-                              t1_mfo_dict,
-                              t2_bpo_dict,
-                              bmfile_LK_bpo_handle,
-                              'BPO'
-                            )
-        elif cols[8] == 'C':
-            # write out CCO type benchmarks:
-            write_NK_benchmarks(cols[1],
-                             t1_bpo_dict,
-                             t1_cco_dict,
-                             t1_mfo_dict,
-                             t2_cco_dict,
-                             bmfile_NK_cco_handle
-                            )
-            write_LK_benchmarks(cols[1],
-                             t1_bpo_dict,
-                             t1_cco_dict,
-                             t1_mfo_dict,
-                             t2_cco_dict,
-                             bmfile_LK_cco_handle,
-                             'CCO'
-                            )
-    # Clear all dictionaries:
-    t1_bpo_dict.clear()
-    t1_cco_dict.clear()
-    t1_mfo_dict.clear()
-
-    t2_bpo_dict.clear()
-    t2_cco_dict.clear()
-    t2_mfo_dict.clear()
+    t2_exp_handle.seek(0)
+    for lines in t2_exp_handle:
+        cols = lines.split('\t', 9)
+        if len(cols) < 10 or cols[8] not in gc.ASPECT_BITS:
+            continue
+        bit = gc.ASPECT_BITS[cols[8]]
+        NK_bits, LK_bits = gc.BENCHMARK_MASKS[masks[cols[1]]]
+        if NK_bits & bit:
+            NK_writers[bit].write(cols[1], [cols[4]])
+        elif LK_bits & bit:
+            LK_writers[bit].write(cols[1], [cols[4]])
+    close_benchmark_writers(bm_writers)
+    masks.clear()
     return None
 
-    # Clear all dictionaries:
-    t1_bpo_dict.clear()
-    t1_cco_dict.clear()
-    t1_mfo_dict.clear()
+def bm_writers_by_bit(bm_writers):
+    '''
+    This method returns two dictionaries that map the ontology bits (see
+    GOAParser_cafa.ASPECT_BITS) to the LK and NK writers in bm_writers,
+    which are in the order LK-BPO, LK-CCO, LK-MFO, NK-BPO, NK-CCO, NK-MFO.
+    '''
+    P, C, F = [gc.ASPECT_BITS[aspect] for aspect in 'PCF']
+    LK_writers = {P: bm_writers[0], C: bm_writers[1], F: bm_writers[2]}
+    NK_writers = {P: bm_writers[3], C: bm_writers[4], F: bm_writers[5]}
+    return (LK_writers, NK_writers)
+
+def _check_sorted(groups, file_name):
+    '''
+    Yields the groups of records of groups (see 
+    GOAParser.gafbyproteiniterator) and raises a ValueError when the 
+    DB_Object_ID of a group is not greater than the one of the previous
+    group (PRIVATE). file_name names the file in the error message.
+    '''
+    prev_prot = None
+    for group in groups:
+        prot = group[0]['DB_Object_ID']
+        if prev_prot is not None and prot <= prev_prot:
+            raise ValueError(file_name + ' is not sorted by ' + \
+                             'DB_Object_ID: ' + prot)
+        prev_prot = prot
+        yield group
 
-    t2_bpo_dict.clear()
-    t2_cco_dict.clear()
-    t2_mfo_dict.clear()
-    return None
+def merge_by_protein(t1_groups, t2_groups):
+    '''
+    This method merges two iterators over the records grouped by protein
+    (see GOAParser.gafbyproteiniterator) of the files at t1 and t2. For
+    every protein in the t2 file, it yields the protein name, the list of
+    records of the protein at t1 (an empty list if the protein is not in
+    the t1 file) and the list of records at t2. A ValueError is raised 
+    if a file is not sorted by DB_Object_ID; every t1 group is checked,
+    the ones after the last t2 protein included.
+    '''
+    t1_groups = _check_sorted(t1_groups, 't1 file')
+    t1_group = next(t1_groups, None)
+    for t2_group in _check_sorted(t2_groups, 't2 file'):
+        prot = t2_group[0]['DB_Object_ID']
+        # Skip the proteins at t1 that are not in the t2 file:
+        while t1_group is not None and t1_group[0]['DB_Object_ID'] < prot:
+            t1_group = next(t1_groups, None)
+        if t1_group is not None and t1_group[0]['DB_Object_ID'] == prot:
+            yield prot, t1_group, t2_group
+            t1_group = next(t1_groups, None)
+        else:
+            yield prot, [], t2_group
+    # The proteins at t1 after the last t2 protein are read only to check
+    # that they are sorted:
+    for t1_group in t1_groups:
+        pass
+
+def create_benchmarks_streaming(t1_groups,
+                                t2_groups,
+                                t2_filter,
+                                EXP_default,
+                                bmfile_LK_bpo_handle,
+                                bmfile_LK_cco_handle,
+                                bmfile_LK_mfo_handle,
+                                bmfile_NK_bpo_handle,
+                                bmfile_NK_cco_handle,
+                                bmfile_NK_mfo_handle,
+                                prot_taxa=None):
+    '''
+    This method creates the SIX benchmark files from the records of the 
+    t1 and t2 files grouped by protein. t2_filter is a function that 
+    returns True for the t2 records that pass the user filters (the 
+    records written to the t2_exp file by Benchmark). EXP_default is the
+    set of experimental evidence codes. The benchmarks written are the 
+    same as the ones of create_benchmarks. The method returns the number
+    of t2 records that pass the filters. If a dictionary prot_taxa is 
+    given, the taxon id of every protein with t2 records that pass the
+    filters is added to it (see protein_taxa).
+    '''
+    return benchmarks_by_protein(merge_by_protein(t1_groups, t2_groups),
+                                 t2_filter,
+                                 EXP_default,
+                                 [bmfile_LK_bpo_handle,
+                                  bmfile_LK_cco_handle,
+                                  bmfile_LK_mfo_handle,
+                                  bmfile_NK_bpo_handle,
+                                  bmfile_NK_cco_handle,
+                                  bmfile_NK_mfo_handle],
+                                 prot_taxa)
+
+def slice_by_date(groups, cutoff):
+    '''
+    This method takes an iterator over the records of one file grouped
+    by protein (see GOAParser.gafbyproteiniterator) and a cutoff date 
+    in the YYYYMMDD form of the Date column. In the same way as 
+    merge_by_protein, it yields for every protein the protein name, the
+    list of its records dated on or before the cutoff date (in place of
+    the records at t1) and the list of all its records (in place of the 
+    records at t2). A ValueError is raised if the file is not sorted by 
+    DB_Object_ID.
+    '''
+    prev_prot = None
+    for group in groups:
+        prot = group[0]['DB_Object_ID']
+        if prev_prot is not None and prot <= prev_prot:
+            raise ValueError('File is not sorted by DB_Object_ID: ' + prot)
+        prev_prot = prot
+        yield prot, [rec for rec in group if rec['Date'] <= cutoff], group
+
+def create_benchmarks_by_date(groups,
+                              cutoff,
+                              t2_filter,
+                              EXP_default,
+                              bmfile_LK_bpo_handle,
+                              bmfile_LK_cco_handle,
+                              bmfile_LK_mfo_handle,
+                              bmfile_NK_bpo_handle,
+                              bmfile_NK_cco_handle,
+                              bmfile_NK_mfo_handle,
+                              prot_taxa=None):
+    '''
+    This method creates the SIX benchmark files from the records of ONE
+    file grouped by protein, with the records dated on or before cutoff
+    as the records at t1 (see slice_by_date). The other arguments and 
+    the return value are the same as the ones of 
+    create_benchmarks_streaming.
+    '''
+    return benchmarks_by_protein(slice_by_date(groups, cutoff),
+                                 t2_filter,
+                                 EXP_default,
+                                 [bmfile_LK_bpo_handle,
+                                  bmfile_LK_cco_handle,
+                                  bmfile_LK_mfo_handle,
+                                  bmfile_NK_bpo_handle,
+                                  bmfile_NK_cco_handle,
+                                  bmfile_NK_mfo_handle],
+                                 prot_taxa)
+
+def benchmarks_by_protein(protein_recs, t2_filter, EXP_default, 
+                          bm_handles, prot_taxa=None):
+    '''
+    This method writes the benchmark entries of every protein yielded 
+    by protein_recs (see merge_by_protein and slice_by_date) to the SIX
+    benchmark files in bm_handles, in the order LK-BPO, LK-CCO, LK-MFO,
+    NK-BPO, NK-CCO, NK-MFO. It returns the number of t2 records that 
+    pass t2_filter.
+    '''
+    bm_writers = open_benchmark_writers(bm_handles)
+    LK_writers, NK_writers = bm_writers_by_bit(bm_writers)
+    t2_count = 0
+    print 'Creating benchmark sets ...'
+    for protName, t1_recs, t2_recs in protein_recs:
+        # GO terms with EXP evidence at t2, by ontology bit:
+        t2_terms = defaultdict(set)
+        for rec in t2_recs:
+            if t2_filter(rec):
+                t2_count += 1
+                if rec['Aspect'] in gc.ASPECT_BITS:
+                    t2_terms[gc.ASPECT_BITS[rec['Aspect']]].add(rec['GO_ID'])
+        if not t2_terms:
+            continue
+        if prot_taxa is not None:
+            prot_taxa[protName] = first_taxon(t2_recs[0]['Taxon_ID'])
+        # Mask of the protein (see GOAParser_cafa.aspect_mask_index). The
+        # t1 annotations count only in the ontologies with EXP evidence 
+        # at t2:
+        t2_mask = sum(t2_terms)
+        mask = t2_mask << gc.T2_EXP
+        for rec in t1_recs:
+            bit = gc.ASPECT_BITS.get(rec['Aspect'], 0) & t2_mask
+            if not bit:
+                continue
+            if rec['Evidence'] in EXP_default:
+                mask |= bit << gc.T1_EXP
+            else:
+                mask |= bit << gc.T1_IEA
+        NK_bits, LK_bits = gc.BENCHMARK_MASKS[mask]
+        for bit in t2_terms:
+            if NK_bits & bit:
+                # No-Knowledge benchmarks:
+                NK_writers[bit].write(protName, t2_terms[bit])
+            elif LK_bits & bit:
+                # Limited-Knowledge benchmarks:
+                LK_writers[bit].write(protName, t2_terms[bit])
+    close_benchmark_writers(bm_writers)
+    return t2_count
+
+def compare_benchmarks(bm_handle, ref_handle):
+    '''
+    This method compares the lines (protein, GO term) of the benchmark 
+    file bm_handle with the ones of the reference benchmark file 
+    ref_handle. It returns a tuple with the numbers of proteins in 
+    bm_handle, in ref_handle and in both, followed by the numbers of 
+    (protein, GO term) pairs in bm_handle, in ref_handle and in both.
+    '''
+    bm_pairs = set([tuple(inline.rstrip('\n').split('\t')[:2]) 
+                    for inline in bm_handle])
+    ref_pairs = set([tuple(inline.rstrip('\n').split('\t')[:2]) 
+                     for inline in ref_handle])
+    bm_prots = set([pair[0] for pair in bm_pairs])
+    ref_prots = set([pair[0] for pair in ref_pairs])
+    return (len(bm_prots), len(ref_prots), len(bm_prots & ref_prots),
+            len(bm_pairs), len(ref_pairs), len(bm_pairs & ref_pairs))
+
+def first_taxon(taxon_field):
+    '''
+    This method returns the first taxon id of a Taxon_ID field, given 
+    either as a string 'taxon:9606|taxon:...' or as a list of taxa, 
+    without the 'taxon:' prefix.
+    '''
+    if not type(taxon_field) is type(''):
+        taxon_field = taxon_field[0]
+    return taxon_field.split('|', 1)[0].replace('taxon:', '')
+
+def protein_taxa(t2_exp_handle):
+    '''
+    This method returns a dictionary that maps every protein of the 
+    t2_exp file to its taxon id (the first taxon of its Taxon_ID column,
+    see first_taxon). Only the protein and taxon columns of each line 
+    are split out.
+    '''
+    prot_taxa = {}
+    for inline in t2_exp_handle:
+        if inline[0] == '!':
+            continue
+        cols = inline.split('\t', 13)
+        if len(cols) < 13 or cols[1] in prot_taxa:
+            continue
+        prot_taxa[cols[1]] = first_taxon(cols[12])
+    return prot_taxa
+
+def split_benchmark_by_taxon(bm_handle, prot_taxa):
+    '''
+    This method reads the lines of a benchmark file (protein, GO term) 
+    and partitions them by the taxon id of their proteins, as given by 
+    the dictionary prot_taxa. It returns a dictionary that maps each
+    taxon id to the list of its lines, in the order of the file. The 
+    proteins missing from prot_taxa are put under the taxon id 
+    'unknown'.
+    '''
+    taxon_lines = defaultdict(list)
+    for inline in bm_handle:
+        prot = inline.split('\t', 1)[0]
+        taxon_lines[prot_taxa.get(prot, 'unknown')].append(inline)
+    return taxon_lines
 
 if __name__ == '__main__':
     print (sys.argv[0] + ':')
@@ -1,16 +1,25 @@
 #!/usr/bin/env python
 
 '''
-    This module has the following two methods:
+    This module has the following class and methods:
+
+    TargetWriter:
+        A buffered writer for the target sequence file (FASTA format) and
+        the target id -> protein name map file. It formats the FASTA 
+        entries directly from the sequence strings and writes both files
+        in large blocks. It is used by species_filter and 
+        species_filter_multi.
 
     species_filter:
-        This method takes four input arguments:
+        This method takes six input arguments:
             (1) a uniprot-swissProt file handle,
             (2) a taxonomy id,
             (3) an output file handle for writing target sequences,
             (4) an output file handle for writing the mapping between
-                target id and protein name, and
-            (5) the set of EXP codes.
+                target id and protein name,
+            (5) the set of EXP codes, and
+            (6) the number of residues per line in the target sequence
+                file (60 by default, 0 for no wrapping).
             
         If the function finds a protein that does NOT have any EXP evidence 
         code, it writes the protein sequence for that protein to the output 
@@ -34,18 +43,88 @@
                 taxonomy id
             Total number of sequences in the sprot file related to the the 
                 taxonomy id whose annotations have EXP evidence
+
+        The counts of all the taxonomy ids are computed in one scan of the
+        sprot file by AnnotationStats.sprot_stats (the Stats program).
+
+    species_filter_multi:
+        This method takes six input arguments:
+            (1) a uniprot-swissProt file name,
+            (2) a list of taxonomy ids,
+            (3) a dictionary mapping each taxonomy id to a pair of output
+                file handles: one for writing the target sequences and
+                one for writing the mapping between target id and 
+                protein name,
+            (4) the set of EXP codes,
+            (5) the number of processes to use, and
+            (6) the number of residues per line in the target sequence
+                files.
+
+        It generates the targets for all the taxonomy ids in ONE scan of
+        the sprot file by routing each record to the output files of its
+        taxonomy id. When more than one process is requested, the sprot
+        file is split into chunks at record boundaries and the chunks
+        are filtered in parallel. The targets are written in the order
+        of the sprot file, so the target ids are the same as in a 
+        sequential run.
+
+        It returns a dictionary with the number of target sequences 
+        written for each taxonomy id.
 '''
+import os
 import sys
-from Bio import SeqIO
-from Bio.Seq import Seq
-from Bio.SeqRecord import SeqRecord
-from Bio import SwissProt as sp
+from cStringIO import StringIO
+from multiprocessing import Pool
+import SwissProtParser as sp
+
+class TargetWriter:
+    """
+    Buffered writer for target sequences in FASTA format and for the
+    target id -> protein name mapping. The FASTA entries are formatted
+    directly from the sequence strings, wrapped at width residues per 
+    line (no wrapping if width is 0), and written to the output files
+    in large blocks of about buffer_size bytes.
+    """
+    def __init__(self, fh_targets, fh_map, width=60, buffer_size=1<<20):
+        self.fh_targets = fh_targets
+        self.fh_map = fh_map
+        self.width = width
+        self.buffer_size = buffer_size
+        self.seq_buffer = []
+        self.map_buffer = []
+        self.buffered = 0
+
+    def write(self, target_id, entry_name, accession, sequence):
+        target = "T" + str(target_id)
+        if self.width > 0 and len(sequence) > self.width:
+            w = self.width
+            sequence = '\n'.join([sequence[i:i+w] for i in 
+                                  xrange(0, len(sequence), w)])
+        entry = '>' + target + ' ' + entry_name + '\t' + accession + \
+                '\n' + sequence + '\n'
+        self.seq_buffer.append(entry)
+        self.map_buffer.append(target + '\t' + entry_name + '\t' + \
+                               accession + '\n')
+        self.buffered += len(entry)
+        if self.buffered >= self.buffer_size:
+            self.flush()
+        return None
+
+    def flush(self):
+        if self.seq_buffer:
+            self.fh_targets.write(''.join(self.seq_buffer))
+            self.fh_map.write(''.join(self.map_buffer))
+            self.seq_buffer = []
+            self.map_buffer = []
+            self.buffered = 0
+        return None
 
 def species_filter(fh_sprot, taxon_id, fh_targets, 
-                   fh_map, EXP_default=set([])):
+                   fh_map, EXP_default=set([]), width=60):
     # Initializes the target_id:
     target_id = int(taxon_id+"0000001")
-    outseq_list = []
+    # Buffered writer for the target sequences and the map:
+    writer = TargetWriter(fh_targets, fh_map, width)
 
     # Counts total number of sequences 
     # in the sprot file related to the the taxonomy id taxon_id:
@@ -75,40 +154,14 @@ def species_filter(fh_sprot, taxon_id, fh_targets,
                         break
 
             # If the protein has no EXP evidence,
-            # write the sequence to the output file:
+            # write the sequence and the mapping (target id -> 
+            # protein name) to the output files:
             if not exp_code:
-#                outseq = SeqRecord(Seq(rec.sequence),
-#                                   id="T"+str(target_id),
-#                                   description = "%s" %
-#                                   (rec.entry_name))
-
-                outseq = SeqRecord(Seq(rec.sequence),
-                                   id="T"+str(target_id),
-                                   description = "%s\t%s" %
-                                   (rec.entry_name, rec.accessions[0]))
-
-#                outseq = SeqRecord(Seq(rec.sequence),
-#                                   id="T"+str(target_id),
-#                                   description = "%s" %
-#                                   (rec.accessions[0]))
-                outseq_list = [outseq]
-                # Write out the sequence:
-                SeqIO.write(outseq_list,fh_targets, "fasta")
-                # Create target id -> protein name map string:
-#                mapStr = "T" + str(target_id) + '\t' + \
-#                               str(rec.entry_name) + '\n'
-
-                mapStr = "T" + str(target_id) + '\t' + \
-                               str(rec.entry_name) + '\t' + \
-                               str(rec.accessions[0]) + '\n'
-
-#                mapStr = "T" + str(target_id) + '\t' + \
-#                               str(rec.accessions[0]) + '\n'
-
-                # Write out the mapping (target id -> protein name):
-                fh_map.write("%s" % mapStr)
+                writer.write(target_id, rec.entry_name, 
+                             rec.accessions[0], rec.sequence)
                 target_id += 1
                 seqCount_no_exp += 1
+    writer.flush()
 #    return (seqCount, seqCount_no_exp)
     return seqCount_no_exp
 
@@ -149,6 +202,128 @@ def species_filter_count(fh_sprot, taxon_id, EXP_default=set([])):
                 seqCount_no_exp += 1
     return (rec_count, seqCount, seqCount_no_exp)
 
+def has_exp_evidence(rec, EXP_default=set([])):
+    """
+    This method returns True if any of the GO annotations of the
+    sprot record rec has an EXP evidence code. Otherwise, it 
+    returns False.
+    """
+    for crossRef in rec.cross_references:
+        if crossRef[0] == 'GO' and \
+           (crossRef[3].split(':'))[0] in EXP_default:
+            return True
+    return False
+
+def find_chunk_offsets(sprot_fname, nchunks):
+    """
+    This method splits the sprot file into (at most) nchunks byte ranges.
+    Each range starts at an 'ID' line, so that no record is split 
+    between two ranges. It returns a list of (start, end) offsets.
+    """
+    fsize = os.path.getsize(sprot_fname)
+    offsets = [0]
+    fh_sprot = open(sprot_fname, 'r')
+    for i in range(1, nchunks):
+        fh_sprot.seek(max(fsize * i / nchunks, offsets[-1]))
+        # Skip the partial line:
+        fh_sprot.readline()
+        while True:
+            pos = fh_sprot.tell()
+            line = fh_sprot.readline()
+            if not line:
+                pos = fsize
+                break
+            if line.startswith('ID   '):
+                break
+        if pos > offsets[-1]:
+            offsets.append(pos)
+    fh_sprot.close()
+    offsets.append(fsize)
+    return [(offsets[i], offsets[i+1]) for i in range(len(offsets)-1) 
+            if offsets[i] < offsets[i+1]]
+
+def _filter_chunk(args):
+    """
+    Filter the records in one byte range of the sprot file (PRIVATE).
+    This method is run in a worker process by species_filter_multi. 
+    It returns a list of (taxonomy id, entry name, accession, sequence)
+    tuples for the targets found in the range.
+    """
+    sprot_fname, start, end, taxon_set, EXP_default = args
+    fh_sprot = open(sprot_fname, 'r')
+    fh_sprot.seek(start)
+    chunk = StringIO(fh_sprot.read(end - start))
+    fh_sprot.close()
+    targets = []
+    for rec in sp.parse(chunk):
+        taxa = [t for t in rec.taxonomy_id if t in taxon_set]
+        if taxa and not has_exp_evidence(rec, EXP_default):
+            for t in taxa:
+                targets.append((t, rec.entry_name, rec.accessions[0],
+                                rec.sequence))
+    return targets
+
+def species_filter_multi(sprot_fname, taxon_ids, fh_dict,
+                         EXP_default=set([]), nprocs=1, width=60):
+    """
+    This method generates the targets of all the taxonomy ids in
+    taxon_ids in ONE scan of the sprot file sprot_fname. fh_dict maps
+    each taxonomy id to a pair of output file handles: (target
+    sequence file, target id -> protein name map file). A protein is
+    a target of a taxonomy id if it belongs to it and none of its GO
+    annotations has an evidence code in EXP_default.
+
+    With nprocs > 1, the file is split into chunks at record boundaries
+    which are filtered by nprocs worker processes; the targets are
+    still written in file order, so the target ids are the same as in
+    a sequential run. width is the number of residues per line in the
+    target sequence files (0 for no wrapping).
+
+    It returns a dictionary with the number of target sequences written
+    for each taxonomy id.
+    """
+    # Initializes the target_id, the target count, and the buffered
+    # writer for each taxonomy id:
+    target_id = dict((t, int(t+"0000001")) for t in taxon_ids)
+    seqCount_no_exp = dict((t, 0) for t in taxon_ids)
+    writers = dict((t, TargetWriter(fh_dict[t][0], fh_dict[t][1], width))
+                   for t in taxon_ids)
+    taxon_set = set(taxon_ids)
+
+    if nprocs <= 1:
+        # One sequential scan; each record is routed to the output
+        # files of its taxonomy id(s):
+        for rec in sp.parse(open(sprot_fname, 'r')):
+            taxa = [t for t in rec.taxonomy_id if t in taxon_set]
+            if taxa and not has_exp_evidence(rec, EXP_default):
+                for t in taxa:
+                    writers[t].write(target_id[t], rec.entry_name,
+                                     rec.accessions[0], rec.sequence)
+                    target_id[t] += 1
+                    seqCount_no_exp[t] += 1
+        for t in writers:
+            writers[t].flush()
+        return seqCount_no_exp
+
+    # Several chunks per process keep the workers busy:
+    chunks = [(sprot_fname, start, end, taxon_set, EXP_default) for 
+              (start, end) in find_chunk_offsets(sprot_fname, nprocs * 4)]
+    pool = Pool(nprocs)
+    try:
+        # imap returns the chunk results in file order:
+        for targets in pool.imap(_filter_chunk, chunks):
+            for (t, entry_name, accession, sequence) in targets:
+                writers[t].write(target_id[t], entry_name, accession,
+                                 sequence)
+                target_id[t] += 1
+                seqCount_no_exp[t] += 1
+    finally:
+        pool.close()
+        pool.join()
+    for t in writers:
+        writers[t].flush()
+    return seqCount_no_exp
+
 if __name__ == '__main__':
     print (sys.argv[0] + ':')
     print(__doc__)
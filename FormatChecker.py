@@ -29,8 +29,6 @@ import os
 import sys
 import re
 from os.path import basename
-
-from Bio import SwissProt as sp
 import stat
 
 def check_gaf_format(fh_goa):
@@ -58,6 +56,9 @@ def check_sprot_format(fh_sprot):
     Otherwise,
        it returns False.
     """
+    # Biopython is imported here, only when a SwissProt file is checked,
+    # so that the tools that read GAF files only start faster:
+    from Bio import SwissProt as sp
     iter_handle = sp.parse(fh_sprot) # sp.parse method returns a generator
     try:
         for rec in iter_handle:
@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+'''
+    This module selects the records of a UniProt-GOA file (GAF 1.0 or 2.0)
+    that satisfy a query, such as "EXP evidence, aspect F, taxon 9606",
+    without building a record dictionary for every line of the file.
+
+    A query is a dictionary of field values in the format used by
+    GOAParser.record_has, {'field_name': set([val1, val2])}. A record is
+    selected if EVERY field of the query has one of its values (for the
+    fields with several values separated by '|', such as Taxon_ID, one of
+    the values of the field is enough).
+
+    The query is compiled into two levels of checks on each line:
+        (1) substring checks on the whole line. For example, a record
+            with aspect F has '\tF\t' in its line. Most of the lines are
+            rejected here, without being split.
+        (2) exact checks on the columns of the query. The line is split
+            only up to the last column of the query.
+
+    This module has the following methods:
+
+    compile_query(query, fields=GOAParser.GAF20FIELDS):
+        This method returns a function that is called with a line of a
+        UniProt-GOA file (without the newline character) and returns True
+        if the record of the line satisfies the query.
+
+    query_anchor(query, fields=GOAParser.GAF20FIELDS, sample=None):
+        This method returns a string that is in the line of every record
+        that satisfies the query, or None. It is used by the mmap scan to
+        jump from one candidate line to the next. With a sample of the
+        file, the string that is the rarest in the sample is chosen, and
+        None is returned if even that string is frequent.
+
+    iter_mmap_lines(fname, anchor, start=0, end=None):
+        This method maps the file fname into memory and yields the lines
+        between the byte offsets start and end that contain the anchor
+        string, in lists of lines. The lines without the anchor are not
+        copied out of the mapped file.
+
+    gafquery(goa_fname, query, out_handle=None, nprocs=1, use_mmap=False,
+             tmp_dir=None):
+        This method returns the number of records of the UniProt-GOA file
+        goa_fname that satisfy the query. If out_handle is given, the
+        header and the lines of these records are written to it. The
+        file is scanned in nprocs byte ranges in parallel. With use_mmap,
+        the file is read through mmap and only the lines with the anchor
+        string of the query are checked (if the query has a rare enough
+        anchor string; otherwise all the lines are read as usual).
+
+    How to run this module:
+
+        > python GAFQuery.py goa_uniprot_all.gaf -e EXP IDA -a F -t 9606
+
+    prints the records with evidence code EXP or IDA, aspect F and taxon
+    id 9606. The following options are available:
+
+    -e EVIDENCE:     evidence codes
+    -a ASPECT:       aspects (F, P or C)
+    -t TAXON:        taxon ids (with or without the 'taxon:' prefix)
+    -b ASSIGNED_BY:  databases that made the annotations
+    -f FIELD=VALUES: values of any field, separated by commas, for
+                     example -f GO_ID=GO:0005515,GO:0005524
+    -o OUTPUT:       output file for the records. The default is the
+                     standard output.
+    -c:              print the number of records instead of the records
+    -P PROCESSES:    the number of processes that scan parts of the
+                     file in parallel. The default is 1. A gzip
+                     compressed file is always read by a single process.
+    -m:              read the file through mmap. This is faster for a
+                     query with few matching records.
+'''
+import os
+import sys
+import mmap
+import shutil
+import argparse
+import tempfile
+from multiprocessing import Pool
+
+import GOAParser
+
+# Columns of a GAF file that may have several values separated by '|':
+MULTI_VALUE_FIELDS = set(['Qualifier', 'DB:Reference', 'With', 'Synonym',
+                          'Taxon_ID'])
+
+def _query_columns(query, fields):
+    """
+    Returns the (column index, field name, set of values) triplets of the
+    query, ordered by column index (PRIVATE). An unknown field name
+    raises a ValueError.
+    """
+    columns = []
+    for field in query:
+        if field not in fields:
+            raise ValueError('Unknown GAF field in the query: ' + field)
+        columns.append((fields.index(field), field, frozenset(query[field])))
+    columns.sort()
+    return columns
+
+def _field_literals(col, field, values, fields):
+    """
+    Returns, for each value of a field, a string that is in the line of
+    every record with this value (PRIVATE). The values of a single value
+    column are surrounded by their tab characters.
+    """
+    if field in MULTI_VALUE_FIELDS:
+        return [value for value in values]
+    literals = []
+    for value in values:
+        if col > 0:
+            value = '\t' + value
+        if col < len(fields) - 1:
+            value = value + '\t'
+        literals.append(value)
+    return literals
+
+def compile_query(query, fields=GOAParser.GAF20FIELDS):
+    """
+    Compiles a query into a function that accepts a line of a GAF file
+    and returns True if the record satisfies the query. The substring
+    checks of each field are done before the line is split.
+    """
+    columns = _query_columns(query, fields)
+    # Substring checks, the longest (most selective) strings first:
+    line_checks = []
+    for col, field, values in columns:
+        line_checks.append(tuple(_field_literals(col, field, values,
+                                                 fields)))
+    line_checks.sort(key=lambda literals: -min([len(s) for s in literals]))
+    single_checks = [literals[0] for literals in line_checks
+                     if len(literals) == 1]
+    multi_checks = [literals for literals in line_checks
+                    if len(literals) > 1]
+    col_checks = [(col, values, field in MULTI_VALUE_FIELDS) for
+                  col, field, values in columns]
+    max_col = columns[-1][0] if columns else 0
+
+    def match(line):
+        for literal in single_checks:
+            if literal not in line:
+                return False
+        for literals in multi_checks:
+            for literal in literals:
+                if literal in line:
+                    break
+            else:
+                return False
+        cols = line.rstrip('\r').split('\t', max_col + 1)
+        if len(cols) <= max_col:
+            return False
+        for col, values, multi in col_checks:
+            if multi:
+                if values.isdisjoint(cols[col].split('|')):
+                    return False
+            elif cols[col] not in values:
+                return False
+        return True
+    return match
+
+def query_anchor(query, fields=GOAParser.GAF20FIELDS, sample=None):
+    """
+    Returns a string that is in the line of every record that satisfies
+    the query. Only the fields with a single value give such a string.
+    Without a sample, the longest string is returned. With a sample (a
+    block of lines of the file), the string found in the fewest lines of
+    the sample is returned, and None is returned if that string is found
+    in more than a quarter of the lines; scanning for a frequent string
+    is slower than reading all the lines. If the query has no such
+    string, it returns None.
+    """
+    anchors = []
+    for col, field, values in _query_columns(query, fields):
+        if len(values) != 1:
+            continue
+        literal = _field_literals(col, field, values, fields)[0]
+        # An empty value would give an anchor found in most lines:
+        if literal.strip('\t'):
+            anchors.append(literal)
+    if not anchors:
+        return None
+    if sample is None:
+        return max(anchors, key=len)
+    counts = [(sample.count(anchor), -len(anchor), anchor) for
+              anchor in anchors]
+    count, length, anchor = min(counts)
+    if count * 4 > sample.count('\n'):
+        return None
+    return anchor
+
+def iter_mmap_lines(fname, anchor, start=0, end=None):
+    """
+    Yields the lines of the file fname between the byte offsets start and
+    end (the end of the file, if end is None) that contain the string
+    anchor, in lists of lines without the newline character. The file is
+    mapped into memory and searched for the anchor, so the other lines
+    are skipped without being read line by line.
+    """
+    handle = open(fname, 'rb')
+    if os.path.getsize(fname) == 0:
+        handle.close()
+        return
+    mfile = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if end is None:
+        end = len(mfile)
+    lines = []
+    pos = mfile.find(anchor, start, end)
+    while pos >= 0:
+        line_start = mfile.rfind('\n', start, pos) + 1
+        if line_start == 0:
+            line_start = start
+        line_end = mfile.find('\n', pos, end)
+        if line_end < 0:
+            line_end = end
+        lines.append(mfile[line_start:line_end])
+        if len(lines) == 4096:
+            yield lines
+            lines = []
+        pos = mfile.find(anchor, line_end, end)
+    if lines:
+        yield lines
+    mfile.close()
+    handle.close()
+
+def _query_chunk(args):
+    """
+    Checks the lines of one byte range of the GAF file against the query
+    (PRIVATE). The selected lines are written to part_fname, unless it is
+    None. This method is run in a worker process by gafquery. It returns
+    the number of selected lines.
+    """
+    goa_fname, start, end, query, fields, anchor, part_fname = args
+    match = compile_query(query, fields)
+    if anchor is not None:
+        blocks = iter_mmap_lines(goa_fname, anchor, start, end)
+    else:
+        blocks = GOAParser.iter_line_blocks(goa_fname, start, end)
+    if part_fname is not None:
+        part_handle = open(part_fname, 'w')
+    count = 0
+    for lines in blocks:
+        kept = [line for line in lines if line[:1] != '!' and match(line)]
+        count += len(kept)
+        if kept and part_fname is not None:
+            part_handle.write('\n'.join(kept) + '\n')
+    if part_fname is not None:
+        part_handle.close()
+    return count
+
+def gafquery(goa_fname, query, out_handle=None, nprocs=1, use_mmap=False,
+             tmp_dir=None):
+    """
+    Returns the number of records of the GAF file goa_fname that satisfy
+    the query. If out_handle is given, the header of the file and the
+    lines of these records (in file order) are written to it.
+    The field layout (GAF 1.0 or 2.0) is taken from the header.
+    The file is scanned in nprocs byte ranges in parallel; each range
+    writes its lines to a temporary part file in tmp_dir, and the part
+    files are copied to out_handle in the order of the ranges.
+    With use_mmap, a plain (not compressed) file is read through mmap and
+    only the lines containing the anchor string of the query are checked,
+    if the query has an anchor string that is rare in the first block of
+    the file.
+    """
+    header = GOAParser.read_header(goa_fname)
+    if '!gaf-version: 2.0' in [line.strip() for line in header]:
+        fields = GOAParser.GAF20FIELDS
+    else:
+        fields = GOAParser.GAF10FIELDS
+    # Raises a ValueError for an unknown field name before any work:
+    compile_query(query, fields)
+    anchor = None
+    if use_mmap and not goa_fname.endswith('.gz'):
+        # The anchor is chosen on the first block of the file:
+        sample_handle = open(goa_fname, 'r')
+        anchor = query_anchor(query, fields,
+                              sample_handle.read(GOAParser.READ_BLOCK))
+        sample_handle.close()
+    jobs = []
+    for start, end in GOAParser.find_line_offsets(goa_fname, max(nprocs, 1)):
+        part_fname = None
+        if out_handle is not None:
+            fd, part_fname = tempfile.mkstemp(suffix='.part', dir=tmp_dir)
+            os.close(fd)
+        jobs.append((goa_fname, start, end, query, fields, anchor,
+                     part_fname))
+    try:
+        if nprocs > 1 and len(jobs) > 1:
+            pool = Pool(nprocs)
+            counts = pool.map(_query_chunk, jobs)
+            pool.close()
+            pool.join()
+        else:
+            counts = [_query_chunk(job) for job in jobs]
+        if out_handle is not None:
+            out_handle.writelines(header)
+            for job in jobs:
+                part_handle = open(job[-1], 'r')
+                shutil.copyfileobj(part_handle, out_handle)
+                part_handle.close()
+    finally:
+        for job in jobs:
+            if job[-1] is not None and os.path.exists(job[-1]):
+                os.remove(job[-1])
+    return sum(counts)
+
+def parse_query_args(args):
+    """
+    Builds a query dictionary from the parsed command line arguments.
+    """
+    query = {}
+    if args.evidence:
+        query['Evidence'] = set(args.evidence)
+    if args.aspect:
+        query['Aspect'] = set(args.aspect)
+    if args.taxon:
+        query['Taxon_ID'] = set([taxon if taxon.startswith('taxon:') else
+                                 'taxon:' + taxon for taxon in args.taxon])
+    if args.assigned_by:
+        query['Assigned_By'] = set(args.assigned_by)
+    for field_values in args.field:
+        if '=' not in field_values:
+            raise ValueError('Expected FIELD=VALUES: ' + field_values)
+        field, values = field_values.split('=', 1)
+        query.setdefault(field, set()).update(values.split(','))
+    return query
+
+if __name__ == '__main__':
+    if len(sys.argv) == 1:
+        print (sys.argv[0] + ':')
+        print(__doc__)
+    else:
+        parser = argparse.ArgumentParser(description='Selects the ' + \
+                    'records of a UniProt-GOA file that satisfy a query')
+        parser.add_argument('goa_fname')
+        parser.add_argument('-e', '--evidence', nargs='+', default=[])
+        parser.add_argument('-a', '--aspect', nargs='+', default=[])
+        parser.add_argument('-t', '--taxon', nargs='+', default=[])
+        parser.add_argument('-b', '--assigned_by', nargs='+', default=[])
+        parser.add_argument('-f', '--field', action='append', default=[])
+        parser.add_argument('-o', '--output', default='')
+        parser.add_argument('-c', '--count', action='store_true')
+        parser.add_argument('-P', '--processes', type=int, default=1)
+        parser.add_argument('-m', '--mmap', action='store_true')
+        args = parser.parse_args()
+        try:
+            query = parse_query_args(args)
+            if args.count:
+                out_handle = None
+            elif args.output:
+                out_handle = open(args.output, 'w')
+            else:
+                out_handle = sys.stdout
+            count = gafquery(args.goa_fname, query, out_handle,
+                             args.processes, args.mmap)
+        except ValueError as e:
+            print >> sys.stderr, str(e)
+            sys.exit(1)
+        if args.count:
+            print count
+        elif args.output:
+            out_handle.close()
+            print args.output + ': ' + str(count) + ' records'
+    sys.exit(0)
@@ -54,34 +54,73 @@
         based on GPA file format version and retuns an iterator to read a file
         either in GPA format version 1.0 or 1.1
 
-    _gaf20iterator(handle):
+    _gaf20iterator(handle, rawline=False, prefilter=None):
         This method returns an iterator to read a file in GAF format 
         version 2.0
 
-    _gaf10iterator(handle):
+    _gaf10iterator(handle, rawline=False, prefilter=None):
         This method returns an iterator to read a file in GAF format 
         version 1.0
 
-    gafiterator(handle):
+    gafiterator(handle, rawline=False, prefilter=None):
         This method invokes _gaf10iterator or _gaf20iterator private methods
         based on GAF file format version and retuns an iterator to read a file
-        either in GAF format version 1.0 or 2.0
-
-    _gaf10byproteiniterator(handle):
+        either in GAF format version 1.0 or 2.0. If rawline is True, every
+        record carries its original line (under the key RAWLINE) so that
+        the unmodified records can be written out without formatting them
+        again. prefilter is an optional function that is called with each
+        record line before it is parsed; the lines it rejects are skipped.
 
+    _gaf10byproteiniterator(handle, rawline=False, check_sorted=False):
+        This method returns an iterator to read a file in GAF format 
+        version 1.0 by protein
 
-    _gaf20byproteiniterator(handle):
+    _gaf20byproteiniterator(handle, rawline=False, check_sorted=False):
+        This method returns an iterator to read a file in GAF format 
+        version 2.0 by protein
 
-    gafbyproteiniterator(handle):
+    gafbyproteiniterator(handle, rawline=False, check_sorted=False):
         This method invokes _gaf10byproteiniterator or _gaf20byproteiniterator
         private methods based on GAF file format version and retuns an 
         iterator to read a file either in GAF format version 1.0 or 2.0.
-        The iterator goes over the consecutive records with the same 
-        DB_OBJECT_ID. 
-
-    writerec(outrec,handle,fields=GAF20FIELDS)
+        The iterator yields each list of consecutive records with the same 
+        DB_OBJECT_ID once, including the last one of the file. With 
+        check_sorted, it raises a ValueError if the file is not sorted 
+        by DB_Object_ID.
+
+    sort_gaf_file(infile, outfile, tmp_dir=None)
+        This method sorts the records of a GAF file by DB_Object_ID with
+        the external sort program. It is the fallback for the files that
+        are not grouped by protein.
+
+    find_line_offsets(fname, nchunks)
+        This method splits a file into (at most) nchunks byte ranges that
+        start at the beginning of a line, so that the ranges can be 
+        scanned by different processes. A gzip compressed file is a
+        single range.
+
+    iter_line_blocks(fname, start=0, end=None)
+        This method reads the lines of a file (or of a byte range of it)
+        in large blocks and yields them as lists of lines without the 
+        newline character. gzip compressed files (.gz) are supported.
+
+    read_header(goa_fname)
+        This method returns the header lines (starting with '!') at the
+        beginning of a GAF file.
+
+    gaf_formatter(fields=GAF20FIELDS)
+        This method returns a function that formats a UniProt-GOA record
+        as a line in the given field layout. The function is built only
+        once for each field layout.
+
+    writerec(outrec,handle,fields=GAF20FIELDS,passthrough=False)
         This method writes a single UniProt-GOA reacord to an output file
-        stream.    
+        stream. With passthrough, a record that still has its original
+        input line is written as that line.
+
+    writerecs(outrecs,handle,fields=GAF20FIELDS,passthrough=False)
+        This method writes the UniProt-GOA records of a list or an 
+        iterator to an output file stream in large blocks.
 
     writebyproteinrec(outprotrec,handle,fields=GAF20FIELDS)
         This method writes a list of UniProt-GOA records to an output file 
@@ -102,8 +141,11 @@
     http://www.geneontology.org/GO.format.annotation.shtml
 
 """
-import copy
+import gzip
+import os
+import subprocess
 import sys
+from operator import itemgetter
 
 # GAF version 2.0
 GAF20FIELDS = ['DB' , 
@@ -298,127 +340,311 @@ def gpa_iterator(handle):
         sys.stderr.write("gpa 1.0\n")
         return _gpa10iterator(handle)
 
-def _gaf20iterator(handle):
+def _gaf20iterator(handle, rawline=False, prefilter=None):
     for inline in handle:
         if inline[0] == '!': continue
-        inrec = inline.rstrip('\n').split('\t')
-        if len(inrec) == 1:
+        # Lines without any column (such as blank lines) are skipped
+        # before prefilter sees them:
+        if not '\t' in inline:
+            continue
+        if prefilter is not None and not prefilter(inline):
             continue
+        inrec = inline.rstrip('\n').split('\t')
         inrec[3] = inrec[3].split('|') #Qualifier
         inrec[5] = inrec[5].split('|') # DB:reference(s)
         inrec[7] = inrec[7].split('|') # With || From
         inrec[10] = inrec[10].split('|') # Synonym
         inrec[12] = inrec[12].split('|') # Taxon
-        yield dict(zip(GAF20FIELDS, inrec))
+        rec = dict(zip(GAF20FIELDS, inrec))
+        if rawline:
+            # Keep the original line for writing it out unchanged:
+            if inline[-1] != '\n':
+                inline += '\n'
+            rec[RAWLINE] = inline
+        yield rec
 
 
-def _gaf10iterator(handle):
+def _gaf10iterator(handle, rawline=False, prefilter=None):
     for inline in handle:
         if inline[0] == '!': continue
-        inrec = inline.rstrip('\n').split('\t')
-        if len(inrec) == 1:
+        # Lines without any column (such as blank lines) are skipped
+        # before prefilter sees them:
+        if not '\t' in inline:
             continue
-        inrec[3] = inrec[3].split('|') #Qualifier
-        inrec[5] = inrec[5].split('|') # DB:reference(s)
-        inrec[7] = inrec[7].split('|') # With || From
-        inrec[10] = inrec[10].split('|') # Synonym
-        inrec[12] = inrec[12].split('|') # Taxon
-        yield dict(zip(GAF10FIELDS, inrec))
-
-def _gaf10byproteiniterator(handle):
-    cur_id = None
-    id_rec_list = []
-    for inline in handle:
-        if inline[0] == '!': continue
-        inrec = inline.rstrip('\n').split('\t')
-        if len(inrec) == 1:
+        if prefilter is not None and not prefilter(inline):
             continue
+        inrec = inline.rstrip('\n').split('\t')
         inrec[3] = inrec[3].split('|') #Qualifier
         inrec[5] = inrec[5].split('|') # DB:reference(s)
         inrec[7] = inrec[7].split('|') # With || From
         inrec[10] = inrec[10].split('|') # Synonym
         inrec[12] = inrec[12].split('|') # Taxon
-        cur_rec = dict(zip(GAF10FIELDS, inrec))
-        if cur_rec['DB_Object_ID'] != cur_id and cur_id:
-            ret_list = copy.copy(id_rec_list)
-            id_rec_list = [cur_rec]
-            cur_id = cur_rec['DB_Object_ID']
-            yield ret_list
-        else:
-            cur_id = cur_rec['DB_Object_ID']
-            id_rec_list.append(cur_rec)
-
-def _gaf20byproteiniterator(handle):
+        rec = dict(zip(GAF10FIELDS, inrec))
+        if rawline:
+            # Keep the original line for writing it out unchanged:
+            if inline[-1] != '\n':
+                inline += '\n'
+            rec[RAWLINE] = inline
+        yield rec
+
+def _groupbyprotein(rec_iter, check_sorted=False):
+    """
+    Group consecutive records with the same DB_Object_ID (PRIVATE).
+    Each group is yielded once, as a new list, and the last group is 
+    yielded at the end of the file. If check_sorted is True, a 
+    ValueError is raised when a DB_Object_ID is smaller than the one 
+    of the previous group, i.e. when the file is not sorted by protein
+    (in the byte order of sort_gaf_file). Only the previous 
+    DB_Object_ID is kept for the check.
+    """
     cur_id = None
     id_rec_list = []
-    for inline in handle:
-        if inline[0] == '!': continue
-        inrec = inline.rstrip('\n').split('\t')
-        if len(inrec) == 1:
-            continue
-        inrec[3] = inrec[3].split('|') #Qualifier
-        inrec[5] = inrec[5].split('|') # DB:reference(s)
-        inrec[7] = inrec[7].split('|') # With || From
-        inrec[10] = inrec[10].split('|') # Synonym
-        inrec[12] = inrec[12].split('|') # Taxon
-        cur_rec = dict(zip(GAF20FIELDS, inrec))
-        if cur_rec['DB_Object_ID'] != cur_id and cur_id:
-            ret_list = copy.copy(id_rec_list)
-            id_rec_list = [cur_rec]
+    for cur_rec in rec_iter:
+        if cur_rec['DB_Object_ID'] != cur_id:
+            if id_rec_list:
+                yield id_rec_list
+            if check_sorted and cur_id is not None and \
+               cur_rec['DB_Object_ID'] < cur_id:
+                raise ValueError('Records are not sorted by ' + \
+                                 'DB_Object_ID: ' + cur_rec['DB_Object_ID'])
             cur_id = cur_rec['DB_Object_ID']
-            yield ret_list
+            id_rec_list = [cur_rec]
         else:
-            cur_id = cur_rec['DB_Object_ID']
             id_rec_list.append(cur_rec)
+    if id_rec_list:
+        yield id_rec_list
+
+def _gaf10byproteiniterator(handle, rawline=False, check_sorted=False):
+    return _groupbyprotein(_gaf10iterator(handle, rawline), check_sorted)
+
+def _gaf20byproteiniterator(handle, rawline=False, check_sorted=False):
+    return _groupbyprotein(_gaf20iterator(handle, rawline), check_sorted)
 
-def gafbyproteiniterator(handle):
+def gafbyproteiniterator(handle, rawline=False, check_sorted=False):
     """
     Iterates over records in a gene association file. 
     Returns a list of all consecutive records with the same DB_Object_ID
     This function should be called to read a
     gene_association.goa_uniprot file. Reads the first record and
     returns a gaf 2.0 or a gaf 1.0 iterator as needed
+    The rawline argument has the same meaning as in gafiterator. If 
+    check_sorted is True, the iterator raises a ValueError when the 
+    file is not sorted by DB_Object_ID (see sort_gaf_file).
     """
     inline = handle.readline()
     if inline.strip() == '!gaf-version: 2.0':
         sys.stderr.write("gaf 2.0\n")
-        return _gaf20byproteiniterator(handle)
+        return _gaf20byproteiniterator(handle, rawline, check_sorted)
     else:
         sys.stderr.write("gaf 1.0\n")
-        return _gaf10byproteiniterator(handle)
+        return _gaf10byproteiniterator(handle, rawline, check_sorted)
 
-def gafiterator(handle):
+def sort_gaf_file(infile, outfile, tmp_dir=None):
+    """
+    Sorts the records of the GAF file infile by DB_Object_ID and writes
+    them to outfile, after the header lines of infile. The records are
+    sorted by the external sort program, so files larger than memory can
+    be sorted. The order of the records of a protein is kept. tmp_dir is
+    the directory for the temporary files of sort.
+    """
+    # Header lines first:
+    outfile_handle = open(outfile, 'w')
+    for inline in open(infile, 'r'):
+        if inline[0] != '!':
+            break
+        outfile_handle.write(inline)
+    outfile_handle.flush()
+    # Records sorted by the second column, bytewise:
+    env = dict(os.environ)
+    env['LC_ALL'] = 'C'
+    sort_cmd = ['sort', '-s', '-t', '\t', '-k', '2,2']
+    if tmp_dir:
+        sort_cmd += ['-T', tmp_dir]
+    grep_proc = subprocess.Popen(['grep', '-v', '^!', infile],
+                                 stdout=subprocess.PIPE)
+    sort_proc = subprocess.Popen(sort_cmd, stdin=grep_proc.stdout,
+                                 stdout=outfile_handle, env=env)
+    grep_proc.stdout.close()
+    sort_proc.wait()
+    grep_proc.wait()
+    outfile_handle.close()
+    if sort_proc.returncode != 0:
+        raise IOError('Sorting failed: ' + infile)
+    return outfile
+
+# Number of bytes read at a time by iter_line_blocks:
+READ_BLOCK = 1 << 22
+
+def find_line_offsets(fname, nchunks):
+    """
+    Splits the file fname into (at most) nchunks byte ranges. Each range
+    starts at the beginning of a line. It returns a list of (start, end)
+    offsets. A gzip compressed file (.gz) cannot be split, so it is
+    returned as the single range (0, None).
+    """
+    if fname.endswith('.gz'):
+        return [(0, None)]
+    fsize = os.path.getsize(fname)
+    offsets = [0]
+    handle = open(fname, 'r')
+    for i in range(1, nchunks):
+        handle.seek(max(fsize * i / nchunks, offsets[-1]))
+        # Skip the partial line:
+        handle.readline()
+        pos = handle.tell()
+        if pos > offsets[-1] and pos < fsize:
+            offsets.append(pos)
+    handle.close()
+    offsets.append(fsize)
+    return [(offsets[i], offsets[i+1]) for i in range(len(offsets)-1)
+            if offsets[i] < offsets[i+1]]
+
+def iter_line_blocks(fname, start=0, end=None):
+    """
+    Yields the lines of the file fname between the byte offsets start
+    and end (the end of the file, if end is None) in lists of lines.
+    The newline characters are removed. start must be the beginning of
+    a line (see find_line_offsets). A gzip compressed file (.gz) is
+    decompressed on the fly and read from the beginning to the end.
+    """
+    if fname.endswith('.gz'):
+        handle = gzip.open(fname, 'rb')
+        remaining = None
+    else:
+        handle = open(fname, 'r')
+        handle.seek(start)
+        if end is None:
+            remaining = os.path.getsize(fname) - start
+        else:
+            remaining = end - start
+    tail = ''
+    while remaining is None or remaining > 0:
+        if remaining is None:
+            block = handle.read(READ_BLOCK)
+        else:
+            block = handle.read(min(READ_BLOCK, remaining))
+        if not block:
+            break
+        if remaining is not None:
+            remaining -= len(block)
+        lines = (tail + block).split('\n')
+        # The last line is completed by the next block:
+        tail = lines.pop()
+        yield lines
+    if tail:
+        yield [tail]
+    handle.close()
+
+def read_header(goa_fname):
+    """
+    Returns the header lines (starting with '!') at the beginning of the
+    GAF file goa_fname (plain or gzip compressed).
+    """
+    header = []
+    for lines in iter_line_blocks(goa_fname):
+        for line in lines:
+            if line[:1] != '!':
+                return header
+            header.append(line + '\n')
+    return header
+
+def gafiterator(handle, rawline=False, prefilter=None):
     """
     Iterate pver a GAF 1.0 or 2.0 file.
     This function should be called to read a
     gene_association.goa_uniprot file. Reads the first record and
     returns a gaf 2.0 or a gaf 1.0 iterator as needed
+    If rawline is True, each record also has its original line under
+    the key RAWLINE, so that writerec and writerecs can write an 
+    unmodified record without formatting it again.
+    If prefilter is given, it is called with every record line (a line
+    with at least one tab) before the line is parsed, and the lines for
+    which it returns False are skipped. A
+    cheap test on the line (such as a bounded split for one column) 
+    saves the parsing of the records that would be rejected anyway.
     """
     inline = handle.readline()
     if inline.strip() == '!gaf-version: 2.0':
         sys.stderr.write("gaf 2.0\n")
-        return _gaf20iterator(handle)
+        return _gaf20iterator(handle, rawline, prefilter)
     else:
         sys.stderr.write("gaf 1.0\n")
-        return _gaf10iterator(handle)
+        return _gaf10iterator(handle, rawline, prefilter)
+
+# Key of the original input line in a record. The key is present only
+# in the records read by an iterator that is asked to keep the lines:
+RAWLINE = '_raw_line'
 
-def writerec(outrec,handle,fields=GAF20FIELDS):
+# Number of lines written at a time by writerecs:
+WRITE_BLOCK = 10000
+
+# Compiled formatters, by the tuple of the field names of the layout:
+_formatters = {}
+
+# Tuples of the module layouts, built once for the records written with
+# them:
+_GAF20LAYOUT = tuple(GAF20FIELDS)
+_GAF10LAYOUT = tuple(GAF10FIELDS)
+
+def gaf_formatter(fields=GAF20FIELDS):
+    """
+    Returns a function that formats a UniProt-GOA record as a line with 
+    the given field layout. The function is built once for each layout
+    (GAF10FIELDS, GAF20FIELDS, ...) and reused afterwards. The values 
+    that are lists are joined with '|' and the fields with tabs.
+    """
+    if fields is GAF20FIELDS:
+        layout = _GAF20LAYOUT
+    elif fields is GAF10FIELDS:
+        layout = _GAF10LAYOUT
+    else:
+        layout = tuple(fields)
+    format_rec = _formatters.get(layout)
+    if format_rec is None:
+        getter = itemgetter(*layout)
+        def format_rec(outrec):
+            return '\t'.join([('|'.join(v) if v.__class__ is list else v)
+                              for v in getter(outrec)]) + '\n'
+        _formatters[layout] = format_rec
+    return format_rec
+
+def writerec(outrec,handle,fields=GAF20FIELDS,passthrough=False):
     """Write a single UniProt-GOA record to an output stream. 
 
     Caller should know the  format version. Default: gaf-2.0
-    If header has a value, then it is assumed this is the first record,
-    a header is written.
-    """
-    outstr = ''
-    for field in fields[:-1]:
-        if isinstance(outrec[field], list):
-            for subfield in outrec[field]:
-                outstr += subfield + '|'
-            outstr = outstr[:-1] + '\t'
+    If passthrough is True and the record has its original input
+    line (see RAWLINE), that line is written unchanged. The caller
+    must make sure the record has not been modified.
+    """
+    if passthrough and RAWLINE in outrec:
+        handle.write(outrec[RAWLINE])
+    else:
+        handle.write(gaf_formatter(fields)(outrec))
+
+def writerecs(outrecs,handle,fields=GAF20FIELDS,passthrough=False):
+    """
+    Write UniProt-GOA records from a list or an iterator to an output 
+    stream. The lines are written in blocks of WRITE_BLOCK lines.
+    Caller should know the  format version. Default: gaf-2.0
+    The passthrough argument has the same meaning as in writerec.
+    Returns the number of records written.
+    """
+    format_rec = gaf_formatter(fields)
+    count = 0
+    block = []
+    for outrec in outrecs:
+        if passthrough and RAWLINE in outrec:
+            block.append(outrec[RAWLINE])
         else:
-            outstr += outrec[field] + '\t'
-    outstr += outrec[fields[-1]] + '\n'
-    handle.write("%s" % outstr)
+            block.append(format_rec(outrec))
+        if len(block) >= WRITE_BLOCK:
+            handle.write(''.join(block))
+            count += len(block)
+            block = []
+    if block:
+        handle.write(''.join(block))
+        count += len(block)
+    return count
 
 def writebyproteinrec(outprotrec,handle,fields=GAF20FIELDS):
     """
@@ -429,8 +655,7 @@ def writebyproteinrec(outprotrec,handle,fields=GAF20FIELDS):
     fafbyproteinrec, which contains all consecutive lines with the 
     same DB_Object_ID
     """
-    for outrec in outprotrec:
-        writerec(outrec, handle, fields=fields)
+    writerecs(outprotrec, handle, fields=fields)
 
 def record_has(inrec, fieldvals):
     """
@@ -441,11 +666,12 @@ def record_has(inrec, fieldvals):
     """
     retval = False
     for field in fieldvals:
+        # No set is built for the values of the record:
         if isinstance(inrec[field], str):
-            set1 = set([inrec[field]])
+            found = inrec[field] in fieldvals[field]
         else:
-            set1 = set(inrec[field])
-        if (set1 & fieldvals[field]):
+            found = not fieldvals[field].isdisjoint(inrec[field])
+        if found:
             retval = True
             break
     return retval
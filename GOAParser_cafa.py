@@ -9,6 +9,13 @@
         and produces a mapping between taxonomy ids and taxonomy 
         names. At the end, it returns this mapping. 
 
+    pubmed_ids(reference):
+        This method returns the set of PubMed ids in the DB:Reference 
+        field of a record, given either as a list of references or as
+        the '|' separated string of a GAF line. It is the single place
+        where the references are parsed for the paper-term frequencies
+        and for the Pubmed, Blacklist, and Confidence filters.
+
     record_has_forBenchmark(inupgrec, 
                             ann_freq,
                             allowed,
@@ -22,6 +29,20 @@
         function stops search and returns false. Otherwise, the function
         returns true.
 
+    aspect_mask_index(goa_handle, shift, masks=None):
+        This method reads a UniProt-GOA file without the header section
+        (such as the t1_exp, t1_iea, or t2_exp file) and sets, for every
+        protein, the bit of each ontology it is annotated in. The bits 
+        of the three files are kept in one integer per protein: F, P, 
+        and C bits of the t1 EXP annotations (shift T1_EXP), of the t1
+        non-EXP annotations (shift T1_IEA) and of the t2 EXP annotations
+        (shift T2_EXP). It returns the dictionary of these masks.
+
+    BENCHMARK_MASKS:
+        The list that gives, for every protein mask, the ontology bits 
+        in which the protein is a no-knowledge benchmark and the bits in
+        which it is a limited-knowledge benchmark.
+
     t1_filter(t1_iter, 
               t1_iea_name, 
               t1_exp_name, 
@@ -32,12 +53,13 @@
         proteins present in t2 files, if the evidence code of the proteins
         in t1 file is electronic or experimental. Accordingly, splits them
         into 2 different files and writes out the files
+        t1_iter can be the file handle of the t1 file, in which case the
+        t1 lines of the proteins not in the t2 file are not parsed.
 '''
 import os
 import sys
 import GOAParser
 from os.path import basename
-from collections import defaultdict
 
 def parse_tax_file(tax_filename):
     '''
@@ -56,6 +78,18 @@ def parse_tax_file(tax_filename):
             tax_id_name_mapping[cols[0].rstrip()] = cols[1].rstrip()
     return tax_id_name_mapping
 
+def pubmed_ids(reference):
+    '''
+    This method returns the set of PubMed ids (the references starting
+    with 'PMID:') in a DB:Reference field, which is either a list of
+    references or a '|' separated string.
+    '''
+    if reference.__class__ is not list:
+        if 'PMID:' not in reference:
+            return set([])
+        reference = reference.split('|')
+    return set([ref[5:] for ref in reference if ref.startswith('PMID:')])
+
 def record_has_forBenchmark(inupgrec, 
                             ann_freq,
                             allowed,
@@ -76,27 +110,31 @@ def record_has_forBenchmark(inupgrec,
 #    raise SystemExit
     retval=True
     organism = ''
+    # PubMed ids of the record, parsed once for the Pubmed and Blacklist
+    # filters:
+    pmids = None
     for field in allowed:
         if inupgrec['Evidence'] not in EEC_default:
             retval=False  # No EXP validation. retval set to FALSE
             break
         if field not in inupgrec: # if field is not a member of inupgrec.keys()
             if field == 'Pubmed':
-                rec_set = set([])
-                if type(inupgrec['DB:Reference']) is type(''):
-                    rec_set = set([inupgrec['DB:Reference'].split(':')[1]])
-                else:
-                    for x in inupgrec['DB:Reference']:
-                        if x.startswith('PMID'):
-                            x = x.split(':')[1]
-                            rec_set.add(x)
-                if allowed[field] == 'T' and '' in rec_set:
+                if pmids is None:
+                    pmids = pubmed_ids(inupgrec['DB:Reference'])
+                if allowed[field] == 'T' and '' in pmids:
                     retval=False
                     break
             elif field == 'Confidence':
                 db_id = inupgrec['DB_Object_ID']
                 go_id = inupgrec['GO_ID']
-                if allowed[field] == 'T' and len(ann_freq[db_id][go_id]) < allowed['Threshold']:
+                if allowed[field] != 'T':
+                    continue
+                # ann_freq is a dictionary of sets or a ConfidenceTable:
+                if hasattr(ann_freq, 'paper_count'):
+                    n_papers = ann_freq.paper_count(db_id, go_id)
+                else:
+                    n_papers = len(ann_freq[db_id][go_id])
+                if n_papers < allowed['Threshold']:
 #                    print 'field: ' + field
 #                    print 'allowed[field]: ' + str(allowed[field])
 #                    print 'db_id: ' + db_id
@@ -109,15 +147,9 @@ def record_has_forBenchmark(inupgrec,
                     retval=False
                     break
             elif field == 'Blacklist':
-                rec_set = set([])
-                if type(inupgrec['DB:Reference']) is type(''):
-                    rec_set = set([inupgrec['DB:Reference'].split(':')[1]])
-                else:
-                    for x in inupgrec['DB:Reference']:
-                        if x.startswith('PMID'):
-                            x = x.split(':')[1]
-                            rec_set.add(x)
-                if len(rec_set & allowed[field]) > 0: # What exactly happening here?????????????????? 
+                if pmids is None:
+                    pmids = pubmed_ids(inupgrec['DB:Reference'])
+                if len(pmids & allowed[field]) > 0: # What exactly happening here?????????????????? 
                      retval=False
                      break
             else:
@@ -149,6 +181,60 @@ def record_has_forBenchmark(inupgrec,
                 break        
     return retval  
 
+# Bit of each ontology (aspect) in a protein mask:
+ASPECT_BITS = {'F': 1, 'P': 2, 'C': 4}
+# Positions of the 3-bit masks of the t1 EXP, t1 non-EXP, and t2 EXP 
+# annotations in a protein mask:
+T1_EXP = 0
+T1_IEA = 3
+T2_EXP = 6
+
+def aspect_mask_index(goa_handle, shift, masks=None):
+    '''
+    This method sets the ontology bits, shifted by shift, of the proteins
+    annotated in the file goa_handle in the dictionary masks, and returns
+    masks. A new dictionary is created if masks is None.
+    '''
+    if masks is None:
+        masks = {}
+    bits = dict([(aspect, ASPECT_BITS[aspect] << shift) for
+                 aspect in ASPECT_BITS])
+    for inline in goa_handle:
+        inrec = inline.split('\t', 9)
+        if len(inrec) < 10 or inrec[8] not in bits:
+            continue
+        masks[inrec[1]] = masks.get(inrec[1], 0) | bits[inrec[8]]
+    return masks
+
+# t1 EXP ontologies that make a protein a limited-knowledge benchmark 
+# in an ontology (BPO: CCO or MFO, CCO: BPO or MFO, MFO: CCO):
+LK_KNOWN_BITS = {ASPECT_BITS['P']: ASPECT_BITS['C'] | ASPECT_BITS['F'],
+                 ASPECT_BITS['C']: ASPECT_BITS['P'] | ASPECT_BITS['F'],
+                 ASPECT_BITS['F']: ASPECT_BITS['C']}
+
+def _benchmark_masks(mask):
+    """
+    Returns the NK and LK ontology bits of a protein mask (PRIVATE).
+    A protein is a benchmark in an ontology if it has non-EXP annotations
+    in it at t1 and EXP annotations in it at t2. It is a no-knowledge
+    benchmark if it has no EXP annotations at t1, and a limited-knowledge
+    benchmark if it has EXP annotations at t1 in the ontologies of 
+    LK_KNOWN_BITS but not in this one.
+    """
+    t1_exp = (mask >> T1_EXP) & 7
+    candidates = (mask >> T1_IEA) & (mask >> T2_EXP) & 7
+    if t1_exp == 0:
+        return (candidates, 0)
+    lk_bits = 0
+    for bit in LK_KNOWN_BITS:
+        if candidates & bit and not t1_exp & bit and \
+           t1_exp & LK_KNOWN_BITS[bit]:
+            lk_bits |= bit
+    return (0, lk_bits)
+
+# (NK bits, LK bits) of every protein mask:
+BENCHMARK_MASKS = [_benchmark_masks(mask) for mask in range(1 << 9)]
+
 def t1_filter(t1_iter, 
               t1_iea_name, 
               t1_exp_name, 
@@ -160,31 +246,37 @@ def t1_filter(t1_iter,
     proteins present in t2 files, if the evidence code of the proteins
     in t1 file is electronic or experimental. Accordingly, splits them
     into 2 different files and writes out the files
+    t1_iter is either an iterator over the t1 records (created with 
+    rawline=True) or the file handle of the t1 file. For a file handle,
+    the lines of the proteins that are not in the t2_exp file are 
+    skipped before they are parsed.
     '''
+    # Ontologies of the EXP annotations of every protein at t2:
     t2_exp_handle = open(t2_exp_name, 'r')
-    
-    exp_pid_dict = defaultdict(lambda:defaultdict())
-
-    for inline in t2_exp_handle:
-        inrec = inline.strip('\n').split('\t')
-        if len(inrec) < 15:
-            continue
-        exp_pid_dict[inrec[1]][inrec[8]] = 1
+    exp_pid_masks = aspect_mask_index(t2_exp_handle, 0)
     t2_exp_handle.close()
 
+    if hasattr(t1_iter, 'readline'):
+        # Only the DB_Object_ID column is split off before the check:
+        in_t2 = lambda inline: inline.split('\t', 2)[1] in exp_pid_masks
+        t1_iter = GOAParser.gafiterator(t1_iter, True, in_t2)
+
     t1_iea_handle = open(t1_iea_name, "w")
     t1_exp_handle = open(t1_exp_name, "w")
 
     for rec in t1_iter:
-        if exp_pid_dict.has_key(rec['DB_Object_ID']):
-            if exp_pid_dict[rec['DB_Object_ID']].has_key(rec['Aspect']):
+        if rec['DB_Object_ID'] in exp_pid_masks:
+            if exp_pid_masks[rec['DB_Object_ID']] & \
+               ASPECT_BITS.get(rec['Aspect'], 0):
+                # The records are not modified, so their original lines
+                # are written when the iterator keeps them:
                 if not rec['Evidence'] in EXP_default:
-                    GOAParser.writerec(rec, t1_iea_handle,GAFFIELDS)
+                    GOAParser.writerec(rec, t1_iea_handle, GAFFIELDS, True)
                 elif rec['Evidence'] in EXP_default:
-                    GOAParser.writerec(rec, t1_exp_handle, GAFFIELDS)
+                    GOAParser.writerec(rec, t1_exp_handle, GAFFIELDS, True)
     t1_iea_handle.close()
     t1_exp_handle.close()
-    exp_pid_dict.clear()
+    exp_pid_masks.clear()
 
 if __name__ == '__main__': 
     print (sys.argv[0] + ':')
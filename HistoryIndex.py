@@ -0,0 +1,370 @@
+#!/usr/bin/env python
+'''
+    This module builds and queries an annotation history index of a series
+    of UniProt-GOA releases (GAF 1.0 or 2.0 files). Every release is read
+    once, when it is added to the index. Afterwards, the benchmark sets of
+    any pair of indexed releases (t1, t2) are created from the index alone,
+    without reading the releases again.
+
+    The index is a text file. Its header has a line for every release, in
+    the order the releases were added:
+
+        !release    0    gene_association.goa_ref_yeast.23
+        !release    1    gene_association.goa_ref_yeast.52
+
+    followed by one line for every annotation, sorted by DB_Object_ID:
+
+        DB_Object_ID  taxon  GO_ID  Aspect  Evidence  first  last  releases
+
+    where first and last are the numbers of the first and the last release
+    with the annotation, and releases is the set of the numbers of all the
+    releases with the annotation, as a hexadecimal bit mask (bit i is the
+    release number i). The evidence code is kept, so the annotations can
+    be classified as EXP or non-EXP with any set of EXP codes when the
+    index is queried. The taxon is the taxon id of the protein in the
+    last added release that has it.
+
+    The releases and the index are merged protein by protein, so the
+    releases must be sorted by DB_Object_ID (see GOAParser.sort_gaf_file)
+    and only the annotations of one protein are kept in memory.
+
+    This module has the following methods:
+
+    read_releases(index_fname):
+        This method returns the list of the release names of the index.
+
+    iter_index(index_fname):
+        This method yields a (protein, taxon, annotations) triplet for
+        every protein of the index, where annotations maps each (GO_ID,
+        Aspect, Evidence) triplet to the bit mask of its releases.
+
+    add_release(index_fname, release_fname, release_name=None,
+                tmp_dir=None):
+        This method adds a release to the index (creating the index if it
+        does not exist) and returns the number of the release.
+
+    history_benchmarks(index_fname, t1_name, t2_name, EXP_default,
+                       bm_handles, taxa=None):
+        This method writes the SIX benchmark files (LK-BPO, LK-CCO,
+        LK-MFO, NK-BPO, NK-CCO, NK-MFO) of the releases t1_name and
+        t2_name of the index to the file handles bm_handles. The
+        benchmarks are the same as the ones Benchmark creates from the
+        two releases with the default filters. With a set of taxon ids
+        taxa, only the proteins of these taxa are benchmarks. It returns
+        the number of EXP annotations at t2.
+
+    How to run this module:
+
+        > python HistoryIndex.py add yeast.history goa_ref_yeast.23 \\
+                 goa_ref_yeast.52 goa_ref_yeast.60
+
+    adds three releases to the index yeast.history, and
+
+        > python HistoryIndex.py benchmark yeast.history goa_ref_yeast.23 \\
+                 goa_ref_yeast.52
+
+    writes the benchmark files goa_ref_yeast.52-23.benchmark_LK_bpo and so
+    on, for this pair of releases. The benchmark command has the options
+    -G (taxon ids), -O (output file name prefix) and -d (output
+    directory). The EXP evidence codes are the ones in the .cafarc
+    configuration file, or the default ones if there is none.
+'''
+import os
+import sys
+import argparse
+import tempfile
+from os.path import basename
+
+import GOAParser
+import GOAParser_cafa as gc
+import CreateBenchmark as cb
+import Config
+
+# Default configuration file name:
+config_filename = '.cafarc'
+
+def read_releases(index_fname):
+    """
+    Returns the list of the names of the releases of the index, in the
+    order they were added.
+    """
+    releases = []
+    for line in open(index_fname, 'r'):
+        if line[:1] != '!':
+            break
+        cols = line.rstrip('\n').split('\t')
+        if cols[0] == '!release':
+            releases.append(cols[2])
+    return releases
+
+def iter_index(index_fname):
+    """
+    Yields a (protein, taxon, annotations) triplet for every protein of
+    the index, in the order of the index. annotations is a dictionary
+    that maps each (GO_ID, Aspect, Evidence) triplet to the bit mask of
+    the releases with the annotation.
+    """
+    prev = None
+    taxon = ''
+    annotations = {}
+    for lines in GOAParser.iter_line_blocks(index_fname):
+        for line in lines:
+            if line[:1] == '!' or not line:
+                continue
+            cols = line.split('\t')
+            if cols[0] != prev:
+                if prev is not None:
+                    yield prev, taxon, annotations
+                prev = cols[0]
+                taxon = cols[1]
+                annotations = {}
+            annotations[(cols[2], cols[3], cols[4])] = int(cols[7], 16)
+    if prev is not None:
+        yield prev, taxon, annotations
+
+def _release_proteins(release_fname):
+    """
+    Yields a (protein, taxon, set of (GO_ID, Aspect, Evidence) triplets)
+    triplet for every protein of a release sorted by DB_Object_ID
+    (PRIVATE). A ValueError is raised if the release is not sorted.
+    """
+    prev = None
+    taxon = ''
+    annotations = set()
+    for lines in GOAParser.iter_line_blocks(release_fname):
+        for line in lines:
+            if line[:1] == '!' or not line:
+                continue
+            cols = line.split('\t', 13)
+            if len(cols) < 13:
+                continue
+            if cols[1] != prev:
+                if prev is not None:
+                    if cols[1] < prev:
+                        raise ValueError(release_fname + ' is not sorted ' + \
+                                         'by DB_Object_ID: ' + cols[1])
+                    yield prev, taxon, annotations
+                prev = cols[1]
+                # The taxon of the protein (without the taxon of an
+                # interacting organism):
+                taxon = cols[12].split('|', 1)[0].replace('taxon:', '')
+                annotations = set()
+            annotations.add((cols[4], cols[8], cols[6]))
+    if prev is not None:
+        yield prev, taxon, annotations
+
+def _first_last(mask):
+    """
+    Returns the numbers of the first and the last release of a bit mask
+    of releases (PRIVATE).
+    """
+    return (mask & -mask).bit_length() - 1, mask.bit_length() - 1
+
+def _merge_release(index_iter, release_iter, bit):
+    """
+    Merges the proteins of the index and of a release, both sorted by
+    DB_Object_ID, and yields the (protein, taxon, annotations) triplets of
+    the new index (PRIVATE). The annotations of the release get the bit
+    of the release.
+    """
+    index_item = next(index_iter, None)
+    for protName, taxon, rel_annotations in release_iter:
+        # The proteins of the index that are not in the release:
+        while index_item is not None and index_item[0] < protName:
+            yield index_item
+            index_item = next(index_iter, None)
+        if index_item is not None and index_item[0] == protName:
+            annotations = index_item[2]
+            index_item = next(index_iter, None)
+        else:
+            annotations = {}
+        for key in rel_annotations:
+            annotations[key] = annotations.get(key, 0) | bit
+        yield protName, taxon, annotations
+    while index_item is not None:
+        yield index_item
+        index_item = next(index_iter, None)
+
+def add_release(index_fname, release_fname, release_name=None, tmp_dir=None):
+    """
+    Adds the release release_fname (a GAF file sorted by DB_Object_ID) to
+    the index index_fname, which is created if it does not exist. The
+    release is named release_name, or the base name of release_fname. The
+    new index is written to a temporary file that replaces the index at
+    the end. It returns the number of the release in the index. A
+    ValueError is raised if the release is already in the index or is not
+    sorted by DB_Object_ID.
+    """
+    if release_name is None:
+        release_name = basename(release_fname)
+    if os.path.exists(index_fname):
+        releases = read_releases(index_fname)
+        index_iter = iter_index(index_fname)
+    else:
+        releases = []
+        index_iter = iter([])
+    if release_name in releases:
+        raise ValueError('Release already in the index: ' + release_name)
+    number = len(releases)
+    releases.append(release_name)
+
+    if tmp_dir is None:
+        tmp_dir = os.path.dirname(os.path.abspath(index_fname))
+    fd, tmp_fname = tempfile.mkstemp(suffix='.history', dir=tmp_dir)
+    os.close(fd)
+    try:
+        fh_out = open(tmp_fname, 'w')
+        for index in range(len(releases)):
+            fh_out.write('!release\t%d\t%s\n' % (index, releases[index]))
+        out_lines = []
+        for protName, taxon, annotations in \
+                _merge_release(index_iter, _release_proteins(release_fname),
+                               1 << number):
+            for key in sorted(annotations):
+                mask = annotations[key]
+                first, last = _first_last(mask)
+                out_lines.append('%s\t%s\t%s\t%s\t%s\t%d\t%d\t%x\n' %
+                                 ((protName, taxon) + key +
+                                  (first, last, mask)))
+            if len(out_lines) >= 65536:
+                fh_out.writelines(out_lines)
+                out_lines = []
+        fh_out.writelines(out_lines)
+        fh_out.close()
+        # mkstemp creates the file readable by its owner only:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_fname, 0666 & ~umask)
+        os.rename(tmp_fname, index_fname)
+    finally:
+        if os.path.exists(tmp_fname):
+            os.remove(tmp_fname)
+    return number
+
+def history_benchmarks(index_fname, t1_name, t2_name, EXP_default,
+                       bm_handles, taxa=None):
+    """
+    Writes the benchmarks of the releases t1_name and t2_name of the
+    index to the SIX file handles bm_handles, in the order LK-BPO, LK-CCO,
+    LK-MFO, NK-BPO, NK-CCO, NK-MFO. The rules are the ones of
+    CreateBenchmark.create_benchmarks_streaming: a protein is a benchmark
+    in an ontology if it has EXP annotations in it at t2 and non-EXP
+    annotations in it at t1 (see GOAParser_cafa.BENCHMARK_MASKS). If taxa
+    is a set of taxon ids, only the proteins of these taxa are considered.
+    It returns the number of EXP annotations at t2 (of these taxa). A
+    ValueError is raised if a release is not in the index.
+    """
+    releases = read_releases(index_fname)
+    for name in [t1_name, t2_name]:
+        if name not in releases:
+            raise ValueError('Release not in the index: ' + name)
+    t1_bit = 1 << releases.index(t1_name)
+    t2_bit = 1 << releases.index(t2_name)
+    is_exp = {}
+
+    bm_writers = cb.open_benchmark_writers(bm_handles)
+    LK_writers, NK_writers = cb.bm_writers_by_bit(bm_writers)
+    t2_count = 0
+    for protName, taxon, annotations in iter_index(index_fname):
+        if taxa and taxon not in taxa:
+            continue
+        # GO terms with EXP evidence at t2, by ontology bit:
+        t2_terms = {}
+        t1_keys = []
+        for key, mask in annotations.iteritems():
+            go_id, aspect, code = key
+            if code not in is_exp:
+                is_exp[code] = code in EXP_default
+            if mask & t2_bit and is_exp[code] and aspect in gc.ASPECT_BITS:
+                t2_count += 1
+                t2_terms.setdefault(gc.ASPECT_BITS[aspect], set()).add(go_id)
+            if mask & t1_bit:
+                t1_keys.append(key)
+        if not t2_terms:
+            continue
+        # The t1 annotations count only in the ontologies with EXP
+        # evidence at t2:
+        t2_mask = sum(t2_terms)
+        mask = t2_mask << gc.T2_EXP
+        for go_id, aspect, code in t1_keys:
+            bit = gc.ASPECT_BITS.get(aspect, 0) & t2_mask
+            if not bit:
+                continue
+            if is_exp[code]:
+                mask |= bit << gc.T1_EXP
+            else:
+                mask |= bit << gc.T1_IEA
+        NK_bits, LK_bits = gc.BENCHMARK_MASKS[mask]
+        for bit in t2_terms:
+            if NK_bits & bit:
+                NK_writers[bit].write(protName, sorted(t2_terms[bit]))
+            elif LK_bits & bit:
+                LK_writers[bit].write(protName, sorted(t2_terms[bit]))
+    cb.close_benchmark_writers(bm_writers)
+    return t2_count
+
+def _exp_codes():
+    """
+    Returns the EXP evidence codes (the exp_eec entry) of the 
+    configuration file .cafarc in the current directory, or of the 
+    default configuration if there is no such file (PRIVATE). It is the
+    same entry Benchmark passes on, so both create the same benchmarks.
+    """
+    if os.path.exists(config_filename):
+        ConfigParam = Config.parse_config(config_filename)
+    else:
+        ConfigParam = Config.default_config()
+    return ConfigParam['exp_eec']
+
+if __name__ == '__main__':
+    if len(sys.argv) == 1:
+        print (sys.argv[0] + ':')
+        print(__doc__)
+    else:
+        parser = argparse.ArgumentParser(description='Builds and queries ' + \
+                    'an annotation history index of UniProt-GOA releases')
+        subparsers = parser.add_subparsers(dest='command')
+        add_parser = subparsers.add_parser('add', help='add releases to ' + \
+                                           'the index')
+        add_parser.add_argument('index_fname')
+        add_parser.add_argument('release_fnames', nargs='+')
+        add_parser.add_argument('-t', '--tmp_dir', default=None)
+        bm_parser = subparsers.add_parser('benchmark', help='create the ' + \
+                                          'benchmarks of two releases')
+        bm_parser.add_argument('index_fname')
+        bm_parser.add_argument('t1_name')
+        bm_parser.add_argument('t2_name')
+        bm_parser.add_argument('-G', '--organism', nargs='*', default=[])
+        bm_parser.add_argument('-O', '--output', default='')
+        bm_parser.add_argument('-d', '--directory', default='.')
+        args = parser.parse_args()
+        try:
+            if args.command == 'add':
+                for release_fname in args.release_fnames:
+                    number = add_release(args.index_fname, release_fname,
+                                         tmp_dir=args.tmp_dir)
+                    print basename(release_fname) + ': release ' + str(number)
+            else:
+                if args.output:
+                    prefix = basename(args.output)
+                else:
+                    prefix = basename(args.t2_name) + '-' + \
+                             basename(args.t1_name).split('.')[-1]
+                out_fnames = [os.path.join(args.directory, prefix +
+                                           '.benchmark_' + ont) for ont in
+                              ['LK_bpo', 'LK_cco', 'LK_mfo',
+                               'NK_bpo', 'NK_cco', 'NK_mfo']]
+                bm_handles = [open(fname, 'w') for fname in out_fnames]
+                t2_count = history_benchmarks(args.index_fname, args.t1_name,
+                                              args.t2_name, _exp_codes(),
+                                              bm_handles,
+                                              set(args.organism) or None)
+                for fh in bm_handles:
+                    fh.close()
+                print 'EXP annotations at t2: ' + str(t2_count)
+                for fname in out_fnames:
+                    print fname
+        except ValueError as e:
+            print >> sys.stderr, str(e)
+            sys.exit(1)
+    sys.exit(0)
@@ -1,6 +1,6 @@
 #!/usr/bin/python
 '''
-    This module has the following two methods: 
+    This module has the following methods: 
 
     count_freq(goa_handle, EEC=set([])):
         This method calculates two things: 
@@ -8,17 +8,37 @@
             the input file, and 
         (2) how many papers are associated with every protein annotation 
             pair.
+        Every PubMed id of a line is counted, not only the first 
+        reference (see GOAParser_cafa.pubmed_ids).
         It returns these two values as tuple.
 
+    count_freq_columnar(goa_handle, EEC=set([])):
+        This method calculates the same two things as count_freq. The
+        (protein, GO ID, PubMed id) triples of the file are encoded as 
+        integer arrays, and the counts are computed with numpy (sort
+        and unique) instead of a set for every protein annotation pair.
+        It returns a ConfidenceTable and a (PubMed id codes, GO terms per
+        paper) tuple.
+
+    ConfidenceTable:
+        The number of papers for every protein annotation pair, in
+        dictionaries by protein name and GO ID. Its 
+        paper_count method is used by the Confidence filter in place of
+        the dictionary of sets of count_freq.
+
     paper_term_freq(goa_handle, ptf_handle, params):
         It populates the paper term frequency file. Then, it returns the
         dictionary containing the pair of the protein annotation
-        (protein name, GO ID) and number of papers supporting it.
+        (protein name, GO ID) and number of papers supporting it. If
+        params['ptf_engine'] is 'numpy', the counts are computed by
+        count_freq_columnar and a ConfidenceTable is returned.
 '''
 import os
 import sys
+from array import array
 from collections import defaultdict
-import re
+
+from GOAParser_cafa import pubmed_ids
 
 def count_freq(goa_handle, EEC=set([])):
     paper_conf = defaultdict(lambda:defaultdict(set))
@@ -27,21 +47,103 @@ def count_freq(goa_handle, EEC=set([])):
         if line[0] == '!':
             continue
         fields = line.strip().split('\t')
-        if not fields[5] == '' and re.match('^PMID', fields[5]): # Match PMID 
-            pubmed_id = fields[5].split(':')[1] # Extract PubMed id
-            if (not EEC) or (fields[6] in EEC):
-                ann_conf[fields[1]][fields[4]].add(str(pubmed_id)) 
-                    # add pubmed id as evidence to the protein, GO ID 
-                    # (fields[1], fields[4]) pair
-                paper_conf[pubmed_id][fields[4]] = 1
+        if (EEC) and (fields[6] not in EEC):
+            continue
+        # All the PubMed ids of the DB:Reference field:
+        for pubmed_id in pubmed_ids(fields[5]):
+            ann_conf[fields[1]][fields[4]].add(pubmed_id) 
+                # add pubmed id as evidence to the protein, GO ID 
+                # (fields[1], fields[4]) pair
+            paper_conf[pubmed_id][fields[4]] = 1
     return (ann_conf, paper_conf)
 
+class ConfidenceTable:
+    """
+    Number of papers for every (protein name, GO ID) pair. pair_counts 
+    maps a protein name to a dictionary of the number of papers by GO 
+    ID. Nesting by protein keeps the lookups of the consecutive records
+    of a protein within one small dictionary.
+    """
+    def __init__(self, pair_counts):
+        self.pair_counts = pair_counts
+
+    def paper_count(self, db_id, go_id):
+        go_counts = self.pair_counts.get(db_id)
+        if go_counts is None:
+            return 0
+        return go_counts.get(go_id, 0)
+
+def count_freq_columnar(goa_handle, EEC=set([])):
+    import numpy as np
+    # Integer codes of the (protein, GO ID) pairs, by protein and GO ID,
+    # and of the GO IDs and PubMed ids:
+    pair_codes = {}
+    npairs = 0
+    go_codes = {}
+    pmid_codes = {}
+    pairs = array('l')
+    terms = array('l')
+    pmids = array('l')
+    for line in goa_handle:
+        if line[0] == '!':
+            continue
+        fields = line.strip().split('\t')
+        if (EEC) and (fields[6] not in EEC):
+            continue
+        line_pmids = pubmed_ids(fields[5])
+        if not line_pmids:
+            continue
+        go_pair_codes = pair_codes.get(fields[1])
+        if go_pair_codes is None:
+            go_pair_codes = pair_codes[fields[1]] = {}
+        pair_code = go_pair_codes.get(fields[4])
+        if pair_code is None:
+            pair_code = go_pair_codes[fields[4]] = npairs
+            npairs += 1
+        for pubmed_id in line_pmids:
+            pairs.append(pair_code)
+            terms.append(go_codes.setdefault(fields[4], len(go_codes)))
+            pmids.append(pmid_codes.setdefault(pubmed_id, len(pmid_codes)))
+    pairs = np.frombuffer(pairs, dtype=np.int_).astype(np.int64)
+    terms = np.frombuffer(terms, dtype=np.int_).astype(np.int64)
+    pmids = np.frombuffer(pmids, dtype=np.int_).astype(np.int64)
+    # Distinct papers of every protein annotation pair:
+    npmids = max(len(pmid_codes), 1)
+    pair_pmids = np.unique(pairs * npmids + pmids)
+    ann_counts = np.bincount(pair_pmids // npmids, minlength=npairs)
+    # Distinct GO IDs of every paper:
+    nterms = max(len(go_codes), 1)
+    pmid_terms = np.unique(pmids * nterms + terms)
+    paper_counts = np.bincount(pmid_terms // nterms, 
+                               minlength=len(pmid_codes))
+    # The code of every pair is replaced with its number of papers, 
+    # so that the Confidence filter does not look up the code first:
+    ann_counts = ann_counts.tolist()
+    for go_pair_codes in pair_codes.itervalues():
+        for go_id, code in go_pair_codes.iteritems():
+            go_pair_codes[go_id] = ann_counts[code]
+    return (ConfidenceTable(pair_codes),
+            (pmid_codes, paper_counts))
+
 def paper_term_freq(goa_handle, ptf_handle, params):
     """
     Given an input uniprot-goa file, this method populates file 
     pointed by ptf_handle with a pair of pubmed id and the number 
     of proteins annotated by that pubmed id.
     """
+    if params.get('ptf_engine') == 'numpy':
+        try:
+            import numpy
+        except ImportError:
+            print 'numpy is not installed, using the dict engine ...'
+        else:
+            ann_conf, (pmid_codes, paper_counts) = \
+                count_freq_columnar(goa_handle, params['Evidence'])
+            print 'Populating paper-term frequency file ...'
+            for pubmed_id in pmid_codes:
+                print >> ptf_handle, pubmed_id + '\t' + \
+                         str(paper_counts[pmid_codes[pubmed_id]])
+            return ann_conf
     ann_conf, paper_conf = count_freq(goa_handle,
                             params['Evidence'])
     print 'Populating paper-term frequency file ...'
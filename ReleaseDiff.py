@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+'''
+    This module computes the differences between the GO annotations of two
+    UniProt-GOA releases (GAF 1.0 or 2.0 files) at time points t1 and t2.
+    Each annotation is a (protein, GO term, evidence code) triple, and the
+    annotations of a protein with the same GO term are compared together:
+
+        added:   the GO term of the protein is in t2, but not in t1
+        removed: the GO term of the protein is in t1, but not in t2
+        changed: the GO term of the protein is in both releases, with
+                 different sets of evidence codes
+
+    Both files must be sorted by DB_Object_ID (see GOAParser.sort_gaf_file),
+    so that they can be merged protein by protein: only the annotations of
+    one protein are kept in memory. The files can be split into ranges of
+    proteins that are merged in parallel.
+
+    Each difference is written as a line of six tab separated columns:
+
+        change  DB_Object_ID  GO_ID  Aspect  evidence at t1  evidence at t2
+
+    where the evidence codes of each release are sorted and separated by
+    commas (an empty column if the GO term is not in the release).
+
+    This module has the following methods:
+
+    iter_protein_annotations(fname, start=0, end=None, evidence=None):
+        This method yields the (protein, annotations) pairs of a byte range
+        of a GAF file sorted by DB_Object_ID. The annotations of a protein
+        are a dictionary that maps each GO term to its aspect and its set
+        of evidence codes. With a set of evidence codes, the other
+        annotations are skipped. It raises a ValueError if the file is not
+        sorted.
+
+    diff_proteins(t1_annotations, t2_annotations):
+        This method yields the differences between the annotations of a
+        protein at t1 and at t2.
+
+    find_protein_offset(fname, protName):
+        This method returns the byte offset of the first line of a GAF file
+        sorted by DB_Object_ID whose protein is not less than protName.
+
+    release_diff(t1_fname, t2_fname, out_handle, nprocs=1, evidence=None,
+                 tmp_dir=None):
+        This method writes the differences between the GAF files t1_fname
+        and t2_fname to out_handle and returns the number of added,
+        removed and changed annotations. The files are merged in nprocs
+        ranges of proteins in parallel.
+
+    How to run this module:
+
+        > python ReleaseDiff.py goa_uniprot_all.gaf.50 goa_uniprot_all.gaf.60
+
+    writes the differences to the standard output. The following options
+    are available:
+
+    -o OUTPUT:       output file for the differences
+    -e EVIDENCE:     compare only the annotations with these evidence
+                     codes, for example -e EXP IDA IPI IMP IGI IEP
+    -P PROCESSES:    the number of processes. The default is 1.
+    -t TMP_DIR:      the directory for the temporary files
+'''
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+from multiprocessing import Pool
+
+import GOAParser
+
+def _annotation_lines(fname, start, end):
+    """
+    Yields the (protein, GO term, evidence code, aspect) of every line of
+    a byte range of a GAF file (PRIVATE). Only the first nine columns are
+    split.
+    """
+    for lines in GOAParser.iter_line_blocks(fname, start, end):
+        for line in lines:
+            if line[:1] == '!' or not line:
+                continue
+            cols = line.split('\t', 9)
+            if len(cols) < 9:
+                continue
+            yield cols[1], cols[4], cols[6], cols[8]
+
+def iter_protein_annotations(fname, start=0, end=None, evidence=None):
+    """
+    Yields a (protein, annotations) pair for every protein in the byte
+    range start to end of the GAF file fname, in the order of the file.
+    The annotations map each GO term to a [aspect, set of evidence codes]
+    pair. If evidence is a set of evidence codes, the annotations with
+    other evidence codes are skipped (and the proteins without any
+    annotation are not yielded). A ValueError is raised if the file is
+    not sorted by DB_Object_ID.
+    """
+    prev = None
+    annotations = {}
+    for protName, go_id, code, aspect in _annotation_lines(fname, start, end):
+        if protName != prev:
+            if prev is not None:
+                if protName < prev:
+                    raise ValueError(fname + ' is not sorted by ' + \
+                                     'DB_Object_ID: ' + protName)
+                if annotations:
+                    yield prev, annotations
+                annotations = {}
+            prev = protName
+        if evidence is not None and code not in evidence:
+            continue
+        if go_id in annotations:
+            annotations[go_id][1].add(code)
+        else:
+            annotations[go_id] = [aspect, set([code])]
+    if annotations:
+        yield prev, annotations
+
+def diff_proteins(t1_annotations, t2_annotations):
+    """
+    Yields a (change, GO term, aspect, evidence at t1, evidence at t2)
+    tuple for every GO term of a protein that is added, removed or
+    changed between t1 and t2. The evidence codes are sorted and
+    joined by commas.
+    """
+    for go_id in sorted(t2_annotations):
+        aspect, t2_codes = t2_annotations[go_id]
+        if go_id not in t1_annotations:
+            yield 'added', go_id, aspect, '', ','.join(sorted(t2_codes))
+        elif t1_annotations[go_id][1] != t2_codes:
+            yield 'changed', go_id, aspect, \
+                  ','.join(sorted(t1_annotations[go_id][1])), \
+                  ','.join(sorted(t2_codes))
+    for go_id in sorted(t1_annotations):
+        if go_id not in t2_annotations:
+            aspect, t1_codes = t1_annotations[go_id]
+            yield 'removed', go_id, aspect, ','.join(sorted(t1_codes)), ''
+
+def _line_protein(line):
+    """
+    Returns the DB_Object_ID of a GAF line, or None for a header line
+    (PRIVATE).
+    """
+    cols = line.split('\t', 2)
+    if line[:1] == '!' or len(cols) < 2:
+        return None
+    return cols[1]
+
+def _next_line_start(handle, offset):
+    """
+    Returns the offset of the first line that starts at or after offset
+    and that line (PRIVATE).
+    """
+    if offset == 0:
+        handle.seek(0)
+    else:
+        # The line of the byte before offset ends before the next line:
+        handle.seek(offset - 1)
+        handle.readline()
+    pos = handle.tell()
+    return pos, handle.readline()
+
+def find_protein_offset(fname, protName):
+    """
+    Returns the byte offset of the first line of the GAF file fname
+    (sorted by DB_Object_ID) whose protein is not less than protName, or
+    the size of the file if there is no such line. The offset is found by
+    a binary search over the byte offsets of the file: the first line at
+    or after an offset is not less than protName for all the offsets from
+    the one searched for.
+    """
+    handle = open(fname, 'r')
+    lo = 0
+    hi = os.path.getsize(fname)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        pos, line = _next_line_start(handle, mid)
+        lineProt = _line_protein(line)
+        if not line or (lineProt is not None and lineProt >= protName):
+            hi = mid
+        else:
+            lo = mid + 1
+    pos, line = _next_line_start(handle, lo)
+    handle.close()
+    return pos
+
+def _split_proteins(t1_fname, nchunks):
+    """
+    Returns the proteins at which the ranges of proteins start (PRIVATE).
+    The proteins are taken from the lines at the starts of the byte ranges
+    of find_line_offsets, so that the ranges have similar sizes.
+    """
+    proteins = []
+    handle = open(t1_fname, 'r')
+    for start, end in GOAParser.find_line_offsets(t1_fname, nchunks)[1:]:
+        handle.seek(start)
+        protName = _line_protein(handle.readline())
+        if protName is not None and (not proteins or protName > proteins[-1]):
+            proteins.append(protName)
+    handle.close()
+    return proteins
+
+def _diff_chunk(args):
+    """
+    Writes the differences of one range of proteins to the part file
+    part_fname (PRIVATE). This method is run in a worker process by
+    release_diff. It returns the number of added, removed and changed
+    annotations in the range.
+    """
+    t1_fname, t1_range, t2_fname, t2_range, evidence, part_fname = args
+    counts = {'added':0, 'removed':0, 'changed':0}
+    part_handle = open(part_fname, 'w')
+    out_lines = []
+    t1_iter = iter_protein_annotations(t1_fname, t1_range[0], t1_range[1],
+                                       evidence)
+    t2_iter = iter_protein_annotations(t2_fname, t2_range[0], t2_range[1],
+                                       evidence)
+    t1_prot, t1_annotations = next(t1_iter, (None, None))
+    t2_prot, t2_annotations = next(t2_iter, (None, None))
+    while t1_prot is not None or t2_prot is not None:
+        if t2_prot is None or (t1_prot is not None and t1_prot < t2_prot):
+            # The protein is only in t1:
+            protName, old, new = t1_prot, t1_annotations, {}
+            t1_prot, t1_annotations = next(t1_iter, (None, None))
+        elif t1_prot is None or t2_prot < t1_prot:
+            # The protein is only in t2:
+            protName, old, new = t2_prot, {}, t2_annotations
+            t2_prot, t2_annotations = next(t2_iter, (None, None))
+        else:
+            protName, old, new = t1_prot, t1_annotations, t2_annotations
+            t1_prot, t1_annotations = next(t1_iter, (None, None))
+            t2_prot, t2_annotations = next(t2_iter, (None, None))
+        for change in diff_proteins(old, new):
+            counts[change[0]] += 1
+            out_lines.append('\t'.join((change[0], protName) + change[1:]))
+        if len(out_lines) >= 65536:
+            part_handle.write('\n'.join(out_lines) + '\n')
+            out_lines = []
+    if out_lines:
+        part_handle.write('\n'.join(out_lines) + '\n')
+    part_handle.close()
+    return counts
+
+def release_diff(t1_fname, t2_fname, out_handle, nprocs=1, evidence=None,
+                 tmp_dir=None):
+    """
+    Writes the differences between the annotations of the GAF files
+    t1_fname and t2_fname (both sorted by DB_Object_ID) to out_handle, in
+    the order of the proteins. It returns a dictionary with the number of
+    'added', 'removed' and 'changed' annotations. With evidence (a set of
+    evidence codes), only the annotations with these codes are compared.
+    The proteins are split into nprocs ranges that are merged in parallel,
+    each into a temporary part file in tmp_dir.
+    """
+    if nprocs > 1:
+        if t1_fname.endswith('.gz') or t2_fname.endswith('.gz'):
+            # A compressed file can not be split:
+            split_proteins = []
+        else:
+            split_proteins = _split_proteins(t1_fname, nprocs)
+    else:
+        split_proteins = []
+    t1_offsets = [0] + [find_protein_offset(t1_fname, p) for
+                        p in split_proteins] + [None]
+    t2_offsets = [0] + [find_protein_offset(t2_fname, p) for
+                        p in split_proteins] + [None]
+    jobs = []
+    for index in range(len(t1_offsets) - 1):
+        fd, part_fname = tempfile.mkstemp(suffix='.part', dir=tmp_dir)
+        os.close(fd)
+        jobs.append((t1_fname, (t1_offsets[index], t1_offsets[index + 1]),
+                     t2_fname, (t2_offsets[index], t2_offsets[index + 1]),
+                     evidence, part_fname))
+    try:
+        if nprocs > 1 and len(jobs) > 1:
+            pool = Pool(nprocs)
+            try:
+                job_counts = pool.map(_diff_chunk, jobs)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            job_counts = [_diff_chunk(job) for job in jobs]
+        for job in jobs:
+            part_handle = open(job[-1], 'r')
+            shutil.copyfileobj(part_handle, out_handle)
+            part_handle.close()
+    finally:
+        for job in jobs:
+            if os.path.exists(job[-1]):
+                os.remove(job[-1])
+    counts = {'added':0, 'removed':0, 'changed':0}
+    for job_count in job_counts:
+        for change in job_count:
+            counts[change] += job_count[change]
+    return counts
+
+if __name__ == '__main__':
+    if len(sys.argv) == 1:
+        print (sys.argv[0] + ':')
+        print(__doc__)
+    else:
+        parser = argparse.ArgumentParser(description='Computes the ' + \
+                    'annotations added, removed and changed between two ' + \
+                    'UniProt-GOA releases')
+        parser.add_argument('t1_fname')
+        parser.add_argument('t2_fname')
+        parser.add_argument('-o', '--output', default='')
+        parser.add_argument('-e', '--evidence', nargs='+', default=[])
+        parser.add_argument('-P', '--processes', type=int, default=1)
+        parser.add_argument('-t', '--tmp_dir', default=None)
+        args = parser.parse_args()
+        if args.output:
+            out_handle = open(args.output, 'w')
+        else:
+            out_handle = sys.stdout
+        try:
+            counts = release_diff(args.t1_fname, args.t2_fname, out_handle,
+                                  args.processes,
+                                  set(args.evidence) or None, args.tmp_dir)
+        except ValueError as e:
+            print >> sys.stderr, str(e)
+            print >> sys.stderr, 'Sort the files with ' + \
+                                 'GOAParser.sort_gaf_file first.'
+            sys.exit(1)
+        if args.output:
+            out_handle.close()
+        print >> sys.stderr, 'added: %d, removed: %d, changed: %d' % \
+            (counts['added'], counts['removed'], counts['changed'])
+    sys.exit(0)
@@ -0,0 +1,381 @@
+#!/usr/bin/env python
+'''
+    This module reads UniProtKB/SwissProt files. It is a light weight
+    replacement of Bio.SwissProt for the CAFA tools which only use the
+    following fields of a SwissProt record:
+
+        entry_name, accessions, gene_name, taxonomy_id, created,
+        sequence_update, annotation_update, references,
+        cross_references, and sequence
+
+    The reader only collects the lines of a record. The fields are
+    decoded from these lines when they are accessed for the first time
+    (for example, the SQ block is decoded only when sequence is
+    accessed). Thus the records that are skipped by a taxonomy id
+    check are never decoded beyond the OX line. The fields have the
+    same values as the fields of the Bio.SwissProt records.
+
+    This module has the following classes and methods:
+
+    Reference:
+        A reference of a SwissProt record. Only the cross references
+        in the RX lines (as a list of (database, identifier) tuples)
+        are kept.
+
+    Record:
+        A SwissProt record whose fields are decoded lazily from the
+        lines of the record.
+
+    parse(handle):
+        This method returns an iterator over the records of the
+        UniProtKB/SwissProt file passed as the file handle handle.
+        It can be used in place of Bio.SwissProt.parse.
+
+    build_index(sprot_fname):
+        This method reads the UniProtKB/SwissProt file sprot_fname once
+        and returns a dictionary that maps every accession (primary and
+        secondary) to the byte offset and length of its record.
+
+    load_index(sprot_fname, index_fname=None):
+        This method returns the accession index of sprot_fname. The index
+        is saved to index_fname (sprot_fname + '.acc_idx' by default) the
+        first time, and read back from there as long as it is newer than
+        sprot_fname.
+
+    get_records(handle, index, accessions):
+        This method iterates over the (accession, record) pairs of the
+        given accessions that are in the index, reading each record with
+        a single seek in the file handle handle.
+
+    compare_parsers(sprot_fname):
+        This method parses the UniProtKB/SwissProt file sprot_fname
+        both with this module and with Bio.SwissProt, checks that the
+        fields used by the CAFA tools are the same, and prints the time
+        taken by each parser. It is invoked when the module is run with
+        a file name:
+
+            python SwissProtParser.py uniprot_sprot.dat.2014_09
+'''
+import os
+import sys
+import time
+
+class Reference(object):
+    """
+    A reference of a SwissProt record. The references attribute is a
+    list of (database, identifier) tuples from the RX lines, such as
+    ('PubMed', '9603189') or ('DOI', '10.1136/jmg.2003.012781').
+    """
+    __slots__ = ['references']
+
+    def __init__(self):
+        self.references = []
+
+class Record(object):
+    """
+    A SwissProt record. The record keeps the lines it was read from and
+    decodes each field on the first access.
+    """
+    def __init__(self, lines):
+        self._lines = lines
+        self._cache = {}
+
+    def _values(self, key):
+        """
+        Returns the values (line text after column 5) of the lines of
+        the record starting with key. The lines with the same key are
+        consecutive in a SwissProt record, so the search stops at the
+        end of the block of such lines.
+        """
+        values = []
+        for line in self._lines:
+            if line.startswith(key):
+                values.append(line[5:].rstrip())
+            elif values or line.startswith('SQ'):
+                break
+        return values
+
+    def _read_dt(self):
+        dates = {}
+        for value in self._values('DT'):
+            uprvalue = value.upper()
+            cols = value.split()
+            if 'CREATED' in uprvalue or 'LAST' in uprvalue:
+                # Old style DT line:
+                # DT   01-FEB-1995 (Rel. 31, Created)
+                uprcols = uprvalue.split()
+                rel_index = -1
+                for index in range(len(uprcols)):
+                    if 'REL.' in uprcols[index]:
+                        rel_index = index
+                str_version = cols[rel_index + 1].rstrip(',')
+                if str_version == '':
+                    version = 0
+                elif '.' in str_version:
+                    version = str_version
+                else:
+                    version = int(str_version)
+                date = cols[0]
+                if 'CREATED' in uprvalue:
+                    dates['created'] = (date, version)
+                elif 'SEQUENCE' in uprvalue:
+                    dates['sequence_update'] = (date, version)
+                else:
+                    dates['annotation_update'] = (date, version)
+            else:
+                # New style DT line:
+                # DT   01-JAN-1998, integrated into UniProtKB/Swiss-Prot.
+                # DT   15-OCT-2001, sequence version 3.
+                # DT   01-APR-2004, entry version 14.
+                version = 0
+                for s in cols[-1].split('.'):
+                    if s.isdigit():
+                        version = int(s)
+                date = cols[0].rstrip(',')
+                if 'INTEGRATED' in uprvalue:
+                    dates['created'] = (date, version)
+                elif 'SEQUENCE VERSION' in uprvalue:
+                    dates['sequence_update'] = (date, version)
+                elif 'ENTRY VERSION' in uprvalue:
+                    dates['annotation_update'] = (date, version)
+        self._cache.update(dates)
+        return None
+
+    def _get_dt(self, name):
+        if name not in self._cache:
+            self._read_dt()
+        return self._cache.get(name)
+
+    @property
+    def entry_name(self):
+        return self._lines[0][5:].split()[0]
+
+    @property
+    def accessions(self):
+        if 'accessions' not in self._cache:
+            accessions = []
+            for value in self._values('AC'):
+                accessions.extend(value.rstrip(';').split('; '))
+            self._cache['accessions'] = accessions
+        return self._cache['accessions']
+
+    @property
+    def gene_name(self):
+        if 'gene_name' not in self._cache:
+            self._cache['gene_name'] = ' '.join(self._values('GN'))
+        return self._cache['gene_name']
+
+    @property
+    def taxonomy_id(self):
+        if 'taxonomy_id' not in self._cache:
+            taxonomy_id = []
+            for value in self._values('OX'):
+                # Evidence codes are ignored:
+                # OX   NCBI_TaxID=418404 {ECO:0000313|EMBL:AEX14553.1};
+                ids = value.split('{')[0].rstrip().rstrip(';')
+                if not taxonomy_id:
+                    ids = ids.split('=')[1]
+                taxonomy_id.extend(ids.split(', '))
+            self._cache['taxonomy_id'] = taxonomy_id
+        return self._cache['taxonomy_id']
+
+    @property
+    def created(self):
+        return self._get_dt('created')
+
+    @property
+    def sequence_update(self):
+        return self._get_dt('sequence_update')
+
+    @property
+    def annotation_update(self):
+        return self._get_dt('annotation_update')
+
+    @property
+    def references(self):
+        if 'references' not in self._cache:
+            references = []
+            for line in self._lines:
+                if line.startswith('RN'):
+                    references.append(Reference())
+                elif line.startswith('RX') and references:
+                    value = line[5:].rstrip()
+                    value = value.replace(' [NCBI, ExPASy, Israel, Japan]',
+                                          '')
+                    if '=' in value:
+                        # RX   PubMed=15060122; DOI=10.1136/jmg 2003.012781;
+                        for col in value.split('; '):
+                            x = col.strip().split('=')
+                            if len(x) == 2:
+                                references[-1].references.append(
+                                    (x[0], x[1].rstrip(';')))
+                    else:
+                        # RX   MEDLINE; 85132727.
+                        cols = value.split('; ')
+                        if len(cols) == 2:
+                            references[-1].references.append(
+                                (cols[0].rstrip(';'), cols[1].rstrip('.')))
+                elif references and not line.startswith('R'):
+                    # End of the reference lines:
+                    break
+            self._cache['references'] = references
+        return self._cache['references']
+
+    @property
+    def cross_references(self):
+        if 'cross_references' not in self._cache:
+            self._cache['cross_references'] = \
+                [tuple(value.rstrip('.').split('; ')) for
+                 value in self._values('DR')]
+        return self._cache['cross_references']
+
+    @property
+    def sequence(self):
+        if 'sequence' not in self._cache:
+            # The sequence lines are between the SQ line and the
+            # terminating '//' line:
+            index = len(self._lines) - 1
+            while index > 0 and not self._lines[index].startswith('SQ'):
+                index -= 1
+            self._cache['sequence'] = \
+                ''.join([''.join(line.split()) for
+                         line in self._lines[index+1:-1]])
+        return self._cache['sequence']
+
+def parse(handle):
+    """
+    Iterates over the records of a UniProtKB/SwissProt file.
+    Each record is yielded once its terminating '//' line is read.
+    """
+    lines = []
+    for line in handle:
+        if line.startswith('//'):
+            lines.append(line)
+            yield Record(lines)
+            lines = []
+        elif line.startswith('ID') or lines:
+            lines.append(line)
+    if lines:
+        raise ValueError('Unexpected end of stream.')
+
+def build_index(sprot_fname):
+    """
+    Reads the file sprot_fname once and returns a dictionary that maps
+    each accession to the (offset, length) in bytes of its record. An 
+    accession found in more than one record (a secondary accession) is
+    mapped to the first one.
+    """
+    index = {}
+    offset = 0
+    rec_offset = 0
+    for line in open(sprot_fname, 'r'):
+        if line.startswith('ID'):
+            rec_offset = offset
+            rec_accessions = []
+        elif line.startswith('AC'):
+            rec_accessions.extend(line[5:].rstrip().rstrip(';').split('; '))
+        offset += len(line)
+        if line.startswith('//'):
+            for accession in rec_accessions:
+                if accession not in index:
+                    index[accession] = (rec_offset, offset - rec_offset)
+    return index
+
+def load_index(sprot_fname, index_fname=None):
+    """
+    Returns the accession index of the file sprot_fname (see build_index).
+    The index is read from index_fname if that file is newer than 
+    sprot_fname. Otherwise the index is built and saved to index_fname.
+    The default index_fname is sprot_fname + '.acc_idx'.
+    """
+    if index_fname is None:
+        index_fname = sprot_fname + '.acc_idx'
+    if os.path.exists(index_fname) and \
+       os.path.getmtime(index_fname) >= os.path.getmtime(sprot_fname):
+        index = {}
+        for line in open(index_fname, 'r'):
+            accession, offset, length = line.split('\t')
+            index[accession] = (int(offset), int(length))
+        return index
+    index = build_index(sprot_fname)
+    try:
+        fh_index = open(index_fname, 'w')
+        for accession in index:
+            fh_index.write('%s\t%d\t%d\n' % ((accession,) + index[accession]))
+        fh_index.close()
+    except IOError:
+        # The index is only a cache, so it is rebuilt next time:
+        sys.stderr.write('Could not save the index: ' + index_fname + '\n')
+    return index
+
+def get_records(handle, index, accessions):
+    """
+    Iterates over the (accession, record) pairs for the accessions that
+    are in the index of the file handle handle. The records are read in
+    file order, each with a single seek. Accessions that are not in the
+    index are skipped.
+    """
+    found = [(index[accession], accession) for accession in accessions 
+             if accession in index]
+    found.sort()
+    for (offset, length), accession in found:
+        handle.seek(offset)
+        yield accession, Record(handle.read(length).splitlines(True))
+
+def compare_parsers(sprot_fname):
+    """
+    Parses sprot_fname with this module and with Bio.SwissProt, checks
+    that the fields used by the CAFA tools are the same and prints the
+    time taken by each parser.
+    """
+    from Bio import SwissProt as bsp
+    fields = ['entry_name', 'accessions', 'gene_name', 'taxonomy_id',
+              'created', 'annotation_update', 'cross_references',
+              'sequence']
+    # Time for reading all the fields with each parser:
+    start = time.time()
+    recs = 0
+    for rec in parse(open(sprot_fname, 'r')):
+        for field in fields:
+            getattr(rec, field)
+        rec.references
+        recs += 1
+    lazy_time = time.time() - start
+    start = time.time()
+    for rec in bsp.parse(open(sprot_fname, 'r')):
+        for field in fields:
+            getattr(rec, field)
+        rec.references
+    bio_time = time.time() - start
+    # Time for reading only the taxonomy id, as done for the records
+    # of the other organisms:
+    start = time.time()
+    for rec in parse(open(sprot_fname, 'r')):
+        rec.taxonomy_id
+    lazy_tax_time = time.time() - start
+
+    # Field by field comparison:
+    mismatches = 0
+    for rec, bio_rec in zip(parse(open(sprot_fname, 'r')),
+                            bsp.parse(open(sprot_fname, 'r'))):
+        for field in fields:
+            if getattr(rec, field) != getattr(bio_rec, field):
+                mismatches += 1
+                print('Mismatch in ' + field + ' of ' + rec.entry_name)
+        if [r.references for r in rec.references] != \
+           [r.references for r in bio_rec.references]:
+            mismatches += 1
+            print('Mismatch in references of ' + rec.entry_name)
+    print(str(recs) + ' records, ' + str(mismatches) + ' mismatches')
+    print('Bio.SwissProt, all fields:   %.2f s' % bio_time)
+    print('SwissProtParser, all fields: %.2f s' % lazy_time)
+    print('SwissProtParser, taxon only: %.2f s' % lazy_tax_time)
+    return mismatches
+
+if __name__ == '__main__':
+    if len(sys.argv) == 1:
+        print (sys.argv[0] + ':')
+        print (__doc__)
+    else:
+        compare_parsers(sys.argv[1])
+    sys.exit(0)
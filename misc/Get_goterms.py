@@ -11,6 +11,10 @@
    (GO term, Exp Ev Code, Ont) from the second file for each protein in the 
    first input file . Then groups the proteins according to the taxon ids.
 
+   The records are looked up in the second file through an accession
+   index, which is saved next to it (with the extension .acc_idx) on
+   the first run and reused afterwards.
+
    It outputs each protein and the corresponding set of GO term information.
    If a protein in the list is obsolete or does not have any GO term information 
    in the database, it will not print anything about that protein.
@@ -20,7 +24,10 @@ import sys
 import subprocess
 from collections import defaultdict
 
-from Bio import SwissProt as sp
+# The CAFA-Toolset modules are in the parent directory:
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+import SwissProtParser as sp
 
 #import Config
 
@@ -36,34 +43,23 @@ class Get_goterms:
         self.tList_fname = self.work_dir + '/' + tList_fname
         self.sprot_fname = self.work_dir + '/' + sprot_fname
 
-    def obtain_taxons(self, protein_dict, fh_sprot): 
-        found = False
-        for rec in sp.parse(fh_sprot):
-            for ac in range(len(rec.accessions)): 
-                if rec.accessions[ac] in protein_dict.keys(): 
-                    # assign rec.taxonomy_id list to the protein 
-                    protein_dict[rec.accessions[ac]] = rec.taxonomy_id 
-                    found = True
-                    break
-            #if found: 
-            #    break 
+    def obtain_taxons(self, protein_dict, fh_sprot, sprot_index): 
+        # Only the records of the proteins are read, using the index:
+        for protName, rec in sp.get_records(fh_sprot, sprot_index,
+                                            protein_dict):
+            # assign rec.taxonomy_id list to the protein 
+            protein_dict[protName] = rec.taxonomy_id 
         return protein_dict
 
-    def obtain_goterms(self, goterm_dict, fh_sprot):
-        found = False
-        for rec in sp.parse(fh_sprot):
-            for ac in range(len(rec.accessions)):
-                goList = []
-                if rec.accessions[ac] in goterm_dict.keys():
-                    for crossRef in rec.cross_references:
-                        if crossRef[0] == 'GO':
-                           goDef = (crossRef[1], (crossRef[3].split(':'))[0], \
-                                     crossRef[2][0])
-                           goterm_dict[rec.accessions[ac]].add(goDef)
-                    found = True
-                    break
-            #if found: 
-                #break 
+    def obtain_goterms(self, goterm_dict, fh_sprot, sprot_index):
+        # Only the records of the proteins are read, using the index:
+        for protName, rec in sp.get_records(fh_sprot, sprot_index,
+                                            goterm_dict):
+            for crossRef in rec.cross_references:
+                if crossRef[0] == 'GO':
+                   goDef = (crossRef[1], (crossRef[3].split(':'))[0], \
+                             crossRef[2][0])
+                   goterm_dict[protName].add(goDef)
         return goterm_dict
 
     def group_proteins_by_taxons(self, protein_dict):
@@ -125,8 +121,12 @@ class Get_goterms:
             goterm_dict[protName]= set()
         fh_tlist.close()
 
-        #self.obtain_taxons(protein_dict, open(self.sprot_fname, 'r'))
-        self.obtain_goterms(goterm_dict, open(self.sprot_fname, 'r'))
+        # Accession index of the SwissProt file, built on the first run:
+        sprot_index = sp.load_index(self.sprot_fname)
+        #self.obtain_taxons(protein_dict, open(self.sprot_fname, 'r'),
+        #                   sprot_index)
+        self.obtain_goterms(goterm_dict, open(self.sprot_fname, 'r'),
+                            sprot_index)
 
         #taxon_dict = self.group_proteins_by_taxons(protein_dict)
         #self.print_protein_dict(protein_dict)
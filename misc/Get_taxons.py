@@ -10,6 +10,10 @@
    input file from the second file. Then groups the proteins 
    according to the taxon ids. 
 
+   The records are looked up in the second file through an accession
+   index, which is saved next to it (with the extension .acc_idx) on
+   the first run and reused afterwards.
+
    It outputs these proteins by taxon ids as groups.
    It also has a method (print_protein_dict) which can be invoked to print each protein and 
    its taxon id as retrieved.
@@ -19,7 +23,10 @@ import sys
 import subprocess
 from collections import defaultdict
 
-from Bio import SwissProt as sp
+# The CAFA-Toolset modules are in the parent directory:
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+import SwissProtParser as sp
 
 #import Config
 
@@ -35,17 +42,12 @@ class Get_taxons:
         self.tList_fname = self.work_dir + '/' + tList_fname
         self.sprot_fname = self.work_dir + '/' + sprot_fname
 
-    def obtain_taxons(self, protein_dict, fh_sprot): 
-        found = False
-        for rec in sp.parse(fh_sprot):
-            for ac in range(len(rec.accessions)): 
-                if rec.accessions[ac] in protein_dict.keys(): 
-                    # assign rec.taxonomy_id list to the protein 
-                    protein_dict[rec.accessions[ac]] = rec.taxonomy_id 
-                    found = True
-                    break
-            #if found: 
-            #    break 
+    def obtain_taxons(self, protein_dict, fh_sprot, sprot_index): 
+        # Only the records of the proteins are read, using the index:
+        for protName, rec in sp.get_records(fh_sprot, sprot_index,
+                                            protein_dict):
+            # assign rec.taxonomy_id list to the protein 
+            protein_dict[protName] = rec.taxonomy_id 
         return protein_dict
 
     def group_proteins_by_taxons(self, protein_dict):
@@ -84,7 +86,10 @@ class Get_taxons:
             protName = line.strip()
             protein_dict[protName] = []
         fh_tlist.close()
-        self.obtain_taxons(protein_dict, open(self.sprot_fname, 'r'))
+        # Accession index of the SwissProt file, built on the first run:
+        sprot_index = sp.load_index(self.sprot_fname)
+        self.obtain_taxons(protein_dict, open(self.sprot_fname, 'r'),
+                           sprot_index)
         taxon_dict = self.group_proteins_by_taxons(protein_dict)
         #self.print_protein_dict(protein_dict)
         self.print_taxon_dict(taxon_dict)
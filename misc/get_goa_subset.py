@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+'''
+    How to run this program:
+    python2 get_goa_subset.py goa_uniprot_all.gaf cafa3targetlist.csv
+
+    The program takes a UniProt-GOA file (plain or gzip compressed) and 
+    one or more files with protein names - one protein per line. For 
+    each file of protein names, it writes out the lines of the UniProt-GOA
+    file whose DB_Object_ID (column 2) is one of the protein names. All
+    the files of protein names are served by a single pass over the 
+    UniProt-GOA file:
+
+    python2 get_goa_subset.py goa_uniprot_all.gaf.gz list1.csv list2.csv
+
+    The output file for list1.csv is list1.csv.goa_subset.gaf, and so on.
+    The header lines of the UniProt-GOA file are copied to every output
+    file, so that the output files can be read by the other CAFA tools.
+    The following options can be given after the file names:
+
+    -d DIRECTORY: the directory for the output files. The default is the
+                  current directory.
+    -P PROCESSES: the number of processes that scan parts of the 
+                  UniProt-GOA file in parallel. The default is 1. A gzip
+                  compressed file is always read by a single process.
+
+    This program replaces get_uniprot-goa_subset.gawk, which extracted 
+    the lines of a single protein list in one pass.
+'''
+import os
+import sys
+import shutil
+import argparse
+from multiprocessing import Pool
+
+# The CAFA-Toolset modules are in the parent directory:
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+import GOAParser
+from match_targetList import read_target_list
+
+def _extract_chunk(args):
+    """
+    Writes the lines of one byte range of the UniProt-GOA file to a part
+    file for each protein list (PRIVATE). This method is run in a worker
+    process by extract_subsets. It returns the number of lines written 
+    to each part file.
+    """
+    goa_fname, start, end, prot_lists, part_fnames = args
+    part_handles = [open(fname, 'w') for fname in part_fnames]
+    part_counts = [0] * len(part_handles)
+    for lines in GOAParser.iter_line_blocks(goa_fname, start, end):
+        # Kept lines of each list in this block:
+        kept = [[] for fh in part_handles]
+        for line in lines:
+            if line[:1] == '!':
+                continue
+            cols = line.split('\t', 2)
+            if len(cols) > 1 and cols[1] in prot_lists:
+                for index in prot_lists[cols[1]]:
+                    kept[index].append(line)
+        for index in range(len(kept)):
+            if kept[index]:
+                part_handles[index].write('\n'.join(kept[index]) + '\n')
+                part_counts[index] += len(kept[index])
+    for fh in part_handles:
+        fh.close()
+    return part_counts
+
+def extract_subsets(goa_fname, tList_fnames, out_fnames, nprocs=1):
+    """
+    Writes the records of the UniProt-GOA file goa_fname for the proteins
+    in each file of tList_fnames to the corresponding file of out_fnames.
+    The UniProt-GOA file is read once, in nprocs byte ranges scanned in 
+    parallel. Each range is written to part files which are joined in 
+    the order of the ranges. It returns the number of records written to
+    each output file.
+    """
+    # Map each protein name to the indices of the lists it is in:
+    prot_lists = {}
+    for index in range(len(tList_fnames)):
+        for protName in read_target_list(tList_fnames[index]):
+            prot_lists.setdefault(protName, []).append(index)
+    chunks = GOAParser.find_line_offsets(goa_fname, max(nprocs, 1))
+    jobs = []
+    for chunk_index in range(len(chunks)):
+        start, end = chunks[chunk_index]
+        part_fnames = [fname + '.part' + str(chunk_index) for 
+                       fname in out_fnames]
+        jobs.append((goa_fname, start, end, prot_lists, part_fnames))
+    if nprocs > 1 and len(jobs) > 1:
+        pool = Pool(nprocs)
+        job_counts = pool.map(_extract_chunk, jobs)
+        pool.close()
+        pool.join()
+    else:
+        job_counts = [_extract_chunk(job) for job in jobs]
+    # Join the header and the part files:
+    header = GOAParser.read_header(goa_fname)
+    for index in range(len(out_fnames)):
+        fh_out = open(out_fnames[index], 'w')
+        fh_out.writelines(header)
+        for job in jobs:
+            fh_part = open(job[4][index], 'r')
+            shutil.copyfileobj(fh_part, fh_out)
+            fh_part.close()
+            os.remove(job[4][index])
+        fh_out.close()
+    return [sum([counts[index] for counts in job_counts]) for 
+            index in range(len(out_fnames))]
+
+if __name__ == '__main__':
+    if len(sys.argv) == 1:
+        print (sys.argv[0] + ':')
+        print(__doc__)
+    else:
+        parser = argparse.ArgumentParser(description='Extracts the ' + \
+                    'UniProt-GOA records of the proteins in one or more ' + \
+                    'lists')
+        parser.add_argument('goa_fname')
+        parser.add_argument('tList_fnames', nargs='+')
+        parser.add_argument('-d', '--directory', default='.')
+        parser.add_argument('-P', '--processes', type=int, default=1)
+        args = parser.parse_args()
+        out_fnames = [os.path.join(args.directory, 
+                                   os.path.basename(fname) + 
+                                   '.goa_subset.gaf') for 
+                      fname in args.tList_fnames]
+        counts = extract_subsets(args.goa_fname, args.tList_fnames,
+                                 out_fnames, args.processes)
+        for out_fname, count in zip(out_fnames, counts):
+            print out_fname + ': ' + str(count) + ' records'
+    sys.exit(0)
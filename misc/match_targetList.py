@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+'''
+    How to run this program:
+    python2 match_targetList.py cafa3targetlist.csv goa_uniprot_all.gaf
+
+    The program takes takes two input files:  
+    cafa3targetlist.csv: a file with protein names - one protein per line
+    goa_uniprot_all.gaf: a UniProt-GOA file with protein names in the 
+                         second column (DB_Object_ID). 
+
+    The program reads the second file only once and counts, for each
+    protein of the first file, the lines whose protein column is exactly
+    the protein name. It outputs each protein and its count, in the
+    order of the first file. The following options can be given after
+    the two file names:
+
+    -c COLUMN:    the column (1-based) with the protein names. The default
+                  is 2, the DB_Object_ID column of GAF files. Use 1 for a 
+                  file with protein names in the first column, such as
+                  goa_uniprot_all.gaf.2.txt.
+    -P PROCESSES: the number of processes that scan parts of the second 
+                  file in parallel. The default is 1.
+
+    This program replaces match_targetList_grep.py and 
+    match_targetList_gawk.py, which ran one grep or gawk process over the
+    whole second file for every protein of the first file.
+'''
+import os
+import sys
+import argparse
+from collections import defaultdict
+from multiprocessing import Pool
+
+# The CAFA-Toolset modules are in the parent directory:
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+import GOAParser
+
+def read_target_list(tList_fname):
+    """
+    Reads a file with one protein name per line and returns the list of
+    the protein names, without duplicates, in the order of the file. 
+    Windows line ends and blank lines are ignored.
+    """
+    targets = []
+    seen = set()
+    for line in open(tList_fname, 'r'):
+        protName = line.strip()
+        if protName and protName not in seen:
+            seen.add(protName)
+            targets.append(protName)
+    return targets
+
+def _count_chunk(args):
+    """
+    Counts the lines of one byte range of the file whose protein column 
+    is in the target set (PRIVATE). This method is run in a worker process
+    by count_targets.
+    """
+    fname, start, end, targets, col = args
+    counts = defaultdict(int)
+    for lines in GOAParser.iter_line_blocks(fname, start, end):
+        for line in lines:
+            if line[:1] == '!':
+                continue
+            cols = line.split('\t', col + 1)
+            if len(cols) > col:
+                protName = cols[col].rstrip('\r')
+                if protName in targets:
+                    counts[protName] += 1
+    return dict(counts)
+
+def count_targets(fname, targets, column=2, nprocs=1):
+    """
+    Counts the lines of the file fname whose column number column (1-based)
+    is exactly one of the protein names in targets. Header lines starting
+    with '!' are skipped. The file is read once, in nprocs byte ranges
+    scanned in parallel. It returns a dictionary with the count of every
+    protein name in targets.
+    """
+    targets = set(targets)
+    jobs = [(fname, start, end, targets, column - 1) for start, end in
+            GOAParser.find_line_offsets(fname, max(nprocs, 1))]
+    if nprocs > 1 and len(jobs) > 1:
+        pool = Pool(nprocs)
+        chunk_counts = pool.map(_count_chunk, jobs)
+        pool.close()
+        pool.join()
+    else:
+        chunk_counts = [_count_chunk(job) for job in jobs]
+    counts = dict.fromkeys(targets, 0)
+    for chunk in chunk_counts:
+        for protName in chunk:
+            counts[protName] += chunk[protName]
+    return counts
+
+class Find_match:
+    def __init__(self, tList_fname, uniprot_fname, column=2, nprocs=1):
+        self.tList_fname = tList_fname
+        self.uniprot_fname = uniprot_fname
+        self.column = column
+        self.nprocs = nprocs
+
+    def search_records(self):
+        """
+        This method counts the records of every target protein in the
+        UniProt-GOA file and prints the counts.
+        """
+        targets = read_target_list(self.tList_fname)
+        counts = count_targets(self.uniprot_fname, targets, self.column,
+                               self.nprocs)
+        for protName in targets:
+            print protName + '\t' + str(counts[protName])
+        return None
+
+if __name__ == '__main__':
+    if len(sys.argv) == 1:
+        print (sys.argv[0] + ':')
+        print(__doc__)
+    else:
+        parser = argparse.ArgumentParser(description='Counts the ' + \
+                    'UniProt-GOA records of the proteins in a list')
+        parser.add_argument('tList_fname')
+        parser.add_argument('uniprot_fname')
+        parser.add_argument('-c', '--column', type=int, default=2)
+        parser.add_argument('-P', '--processes', type=int, default=1)
+        args = parser.parse_args()
+        fm = Find_match(args.tList_fname, args.uniprot_fname, args.column,
+                        args.processes)
+        fm.search_records()
+    sys.exit(0)
@@ -1,5 +1,5 @@
 date 
-#python2 match_targetList_gawk.py cafa3targetlist.csv goa_uniprot_all.gaf
-python2 match_targetList_gawk.py cafa3targetlist.csv goa_uniprot_all.gaf.2.txt
+#python2 match_targetList.py cafa3targetlist.csv goa_uniprot_all.gaf
+python2 match_targetList.py -c 1 cafa3targetlist.csv goa_uniprot_all.gaf.2.txt
 
 date
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+'''
+    This module tests how CreateBenchmark.merge_by_protein merges the
+    records of the t1 and t2 files grouped by protein, and that it
+    raises a ValueError when a file is not sorted by DB_Object_ID.
+
+    How to run this program:
+
+       python testCreateBenchmark.py
+'''
+
+import sys
+import unittest
+
+import CreateBenchmark as cb
+
+def groups(*prots):
+    """
+    Returns an iterator over one group of records for each protein name
+    in prots, in the form of GOAParser.gafbyproteiniterator.
+    """
+    return iter([[{'DB_Object_ID': prot}] for prot in prots])
+
+def merged(t1_prots, t2_prots):
+    """
+    Returns the (protein name, protein name at t1 or None) pairs yielded
+    by merge_by_protein for the proteins t1_prots and t2_prots.
+    """
+    return [(prot, t1_recs[0]['DB_Object_ID'] if t1_recs else None)
+            for prot, t1_recs, t2_recs in
+            cb.merge_by_protein(groups(*t1_prots), groups(*t2_prots))]
+
+class testMergeByProtein(unittest.TestCase):
+    def test_sorted(self):
+        self.assertEqual(merged(['A', 'B', 'D', 'E'], ['B', 'C', 'D']),
+                         [('B', 'B'), ('C', None), ('D', 'D')])
+
+    def test_t1_unsorted_after_match(self):
+        # B comes after C at t1: it must not be taken as missing at t1.
+        self.assertRaises(ValueError, merged, ['A', 'C', 'B'],
+                          ['A', 'B', 'C'])
+
+    def test_t1_unsorted_after_last_t2_protein(self):
+        self.assertRaises(ValueError, merged, ['A', 'C', 'B'], ['A'])
+
+    def test_t2_unsorted(self):
+        self.assertRaises(ValueError, merged, ['A', 'B', 'C'],
+                          ['A', 'C', 'B'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -24,118 +24,81 @@
                 output_filename_LK_cco: file name to a NK-cco benchmark set
                 output_filename_LK_mfo: file name to a NK-mfo benchmark set
 
-        The following methods are invoked by the above two methods to create
-        required data structures and perform the verification:
-
-       create_iea_ann_dict: 
-                This method builds a dictionary for <protein, GO ID> tuples 
-                from t1_iea file.
-
-        create_exp_ann_dict: 
-                This method builds three dictionaries in BPO, CCO, and MFO 
-                categories for <protein, GO ID> tuples from a 
-                t1_exp or t2_exp file.
-
-        check_LK_benchmark_creation(t1_iea_dict,
-                                   t1_xxo_dict, 
-                                   t2_xxo_dict,
-                                   benchmark_fh):
-            This method verifies the benchmark entries in the benchmark file
-            passed by the file handle benchmark_fh. 
-
-            Meaning of xxo: xxo is replaced runtime by bpo, cco, or mfo to 
-            make this method specific to a certain type of benchmarks.
-
-        check_NK_benchmark_creation(t1_iea_dict,
-                                    t1_bpo_dict,
-                                    t1_cco_dict,
-                                    t1_mfo_dict,
-                                    t2_xxo_dict,
-                                    benchmark_fh):
-            This method verifies the benchmark entries in the benchmark file
-            passed by the file handle benchmark_fh.
-
-            Meaning of xxo: xxo is replaced runtime by bpo, cco, or mfo to 
-            make this method specific to a certain type of benchmarks.
+        The following methods are invoked by the above two methods to
+        perform the verification. The proteins are looked up in one index
+        that maps each protein to a mask of the ontologies of its t1 
+        non-EXP, t1 EXP, and t2 EXP annotations (see 
+        GOAParser_cafa.aspect_mask_index):
+
+        check_LK_benchmark_creation(masks,
+                                    aspect_bit,
+                                    t2_pairs,
+                                    benchmark_lines):
+            This method verifies the entries of a LK benchmark file in 
+            the ontology aspect_bit. t2_pairs is the set of the 
+            'protein<TAB>GO ID' entries of the benchmark file found in 
+            the t2_exp file in this ontology.
+
+        check_NK_benchmark_creation(masks,
+                                    aspect_bit,
+                                    benchmark_lines):
+            This method verifies the entries of a NK benchmark file in 
+            the ontology aspect_bit.
 """
 
 import os.path
 import sys
-from collections import defaultdict
 import FormatChecker as fc
+import GOAParser_cafa as gc
 
-def create_iea_ann_dict(goa_iea_handle):
+# Ontology of each type of benchmarks:
+ONT_ASPECTS = {'BPO': 'P', 'CCO': 'C', 'MFO': 'F'}
+
+def read_benchmark_lines(benchmark_fh):
     """
-    This method builds a dictionary for <protein, GO ID> tuples 
-    from t1_iea file.
+    This method returns the list of the entries of a benchmark file, 
+    each split into protein name and GO ID.
     """
-    # Initialize a dictionar which will later be populated with
-    # <protein, GO ID> tuples from t1_iea file:
-    dict_iea = defaultdict(lambda:set())
-    # Populate the dictionary for t1_iea with <protein, GO terms> as
-    # <key, values> pairs from the entries with NOn-Experimental Evidence
-    # at time t1:
-    for lines in goa_iea_handle:
-        cols = lines.strip().split('\t')
-        if len(cols) < 15:
-            continue
-        dict_iea[cols[1]].add(cols[4])
-        # Column 1: protein name, Column 4: GO ID
-    return dict_iea
+    return [lines.strip().split('\t') for lines in benchmark_fh]
 
-def create_exp_ann_dict(goa_exp_handle):
+def find_t2_pairs(t2_exp_handle, aspect, benchmark_lines):
     """
-    This method builds three dictionaries in BPO, CCO, and MFO categories
-    for <protein, GO ID> tuples from UniProt-GOA file without the header
-    string.
+    This method returns the set of the 'protein<TAB>GO ID' entries in 
+    benchmark_lines that are annotated in the ontology aspect in the 
+    t2_exp file.
     """
-    # Initialize three dictionaries in BPO, CCO, and MFO ontology groups
-    # which will later be populated with <protein, GO ID> tuples from
-    # t1_exp file ontology groups:
-    dict_bpo = defaultdict(lambda:set())
-    dict_cco = defaultdict(lambda:set())
-    dict_mfo = defaultdict(lambda:set())
-
-    # Populate the three dictionaries for t1_exp with <protein, GO terms>
-    # as <key, values> pairs from the entries with Non-Experimental Evidence
-    # at time t1:
-    for lines in goa_exp_handle:
-        cols = lines.strip().split('\t')
-        if len(cols) < 15:
+    pairs = set(['\t'.join(cols[:2]) for cols in benchmark_lines])
+    t2_pairs = set([])
+    for lines in t2_exp_handle:
+        cols = lines.split('\t', 9)
+        if len(cols) < 10 or cols[8] != aspect:
             continue
-        if cols[8] == 'F': # Column 8: Ontology group
-            dict_mfo[cols[1]].add(cols[4])
-            # Column 1: protein name, Column 4: GO ID 
-        elif cols[8] == 'P':
-            dict_bpo[cols[1]].add(cols[4])
-        elif cols[8] == 'C':
-            dict_cco[cols[1]].add(cols[4])
-    return (dict_bpo, dict_cco, dict_mfo)
-
-def check_LK_benchmark_creation(t1_iea_dict,
-                                t1_xxo_dict, 
-                                t2_xxo_dict,
-                                benchmark_fh):
+        pair = cols[1] + '\t' + cols[4]
+        if pair in pairs:
+            t2_pairs.add(pair)
+    return t2_pairs
+
+def check_LK_benchmark_creation(masks,
+                                aspect_bit, 
+                                t2_pairs,
+                                benchmark_lines):
     """
-    This method verifies the benchmark entries in the benchmark file
-    passed by the file handle benchmark_fh. 
-
-    Meaning of xxo: xxo is replaced runtime by bpo, cco, or mfo to make
-    this method specific to a certain type of benchmarks.
+    This method verifies the benchmark entries in benchmark_lines for
+    the ontology aspect_bit. 
     """
     err_msg = ''
-    for lines in benchmark_fh:
-        cols = lines.strip().split('\t')
-        if cols[0] not in t1_iea_dict:
+    for cols in benchmark_lines:
+        mask = masks.get(cols[0], 0)
+        if not (mask >> gc.T1_IEA) & 7:
             err_msg = '\t\tan undesired protein ' + cols[0] + ' got selected ' + \
                       'in the benchmark file.'
             break
-        elif cols[0] in t1_xxo_dict:
+        elif (mask >> gc.T1_EXP) & aspect_bit:
             err_msg = '\t\tselected protein ' + cols[0] + ' in the ' + \
                       'benchmark file already had\n' + \
                       '\t\texperimental evidence at time t1.'
             break
-        elif cols[0] not in t2_xxo_dict or cols[1] not in t2_xxo_dict[cols[0]]:
+        elif '\t'.join(cols[:2]) not in t2_pairs:
             err_msg = '\t\tselected protein ' + cols[0] + ' in the ' + \
                       ' benchmark file has not gainedi\n' + \
                       '\t\texperimental evidence at time t2.'
@@ -150,72 +113,45 @@ def verify_LK_benchmark(t1_iea_handle,
     """ 
     This method verifies Limited-Knowledge benchmark sets.
     """
-
-    # Create a dictionary for the <protein, GO ID> tuples from t1_iea file:
-    t1_iea_dict = create_iea_ann_dict(t1_iea_handle)
-
-    # Create BPO, CCO and MFO dictionaries for the
-    # <protein, GO ID> tuples from t1_exp file:
-    t1_bpo_dict, t1_cco_dict, t1_mfo_dict = create_exp_ann_dict(t1_exp_handle)
-
-    # Create BPO, CCO and MFO dictionaries for the
-    # <protein, GO ID> tuples from t2_exp file:
-    t2_bpo_dict, t2_cco_dict, t2_mfo_dict = create_exp_ann_dict(t2_exp_handle)
-   
-    # Check file format for LK_bpo benchmark file.
-    # LK_bpo is True when the filename is non-empty, file exists, file size
-    # is non-zero and file in correct format:
-
-    err_msg = '' # Error message holders
-    if ontType == 'BPO':
-        # Verify LK-BPO benchmarks
-        err_msg = check_LK_benchmark_creation(t1_iea_dict,
-                                              t1_bpo_dict,
-                                              t2_bpo_dict,
-                                              benchmark_fh)
-    elif ontType == 'CCO':
-        # Verify LK-CCO benchmarks
-        err_msg = check_LK_benchmark_creation(t1_iea_dict,
-                                              t1_cco_dict,
-                                              t2_cco_dict,
-                                              benchmark_fh)
-    elif ontType == 'MFO':
-        # Verify LK-MFO benchmarks
-        err_msg = check_LK_benchmark_creation(t1_iea_dict,
-                                              t1_mfo_dict,
-                                              t2_mfo_dict,
-                                              benchmark_fh)
-    return err_msg
-
-def check_NK_benchmark_creation(t1_iea_dict,
-                                t1_bpo_dict,
-                                t1_cco_dict,
-                                t1_mfo_dict,
-                                t2_xxo_dict,
-                                benchmark_fh):
+    if ontType not in ONT_ASPECTS:
+        return ''
+    aspect = ONT_ASPECTS[ontType]
+    benchmark_lines = read_benchmark_lines(benchmark_fh)
+
+    # Ontologies of the t1 annotations of every protein:
+    masks = gc.aspect_mask_index(t1_iea_handle, gc.T1_IEA)
+    gc.aspect_mask_index(t1_exp_handle, gc.T1_EXP, masks)
+
+    # Benchmark entries annotated at t2:
+    t2_pairs = find_t2_pairs(t2_exp_handle, aspect, benchmark_lines)
+
+    # Verify LK-BPO, LK-CCO, or LK-MFO benchmarks:
+    return check_LK_benchmark_creation(masks, 
+                                       gc.ASPECT_BITS[aspect],
+                                       t2_pairs,
+                                       benchmark_lines)
+
+def check_NK_benchmark_creation(masks,
+                                aspect_bit,
+                                benchmark_lines):
     """ 
-    This method verifies the benchmark entries in the benchmark file 
-    passed by the file handle benchmark_fh. 
-
-    Meaning of xxo: xxo is replaced runtime by bpo, cco, or mfo to make 
-    this method specific to a certain type of benchmarks.
+    This method verifies the benchmark entries in benchmark_lines for
+    the ontology aspect_bit. 
     """
 
     err_msg = ''
-    for lines in benchmark_fh:
-        cols = lines.strip().split('\t')
-        if cols[0] not in t1_iea_dict:
+    for cols in benchmark_lines:
+        mask = masks.get(cols[0], 0)
+        if not (mask >> gc.T1_IEA) & 7:
             err_msg = '\t\tan undesired protein ' + cols[0] + \
                       ' got selected in the benchmark file.'
             break
-        elif cols[0] in t1_bpo_dict or \
-             cols[0] in t1_cco_dict or \
-             cols[0] in t1_mfo_dict:
+        elif (mask >> gc.T1_EXP) & 7:
             err_msg = '\t\tselected protein ' + cols[0] + ' in the ' + \
                       'benchmark file already had\n' +\
                       '\t\texperimental evidence at t1.'
             break
-        elif cols[0] not in t2_xxo_dict:
+        elif not (mask >> gc.T2_EXP) & aspect_bit:
             err_msg = '\t\tselected protein ' + cols[0] + ' in the '+ \
                       'benchmark file has not gained\n' + \
                       '\t\texperimental evidence at time t2.'
@@ -230,44 +166,17 @@ def verify_NK_benchmark(t1_iea_handle,
     """
     This method verifies No-Knowledge benchmark sets.
     """
-    # Create a dictionary for the 
-    # <protein, GO ID> tuples from t1_iea file:
-    t1_iea_dict = create_iea_ann_dict(t1_iea_handle)
-
-    # Create BPO, CCO and MFO dictionaries for the
-    # <protein, GO ID> tuples from t1_exp file:
-    t1_bpo_dict, t1_cco_dict, t1_mfo_dict = create_exp_ann_dict(t1_exp_handle)
-
-    # Create BPO, CCO and MFO dictionaries for the
-    # <protein, GO ID> tuples from t2_exp file:
-    t2_bpo_dict, t2_cco_dict, t2_mfo_dict = create_exp_ann_dict(t2_exp_handle)
-
-    err_msg  = ''  # Error message holders
-    if (ontType == 'BPO'):
-        # Verify NK-BPO benchmarks:
-        err_msg = check_NK_benchmark_creation(t1_iea_dict,
-                                              t1_bpo_dict,
-                                              t1_cco_dict,
-                                              t1_mfo_dict,
-                                              t2_bpo_dict,
-                                              benchmark_fh)
-    elif (ontType == 'CCO'):
-        # Verify NK-CCO benchmarks:
-        err_msg = check_NK_benchmark_creation(t1_iea_dict,
-                                              t1_bpo_dict,
-                                              t1_cco_dict,
-                                              t1_mfo_dict,
-                                              t2_cco_dict,
-                                              benchmark_fh)
-    elif (ontType == 'MFO'):
-        # Verify NK-MFO benchmarks:
-        err_msg = check_NK_benchmark_creation(t1_iea_dict,
-                                              t1_bpo_dict,
-                                              t1_cco_dict,
-                                              t1_mfo_dict,
-                                              t2_mfo_dict,
-                                              benchmark_fh)
-    return err_msg
+    if ontType not in ONT_ASPECTS:
+        return ''
+    # Ontologies of the t1 and t2 annotations of every protein:
+    masks = gc.aspect_mask_index(t1_iea_handle, gc.T1_IEA)
+    gc.aspect_mask_index(t1_exp_handle, gc.T1_EXP, masks)
+    gc.aspect_mask_index(t2_exp_handle, gc.T2_EXP, masks)
+
+    # Verify NK-BPO, NK-CCO, or NK-MFO benchmarks:
+    return check_NK_benchmark_creation(masks,
+                                       gc.ASPECT_BITS[ONT_ASPECTS[ontType]],
+                                       read_benchmark_lines(benchmark_fh))
 
 if __name__ == "__main__":
     print (sys.argv[0] + ':')